@@ -0,0 +1,202 @@
+"""Paquete de sprites preescalados en disco.
+
+`python asset_pack.py` decodifica los PNG de imgs/, los escala a cada tamaño
+que usa el juego (SPRITE_SIZES de settings.py en cada alto de render de
+`config.asset_pack_heights`) y guarda los sprites ya en formato de mezcla
+(BGR premultiplicado + alfa inverso, ver sprites.Sprite) en un único fichero.
+Al arrancar, el juego mapea ese fichero en memoria en lugar de decodificar
+PNG: no hace falta abrir una ventana de pygame para convert_alpha y las
+páginas del fichero las comparten todos los procesos del juego de la máquina.
+
+Formato: cabecera (MAGIC, versión, longitud del índice), índice JSON y datos,
+con cada array alineado a 64 bytes. El índice guarda el SHA-256 de cada PNG
+de origen: si cambia alguno, o PACK_VERSION, el paquete está caducado.
+
+    python asset_pack.py              # (re)construir assets/sprites.pack
+    python asset_pack.py --check      # solo decir si está al día
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from sprites import Sprite
+
+MAGIC = b'IPMSPRT\0'
+PACK_VERSION = 1
+ALIGN = 64
+_HEADER = struct.Struct('<8sII')  # magic, versión, bytes del índice
+
+
+class PackError(Exception):
+    """El paquete no existe, está dañado o caducado"""
+
+
+def source_hashes(sources):
+    """{nombre: SHA-256} de los PNG de origen ({nombre: ruta})"""
+    hashes = {}
+    for name, path in sources.items():
+        with open(path, 'rb') as f:
+            hashes[name] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+
+def pack_sizes(design_sizes, render_heights, design_height):
+    """{nombre: [lados en píxeles de render]} para cada alto de render (mismo redondeo que el juego)"""
+    sizes = {}
+    for name, sides in design_sizes.items():
+        sizes[name] = sorted({int(round(side * height / design_height)) for side in sides for height in render_heights})
+    return sizes
+
+
+def build_pack(path, sources, sizes):
+    """Escala cada imagen a sus tamaños y escribe el paquete (fichero temporal + rename)"""
+    import pygame
+    index = {'version': PACK_VERSION, 'sources': source_hashes(sources), 'sprites': []}
+    arrays = []
+    offset = 0
+    for name, sides in sizes.items():
+        surface = pygame.image.load(sources[name])
+        for side in sides:
+            sprite = Sprite.from_surface(pygame.transform.scale(surface, (side, side)))
+            entry = {'name': name, 'size': [side, side]}
+            for field in ('premul', 'inv_alpha'):
+                array = getattr(sprite, field)
+                offset = -(-offset // ALIGN) * ALIGN
+                entry[field] = [offset, array.dtype.str, list(array.shape)]
+                arrays.append((offset, array))
+                offset += array.nbytes
+            index['sprites'].append(entry)
+
+    header = json.dumps(index, separators=(',', ':')).encode()
+    data_start = -(-(_HEADER.size + len(header)) // ALIGN) * ALIGN
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, PACK_VERSION, len(header)))
+        f.write(header)
+        for array_offset, array in arrays:
+            f.seek(data_start + array_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return data_start + offset
+
+
+class AssetPack:
+    """Paquete de sprites mapeado en memoria (solo lectura)"""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                magic, version, index_bytes = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != MAGIC:
+                    raise PackError(f"{path} no es un paquete de sprites")
+                if version != PACK_VERSION:
+                    raise PackError(f"versión {version} del paquete (se espera {PACK_VERSION})")
+                self.index = json.loads(f.read(index_bytes))
+        except FileNotFoundError:
+            raise PackError(f"{path} no existe") from None
+        except (OSError, struct.error, ValueError) as e:
+            raise PackError(f"{path} dañado: {e}") from None
+        data_start = -(-(_HEADER.size + index_bytes) // ALIGN) * ALIGN
+        self._data = np.memmap(path, dtype=np.uint8, mode='r', offset=data_start).view(np.ndarray)
+        self._entries = {(e['name'], tuple(e['size'])): e for e in self.index['sprites']}
+
+    @classmethod
+    def open(cls, path, sources, sizes):
+        """Abre el paquete comprobando que está al día con `sources` y contiene todos los `sizes`"""
+        pack = cls(path)
+        if pack.index['sources'] != source_hashes(sources):
+            raise PackError("las imágenes de origen han cambiado")
+        missing = [(name, side) for name, sides in sizes.items() for side in sides if (name, (side, side)) not in pack]
+        if missing:
+            raise PackError(f"faltan tamaños: {', '.join(f'{name} {side}px' for name, side in missing[:4])}")
+        return pack
+
+    def _array(self, spec):
+        offset, dtype, shape = spec
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        return self._data[offset:offset + count * dtype.itemsize].view(dtype).reshape(shape)
+
+    def sprite(self, name, size):
+        """Sprite cuyos arrays son vistas del fichero mapeado (no se copia nada)"""
+        entry = self._entries[(name, tuple(size))]
+        return Sprite.from_arrays(self._array(entry['premul']), self._array(entry['inv_alpha']))
+
+    def __contains__(self, key):
+        return (key[0], tuple(key[1])) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+
+def game_sources():
+    """PNG de origen de los sprites del juego ({nombre: ruta})"""
+    from settings import IMAGE_FILES, SPRITE_SIZES, base_dir
+    return {name: os.path.join(base_dir, IMAGE_FILES[name]) for name in SPRITE_SIZES}
+
+
+def game_sizes(render_heights, design_height=1080):
+    from settings import SPRITE_SIZES
+    return pack_sizes(SPRITE_SIZES, render_heights, design_height)
+
+
+def load_game_pack(path, render_heights, design_height=1080):
+    """Abre el paquete del juego y, si falta o está caducado, lo reconstruye. None si no se puede"""
+    sources = game_sources()
+    sizes = game_sizes(render_heights, design_height)
+    try:
+        return AssetPack.open(path, sources, sizes)
+    except PackError as e:
+        print(f"Paquete de sprites no disponible ({e}); reconstruyendo {path}")
+    try:
+        build_pack(path, sources, sizes)
+        return AssetPack.open(path, sources, sizes)
+    except (OSError, PackError) as e:
+        # Disco de solo lectura, etc.: el juego decodificará los PNG como antes
+        print(f"No se pudo crear el paquete de sprites: {e}")
+        return None
+
+
+def main(argv=None):
+    from config import config
+    parser = argparse.ArgumentParser(description="Construye el paquete de sprites preescalados del juego")
+    parser.add_argument('--output', default=config.asset_pack, help="Fichero del paquete")
+    parser.add_argument('--heights', type=int, nargs='+',
+                        default=sorted({*config.asset_pack_heights, config.render_height}),
+                        help="Altos de render para los que se preescalan los sprites")
+    parser.add_argument('--check', action='store_true', help="Solo comprobar si el paquete está al día")
+    args = parser.parse_args(argv)
+    if args.output is None:
+        parser.error("config.asset_pack es None: indica --output")
+
+    sources = game_sources()
+    sizes = game_sizes(args.heights)
+    if args.check:
+        try:
+            pack = AssetPack.open(args.output, sources, sizes)
+        except PackError as e:
+            print(f"Caducado: {e}")
+            return 1
+        print(f"Al día: {len(pack)} sprites, {pack.nbytes / 1024:.0f} KB")
+        return 0
+    nbytes = build_pack(args.output, sources, sizes)
+    print(f"{args.output}: {sum(len(s) for s in sizes.values())} sprites para {args.heights}, {nbytes / 1024:.0f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
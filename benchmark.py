@@ -0,0 +1,330 @@
+"""Benchmark reproducible del pipeline completo del juego a partir de un vídeo grabado.
+
+Pasa cada frame del vídeo por el mismo camino que `FruitCatcherGame.run`
+(lectura → volteo/recorte/reducción → detect_for_video → landmarks →
+simulación → overlay → CRT → presentación) con semilla fija y reloj
+simulado, para cada modelo y resolución de render. Por defecto presenta en el
+backend 'null' (fuera de pantalla); con `--display` se mide un backend real
+para elegir el más rápido en cada máquina. Compara con un baseline JSON y
+termina con código 1 si hay regresiones.
+
+    python benchmark.py                          # vídeo sintético, modelos disponibles, 1080p
+    python benchmark.py --heights 1080 720 --tiers lite full none
+    python benchmark.py --display pygame         # coste de presentar con pygame/SDL
+    python benchmark.py --mode 2 --no-tracking   # mano derecha, inferencia en cada frame (sin flujo óptico)
+    python benchmark.py --save-baseline          # guarda benchmarks/baseline.json
+
+Con `--startup` mide el arranque en frío: lanza el juego en procesos nuevos
+(presentador fuera de pantalla, ESPACIO en cuanto aparece el menú) y da el
+tiempo hasta el primer frame del menú y hasta el primer frame de partida.
+
+    python benchmark.py --startup --runs 5
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+# Sin ventana ni audio: el benchmark no presenta nada en pantalla
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import cv2
+import numpy as np
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+
+def make_synthetic_clip(path, frames=300, width=1280, height=720, fps=30, seed=0):
+    """Genera un vídeo con una figura que mueve cabeza y brazos sobre un fondo con textura"""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 120, (height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (0, 0), 3)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"No se pudo crear el vídeo {path}")
+    cx, cy = width // 2, height // 2
+    for i in range(frames):
+        t = i / fps
+        frame = background.copy()
+        head = (int(cx + width * 0.15 * np.sin(t * 1.3)), int(cy - height * 0.25 + 20 * np.sin(t * 2.1)))
+        shoulders = (head[0], head[1] + height // 8)
+        hips = (head[0], head[1] + height // 2)
+        cv2.line(frame, shoulders, hips, (60, 90, 200), 40)
+        for side in (-1, 1):
+            hand = (int(shoulders[0] + side * width * 0.15 * (1 + 0.5 * np.sin(t * 2.7 + side))),
+                    int(shoulders[1] - height * 0.2 * np.sin(t * 1.9 + side)))
+            cv2.line(frame, shoulders, hand, (170, 140, 110), 22)
+            cv2.circle(frame, hand, 18, (150, 180, 220), -1)
+        cv2.circle(frame, head, height // 14, (140, 170, 215), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def run_case(game, clip, tier, height, seed, warmup, max_frames):
+    """Ejecuta el vídeo entero con un modelo y una resolución; devuelve el resumen del perfilador"""
+    from config import config
+    from filters import make_filter
+    from pose import PoseEstimator
+    from preprocess import InferencePreprocessor
+    from profiler import FrameProfiler
+
+    game.configure_layout(height)
+    game.reset_game()
+    game.sim.rng = random.Random(seed)
+    game.game_started = True
+    game.camera_frame = None
+    game.last_pose_seq = 0
+    game.preprocessor = InferencePreprocessor(config.inference_height, config.pose_roi_tracking,
+                                              config.pose_roi_padding, config.pose_roi_min_size,
+                                              buffers=game.buffers)
+    game.control_filter = make_filter(config.control_filter, config)
+
+    cap = cv2.VideoCapture(clip)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    pose = None
+    if tier != 'none':
+        # Inferencia síncrona (detect_for_video) y sin límite de FPS: se mide el coste completo
+        pose = PoseEstimator(game.tier_manager.model_path(tier), mode='video', max_fps=0).open()
+    game.pose = pose
+
+    profiler = game.profiler = FrameProfiler(game.PROFILE_STAGES, window=max_frames, counters=game.PROFILE_COUNTERS)
+    index = 0
+    start = None
+    try:
+        while index < max_frames + warmup:
+            if index == warmup:
+                # Los primeros frames (grafo de MediaPipe, caches) no cuentan
+                profiler = game.profiler = FrameProfiler(game.PROFILE_STAGES, window=max_frames,
+                                                         counters=game.PROFILE_COUNTERS)
+                start = time.perf_counter()
+            profiler.begin()
+            ok, frame = cap.read()
+            if not ok:
+                break
+            # Reloj simulado a la velocidad nativa del vídeo: misma partida en cada ejecución
+            now = index / fps
+            profiler.lap('capture')
+            game.process_camera_frame(frame, now)
+            profiler.lap('preprocess')
+            if pose is not None:
+                game.update_from_pose(now)
+            profiler.lap('landmarks')
+            game.sim.advance(now)
+            if game.sim.game_over:
+                game.sim.reset()
+            profiler.lap('simulation')
+            canvas = game.draw_game_overlay(game.camera_frame)
+            profiler.lap('compose')
+            # CRT, HUD y presentación como en el juego (laps 'crt' y 'display')
+            game.present(canvas, game.dirty_rects)
+            game.record_buffer_stats()
+            index += 1
+        profiler.begin()
+    finally:
+        cap.release()
+        if pose is not None:
+            pose.close()
+
+    frames = max(index - warmup, 0)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    return {
+        'frames': frames,
+        'fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        'stages': profiler.summary(),
+        'counters': profiler.counter_summary(),
+    }
+
+
+# Hitos del arranque, en orden (los registra el propio juego salvo 'imports' e 'init')
+STARTUP_MARKS = ('imports', 'init', 'menu_frame', 'start_pressed', 'ready', 'start', 'game_frame')
+
+
+def startup_child(clip, tier):
+    """Proceso hijo de --startup: arranca el juego real y escribe los hitos (time.time) como JSON"""
+    marks = {}
+    from config import config
+    import fruit_game
+    marks['imports'] = time.time()
+
+    from display import NullPresenter
+
+    class StartupProbe(NullPresenter):
+        """Presentador fuera de pantalla que pulsa las teclas según los hitos del juego"""
+
+        def __init__(self, game):
+            super().__init__()
+            self.game = game
+
+        def poll(self, delay=1):
+            marks = self.game.startup_marks
+            if 'game_frame' in marks:
+                return 'escape'
+            if 'menu_frame' in marks and 'start_pressed' not in marks:
+                # ESPACIO nada más ver el menú: mide lo que espera un jugador impaciente
+                return 'space'
+            return super().poll(delay)
+
+    config.camera_source = clip
+    config.model_tier = tier
+    config.telemetry_dir = None
+    config.highscore_file = None
+    config.profile_dump = None
+    game = fruit_game.FruitCatcherGame()
+    game.presenter = StartupProbe(game)
+    marks['init'] = time.time()
+    game.run()
+    marks.update(game.startup_marks)
+    print(json.dumps(marks))
+
+
+def run_startup(clip, tier, runs):
+    """Lanza `runs` arranques en frío y devuelve {hito: {'median', 'max'}} en segundos desde el lanzamiento"""
+    samples = {name: [] for name in STARTUP_MARKS}
+    for _ in range(runs):
+        command = [sys.executable, os.path.abspath(__file__), '--startup-child', '--clip', clip]
+        if tier:
+            command += ['--tiers', tier]
+        launch = time.time()
+        output = subprocess.run(command, capture_output=True, text=True)
+        lines = output.stdout.strip().splitlines()
+        if output.returncode != 0 or not lines:
+            raise RuntimeError(f"El arranque de prueba falló:\n{output.stdout}{output.stderr}")
+        marks = json.loads(lines[-1])
+        for name in STARTUP_MARKS:
+            if name in marks:
+                samples[name].append(marks[name] - launch)
+    return {name: {'median': round(statistics.median(values), 3), 'max': round(max(values), 3)}
+            for name, values in samples.items() if values}
+
+
+def compare(results, baseline, tolerance, min_delta_ms=0.5):
+    """Lista de regresiones respecto al baseline (FPS más bajos o p95 de etapa más altos)"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result['fps'] < base['fps'] * (1 - tolerance):
+            regressions.append(f"{key}: fps {result['fps']:.1f} < {base['fps']:.1f}")
+        for stage, stats in result['stages'].items():
+            ref = base['stages'].get(stage)
+            if ref is None:
+                continue
+            if stats['p95'] > ref['p95'] * (1 + tolerance) and stats['p95'] - ref['p95'] > min_delta_ms:
+                regressions.append(f"{key}: {stage} p95 {stats['p95']:.2f} ms > {ref['p95']:.2f} ms")
+    return regressions
+
+
+def print_results(results):
+    for key, result in results.items():
+        print(f"\n{key}: {result['frames']} frames, {result['fps']:.1f} fps")
+        print(f"  {'stage':<11}{'p50':>8}{'p95':>8}{'p99':>8}  (ms)")
+        for stage, stats in result['stages'].items():
+            print(f"  {stage:<11}{stats['p50']:>8.2f}{stats['p95']:>8.2f}{stats['p99']:>8.2f}")
+        for name, stats in result.get('counters', {}).items():
+            # Los contadores de 0/1 por frame (p. ej. keyframes) se leen como fracción de frames
+            digits = 2 if stats['max'] <= 1 else 0
+            print(f"  {name:<11}{stats['mean']:>12.{digits}f} por frame (máx. {stats['max']:.0f})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline del juego con un vídeo grabado")
+    parser.add_argument('--clip', help="Vídeo de entrada (por defecto uno sintético en benchmarks/)")
+    parser.add_argument('--frames', type=int, default=300, help="Frames medidos por caso")
+    parser.add_argument('--warmup', type=int, default=15, help="Frames iniciales que no se miden")
+    parser.add_argument('--tiers', nargs='+', help="Modelos a medir (lite/full/heavy; 'none' = sin inferencia)")
+    parser.add_argument('--heights', nargs='+', type=int, default=[1080], help="Alturas de render")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Guardar los resultados en este JSON")
+    parser.add_argument('--baseline', default=os.path.join(BENCH_DIR, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help="Sustituir el baseline por estos resultados")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Margen antes de marcar una regresión")
+    parser.add_argument('--display', default='null', choices=('null', 'pygame', 'cv2'),
+                        help="Backend de presentación medido")
+    parser.add_argument('--mode', type=int, default=1, choices=(1, 2, 3),
+                        help="Modo de juego (punto de control: 1=cabeza, 2=mano derecha, 3=mano izquierda)")
+    parser.add_argument('--no-tracking', action='store_true',
+                        help="Inferir en cada frame en lugar de seguir el punto con flujo óptico entre fotogramas clave")
+    parser.add_argument('--startup', action='store_true', help="Medir el arranque en frío en lugar del bucle")
+    parser.add_argument('--runs', type=int, default=3, help="Arranques medidos con --startup")
+    parser.add_argument('--startup-child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.startup_child:
+        startup_child(args.clip, args.tiers[0] if args.tiers else 'auto')
+        return 0
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    clip = args.clip
+    if clip is None:
+        frames = args.frames + args.warmup
+        clip = os.path.join(BENCH_DIR, f'synthetic_{args.seed}_{frames}.avi')
+        if not os.path.exists(clip):
+            make_synthetic_clip(clip, frames, seed=args.seed)
+
+    if args.startup:
+        tier = args.tiers[0] if args.tiers else None
+        startup = run_startup(clip, tier, args.runs)
+        print(f"\nArranque en frío ({args.runs} ejecuciones, segundos desde el lanzamiento):")
+        print(f"  {'hito':<14}{'mediana':>9}{'máx':>9}")
+        for name, stats in startup.items():
+            print(f"  {name:<14}{stats['median']:>9.3f}{stats['max']:>9.3f}")
+        if 'game_frame' in startup and 'start_pressed' in startup:
+            print(f"  Desde ESPACIO hasta el primer frame de partida: "
+                  f"{startup['game_frame']['median'] - startup['start_pressed']['median']:.3f} s")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(startup, f, indent=2)
+        return 0
+
+    from config import config
+    # El benchmark elige los modelos él mismo: el juego no debe medirlos al arrancar
+    config.model_tier = None
+    config.display_backend = args.display
+    config.pose_tracking = config.pose_tracking and not args.no_tracking
+    import fruit_game
+    game = fruit_game.FruitCatcherGame()
+    game.play_mode = args.mode
+    game.presenter.open("Fruit Catcher - Benchmark", (game.display_width, game.display_height))
+
+    tiers = args.tiers or game.tier_manager.available() or ['none']
+    results = {}
+    for tier in tiers:
+        for height in args.heights:
+            key = f'{tier}@{height}p' + (f'/{args.display}' if args.display != 'null' else '')
+            key += (f'/modo{args.mode}' if args.mode != 1 else '') + ('/notrack' if not config.pose_tracking else '')
+            print(f"Midiendo {key}...", flush=True)
+            results[key] = run_case(game, clip, tier, height, args.seed, args.warmup, args.frames)
+    game.presenter.close()
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    status = 0
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline guardado en {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nREGRESIONES:")
+            for line in regressions:
+                print(f"  {line}")
+            status = 1
+        else:
+            print("\nSin regresiones respecto al baseline")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
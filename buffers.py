@@ -0,0 +1,42 @@
+import numpy as np
+
+
+class BufferPool:
+    """Buffers de imagen reutilizados entre frames, identificados por nombre.
+
+    Un buffer solo se (re)asigna cuando cambia su forma, así que en régimen
+    estable el pipeline de la cámara no reserva memoria. Lleva la cuenta de
+    las asignaciones y de los bytes copiados desde la última llamada a `take`
+    para poder mostrarlos por frame en el perfilador.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.copied_bytes = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = self._buffers[name] = np.empty(shape, dtype=dtype)
+            self.note_allocation(buffer.nbytes)
+        return buffer
+
+    def note_allocation(self, nbytes, count=1):
+        """Anota asignaciones hechas fuera del pool (p. ej. en el hilo de captura)"""
+        self.allocations += count
+        self.allocated_bytes += nbytes
+
+    def note_copy(self, nbytes):
+        self.copied_bytes += nbytes
+
+    def take(self):
+        """Devuelve (asignaciones, bytes asignados, bytes copiados) y pone los contadores a cero"""
+        counts = (self.allocations, self.allocated_bytes, self.copied_bytes)
+        self.allocations = self.allocated_bytes = self.copied_bytes = 0
+        return counts
+
+    @property
+    def memory_bytes(self):
+        return sum(buffer.nbytes for buffer in self._buffers.values())
@@ -0,0 +1,181 @@
+import collections
+import threading
+import time
+
+import cv2
+
+
+class FrameGrabber:
+    """Lee frames de una cámara o de un vídeo en un hilo aparte y entrega siempre el más nuevo"""
+
+    def __init__(self, source=0, width=None, height=None, fps=30, buffer_size=3, loop=False):
+        # source: índice de cámara (int) o ruta a un fichero de vídeo
+        self.source = source
+        self.width = width
+        self.height = height
+        self.requested_fps = fps
+        self.loop = loop
+        self.is_file = isinstance(source, str) and not source.isdigit()
+
+        self.cap = None
+        self.fps = fps
+        self.finished = False
+
+        # El buffer circular guarda (ranura, timestamp); las ranuras libres las toma el hilo lector.
+        # Las ranuras son buffer_size + 2 arrays que se reutilizan (cap.read escribe en el que se le pasa),
+        # así que capturar no reserva memoria salvo en los primeros frames o si cambia la resolución
+        self._buffer = collections.deque(maxlen=buffer_size)
+        self._slots = [None] * (buffer_size + 2)
+        self._free = list(range(len(self._slots)))
+        self._held = None   # Ranura del último frame entregado
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._active = threading.Event()
+        self._active.set()
+        self._last = (None, 0.0)
+
+        # Estadísticas
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.allocations = 0
+        self.allocated_bytes = 0
+
+    def start(self, first_frame_timeout=5.0):
+        """Abre la fuente y arranca el hilo lector. Devuelve False si no llega ningún frame"""
+        source = int(self.source) if isinstance(self.source, str) and self.source.isdigit() else self.source
+        self.cap = cv2.VideoCapture(source)
+        if not self.cap.isOpened():
+            return False
+
+        if not self.is_file:
+            if self.width:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            if self.height:
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            self.cap.set(cv2.CAP_PROP_FPS, self.requested_fps)
+
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if fps and fps > 0:
+            self.fps = fps
+
+        self._running = True
+        self._thread = threading.Thread(target=self._reader, name="FrameGrabber", daemon=True)
+        self._thread.start()
+
+        # Esperar al primer frame para saber que la fuente funciona de verdad
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffer or self.finished, timeout=first_frame_timeout)
+            return bool(self._buffer)
+
+    def _reader(self):
+        # Los vídeos se reproducen a su velocidad nativa; la cámara marca su propio ritmo
+        period = 1.0 / self.fps if self.is_file else 0.0
+        next_time = time.monotonic()
+        while self._running:
+            # En pausa espera sin gastar CPU (el primer frame se lee igualmente: start() lo necesita)
+            if self.frames_captured and not self._active.is_set():
+                self._active.wait()
+                next_time = time.monotonic()
+                continue
+            with self._cond:
+                slot = self._free.pop()
+            target = self._slots[slot]
+            ret, frame = self.cap.read(target) if target is not None else self.cap.read()
+            if not ret:
+                with self._cond:
+                    self._free.append(slot)
+                if self.is_file and self.loop:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                break
+            if frame is not target:
+                # Primer uso de la ranura o cambio de resolución: OpenCV ha reservado un array nuevo
+                self._slots[slot] = frame
+                with self._cond:
+                    self.allocations += 1
+                    self.allocated_bytes += frame.nbytes
+            if period:
+                next_time += period
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_time = time.monotonic()
+
+            with self._cond:
+                if len(self._buffer) == self._buffer.maxlen:
+                    # El buffer está lleno: el frame más antiguo se pierde sin entregarse
+                    self.frames_dropped += 1
+                    self._free.append(self._buffer.popleft()[0])
+                self._buffer.append((slot, time.monotonic()))
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def read(self, timeout=0.0):
+        """Devuelve (frame, timestamp, is_new) sin bloquear (o esperando como mucho `timeout` s).
+
+        Si no ha llegado ningún frame nuevo se devuelve el último entregado con is_new=False.
+        El frame es válido hasta la siguiente llamada a `read` (su array se reutiliza).
+        """
+        with self._cond:
+            if not self._buffer and timeout > 0 and not self.finished:
+                self._cond.wait(timeout)
+            if not self._buffer:
+                frame, timestamp = self._last
+                return frame, timestamp, False
+            slot, timestamp = self._buffer.pop()
+            # Los frames más viejos que quedaban en el buffer ya no sirven
+            self.frames_dropped += len(self._buffer)
+            self._free.extend(old for old, _ in self._buffer)
+            self._buffer.clear()
+            # La ranura entregada antes queda libre; la nueva no se toca hasta el próximo read()
+            if self._held is not None:
+                self._free.append(self._held)
+            self._held = slot
+            frame = self._slots[slot]
+        self.frames_delivered += 1
+        self._last = (frame, timestamp)
+        return frame, timestamp, True
+
+    def pause(self):
+        """Deja de leer frames (menús): el hilo lector espera sin consumir CPU"""
+        self._active.clear()
+
+    def resume(self):
+        """Vuelve a leer frames; los que quedaban en el buffer desde antes de la pausa se descartan"""
+        if self._active.is_set():
+            return
+        with self._cond:
+            self.frames_dropped += len(self._buffer)
+            self._free.extend(slot for slot, _ in self._buffer)
+            self._buffer.clear()
+        self._active.set()
+
+    def take_allocations(self):
+        """(arrays, bytes) reservados por el hilo lector desde la última llamada"""
+        with self._cond:
+            counts = (self.allocations, self.allocated_bytes)
+            self.allocations = self.allocated_bytes = 0
+        return counts
+
+    @property
+    def exhausted(self):
+        """True cuando la fuente terminó y ya no quedan frames por entregar"""
+        with self._cond:
+            return self.finished and not self._buffer
+
+    def stop(self):
+        self._running = False
+        self._active.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
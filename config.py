@@ -7,13 +7,102 @@ class Config:
         self.game_time = 20     # Duración del juego en segundos (para el juego original)
         self.circle_time = 1    # Duración de cada circulo azul antes de que desaparezca (para el juego original)
         self.circle_time_radius = 15
-        
+
         # Configuración para el juego de frutas
         self.fruit_game_width = 700
         self.fruit_game_height = 500
-        self.fruit_speed = 3              # Velocidad de caída de las frutas
+        self.fruit_speed = 90             # Velocidad inicial de caída de las frutas (px/s)
+        self.max_fruit_speed = 750        # Velocidad máxima de caída (px/s)
+        self.fruit_speed_increment = 15   # Aumento de velocidad por fruta atrapada (px/s)
         self.fruit_interval = 1000        # Intervalo de creación de frutas (ms)
+        self.sim_tick_rate = 60           # Ticks fijos de simulación por segundo (independiente de los FPS)
         self.bomb_probability = 0.2       # Probabilidad de que aparezca una bomba
         self.initial_lives = 3            # Vidas iniciales
 
+        # Captura de cámara
+        self.camera_source = 0            # Índice de la cámara o ruta a un fichero de vídeo
+        self.capture_buffer_size = 3      # Frames guardados en el buffer circular de captura
+
+        # Inferencia de pose
+        self.pose_running_mode = 'live_stream'  # 'live_stream' (asíncrono) o 'video' (síncrono)
+        self.max_inference_fps = 30             # Límite de inferencias de pose por segundo (0 = sin límite)
+        self.inference_height = 480             # Altura de la imagen que recibe el modelo (0 = sin reducir)
+        self.pose_roi_tracking = False          # Buscar solo en una caja alrededor del último punto de control
+        self.pose_roi_padding = (0.3, 0.3)      # Media anchura y media altura de la caja ROI (fracción del ancho y alto del área de juego)
+        self.pose_roi_min_size = 192            # Lado mínimo de la caja ROI (px del área de juego)
+
+        # Seguimiento del punto de control con flujo óptico (Lucas-Kanade) entre inferencias: el modelo de
+        # pose solo se ejecuta cada `pose_keyframe_interval` s, si el punto se pierde o si su visibilidad
+        # baja de `pose_track_min_confidence`
+        self.pose_tracking = True
+        self.pose_keyframe_interval = 0.2       # Segundos máximos entre inferencias mientras el seguimiento va bien
+        self.pose_track_height = 240            # Alto de la imagen en grises en la que se sigue el punto
+        self.pose_track_max_fb_error = 1.5      # Error adelante-atrás (px) a partir del cual el punto se da por perdido
+        self.pose_track_min_confidence = 0.5    # Visibilidad mínima del landmark de control para seguirlo sin redetectar
+
+        # Selección de modelo: 'auto' (según latencia), 'lite', 'full', 'heavy' o None (usar model_path)
+        self.model_tier = 'auto'
+        self.target_inference_latency = 0.033   # Presupuesto de latencia por inferencia (s)
+        self.tier_switch_window = 3.0           # Segundos sostenidos antes de cambiar de modelo en caliente
+        self.tier_benchmark_cache = os.path.join(os.path.dirname(__file__), 'models/tier_benchmark.json')
+
+        # Filtro del punto de control de la cesta: 'one_euro', 'kalman' o 'none'
+        self.control_filter = 'one_euro'
+        self.filter_predict = True              # Extrapolar el punto al instante de render
+        self.filter_max_prediction = 0.1        # Máxima extrapolación (s) más allá de la última medida
+        self.one_euro_min_cutoff = 1.5          # Hz; menor = más suave en reposo
+        self.one_euro_beta = 4.0                # Cuánto sube el corte con la velocidad
+        self.one_euro_d_cutoff = 1.0            # Hz; corte del filtro de la velocidad
+        self.kalman_process_noise = 30.0        # Varianza de la aceleración (unidades normalizadas/s²)
+        self.kalman_measurement_noise = 1e-4    # Varianza del ruido de los landmarks
+
+        # Simulación reproducible: semilla fija (None = aleatoria) y traza de landmarks
+        self.sim_seed = None
+        self.trace_record = None                # Fichero donde grabar la traza (None = no grabar)
+        self.replay_realtime = False            # Reproducir trazas a velocidad original en vez de lo más rápido posible
+
+        # Resolución: el juego se compone a `render_height` (16:9) y la ventana lo escala a `display_height`
+        self.render_height = 1080               # p. ej. 540, 720 o 1080; menos = más FPS en equipos modestos
+        self.display_height = 1080              # Alto de la ventana
+
+        # Sprites preescalados a estas resoluciones de render en un paquete que se mapea en memoria al
+        # arrancar (se reconstruye solo si cambian los PNG); None = decodificar los PNG en cada arranque
+        self.asset_pack = os.path.join(os.path.dirname(__file__), 'assets', 'sprites.pack')
+        self.asset_pack_heights = (540, 720, 1080)
+
+        # Ventana: 'cv2' (HighGUI), 'pygame' (SDL con vsync y volcado solo de las zonas que cambian)
+        # o 'null' (sin ventana, para pruebas)
+        self.display_backend = 'cv2'
+        self.display_vsync = True               # Solo backend 'pygame'
+
+        # Post-proceso CRT: 'off', 'scanlines' (solo filas alternas) o 'full' (scanlines + viñeta)
+        self.crt_quality = 'full'
+
+        # Textos neón rasterizados una vez y reutilizados (se vacía entero al llenarse)
+        self.text_cache_entries = 256
+
+        # Gobernador de calidad: si los frames de partida tardan más de 1 / target_fps de forma sostenida
+        # se aplica el siguiente escalón de `quality_ladder` y se deshace cuando vuelve a sobrar tiempo.
+        # Escalones: ('crt', calidad), ('render_height', alto), ('inference_fps', fps) o ('model', tier);
+        # se ignoran los que no bajan la calidad configurada (los altos de render conviene que estén
+        # en asset_pack_heights)
+        self.quality_governor = True
+        self.target_fps = 30
+        self.quality_ladder = (('crt', 'off'), ('render_height', 720), ('render_height', 540),
+                               ('inference_fps', 15), ('model', 'lite'))
+        self.quality_window = 2.0               # Segundos sostenidos por encima del presupuesto antes de bajar
+        self.quality_headroom = 0.75            # Para subir, 3 ventanas por debajo de headroom / target_fps
+
+        # Perfilado del bucle principal (tecla D para mostrar los percentiles por etapa)
+        self.debug_hud = False                  # Mostrar la tabla de tiempos al arrancar
+        self.profile_window = 600               # Frames guardados para los percentiles
+        self.profile_dump = None                # Prefijo de los .csv/.json de tiempos guardados al salir (None = no guardar)
+
+        # Telemetría de la sesión (log JSONL escrito en segundo plano) y tabla de récords persistente
+        self.telemetry_dir = os.path.join(os.path.dirname(__file__), 'telemetry')  # None = sin log
+        self.telemetry_max_bytes = 10 * 1024 * 1024  # Tamaño a partir del cual rota el log
+        self.telemetry_backups = 5              # Logs rotados que se conservan
+        self.highscore_file = os.path.join(os.path.dirname(__file__), 'highscores.json')  # None = no guardar
+        self.highscore_size = 10                # Puestos de la tabla de récords
+
 config = Config()  # Instancia única
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""Presentación del frame final y lectura del teclado.
+
+Todos los presentadores tienen la misma interfaz:
+
+    presenter.open(titulo, (ancho, alto))   # tamaño de la ventana
+    presenter.present(frame, dirty)         # frame BGR; dirty = [(x, y, w, h), ...] o None (entero)
+    presenter.poll(delay)                   # atiende eventos hasta `delay` ms; tecla pulsada o None
+    presenter.close()
+
+Las teclas se devuelven con el mismo nombre en todos: 'escape', 'space' o el
+carácter en minúsculas ('1', 'm', 'd'...).
+
+Backends (`config.display_backend`):
+  - 'cv2': ventana de HighGUI (cv2.imshow + cv2.waitKey). Sube siempre el
+    frame entero y no sincroniza con el refresco de la pantalla.
+  - 'pygame': ventana SDL. El frame se envuelve sin copia en una Surface
+    (pygame.image.frombuffer) que se reutiliza mientras el buffer sea el
+    mismo, y solo se suben a la textura los rectángulos que han cambiado. La
+    ventana tiene el tamaño pedido en `open` y el renderer de SDL escala la
+    textura a ella en la GPU, con vsync.
+  - 'null': sin ventana, para benchmarks y pruebas: copia el frame (o las
+    zonas que cambian) a un buffer propio, como haría la subida a la GPU.
+"""
+import collections
+import time
+
+import cv2
+import numpy as np
+import pygame
+from pygame._sdl2.video import Renderer, Texture, Window
+
+BACKENDS = ('cv2', 'pygame', 'null')
+
+
+def key_name(code):
+    """Nombre común de un código de tecla de cv2.waitKey (None si no se pulsó ninguna)"""
+    code &= 0xFF
+    if code == 255:
+        return None
+    if code == 27:
+        return 'escape'
+    if code == 32:
+        return 'space'
+    return chr(code).lower()
+
+
+class Cv2Presenter:
+    """Ventana de HighGUI: el comportamiento original del juego"""
+
+    def __init__(self):
+        self.title = None
+
+    def open(self, title, size):
+        self.title = title
+        cv2.namedWindow(title, cv2.WINDOW_NORMAL)
+        # La ventana (WINDOW_NORMAL) hace el único reescalado del render interno al tamaño final
+        cv2.resizeWindow(title, *size)
+
+    def present(self, frame, dirty=None):
+        # HighGUI no admite actualizaciones parciales: siempre se sube el frame entero
+        cv2.imshow(self.title, frame)
+
+    def poll(self, delay=1):
+        return key_name(cv2.waitKey(delay))
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class PygamePresenter:
+    """Ventana SDL con subida sin copia intermedia y volcado solo de las zonas que cambian"""
+
+    def __init__(self, vsync=True):
+        self.vsync = vsync
+        self.window_size = None
+        self.window = None
+        self.renderer = None
+        self._texture = None
+        self._size = None
+        self._source = None   # (identidad del buffer, Surface que lo envuelve)
+        self._keys = collections.deque()
+
+    def open(self, title, size):
+        pygame.display.init()
+        self.window_size = tuple(size)
+        # Ventana del tamaño configurado: el render se sube a una textura y el renderer la escala a la ventana
+        self.window = Window(title, size=self.window_size)
+        try:
+            self.renderer = Renderer(self.window, vsync=self.vsync)
+        except pygame.error:
+            self.renderer = Renderer(self.window)
+
+    def present(self, frame, dirty=None):
+        frame = np.ascontiguousarray(frame)
+        h, w = frame.shape[:2]
+        if self._size != (w, h):
+            self._texture = Texture(self.renderer, (w, h), streaming=True)
+            self._size = (w, h)
+            dirty = None
+        # El buffer de salida del CRT es siempre el mismo: la Surface que lo envuelve solo se crea
+        # cuando cambia el buffer (y mientras la guardamos, el array no se libera)
+        identity = (frame.__array_interface__['data'][0], frame.shape)
+        if self._source is None or self._source[0] != identity:
+            self._source = (identity, pygame.image.frombuffer(frame, (w, h), 'BGR'))
+        source = self._source[1]
+        if dirty is None:
+            self._texture.update(source)
+        else:
+            bounds = source.get_rect()
+            for rect in dirty:
+                rect = bounds.clip(rect)
+                if rect.w and rect.h:
+                    self._texture.update(source.subsurface(rect), rect)
+        # Solo se sube lo que cambia, pero cada presentación dibuja la textura entera escalada a la ventana
+        self._texture.draw()
+        self.renderer.present()
+
+    def _handle(self, event):
+        if event.type == pygame.QUIT:
+            self._keys.append('escape')
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self._keys.append('escape')
+            elif event.key == pygame.K_SPACE:
+                self._keys.append('space')
+            elif event.unicode:
+                self._keys.append(event.unicode.lower())
+
+    def poll(self, delay=1):
+        if not self._keys:
+            events = pygame.event.get()
+            if not events and delay > 1:
+                # Dormir hasta el primer evento o hasta que pase `delay`, como cv2.waitKey
+                event = pygame.event.wait(delay)
+                events = [event] if event.type != pygame.NOEVENT else []
+            for event in events:
+                self._handle(event)
+        return self._keys.popleft() if self._keys else None
+
+    def close(self):
+        self._source = None
+        self._texture = None
+        self.renderer = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+        self._size = None
+        pygame.display.quit()
+
+
+class NullPresenter:
+    """Presentador sin ventana: se queda con una copia del último frame.
+
+    Las teclas se simulan con `press`; `poll` duerme el tiempo pedido como
+    cv2.waitKey (sin acaparar el GIL que usan los hilos de carga).
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.frames = 0
+        self.copied_bytes = 0
+        self._keys = collections.deque()
+
+    def open(self, title, size):
+        pass
+
+    def present(self, frame, dirty=None):
+        if self.frame is None or self.frame.shape != frame.shape:
+            self.frame = np.empty_like(frame)
+            dirty = None
+        if dirty is None:
+            np.copyto(self.frame, frame)
+            self.copied_bytes += frame.nbytes
+        else:
+            for x, y, w, h in dirty:
+                self.frame[y:y + h, x:x + w] = frame[y:y + h, x:x + w]
+                self.copied_bytes += self.frame[y:y + h, x:x + w].nbytes
+        self.frames += 1
+
+    def press(self, *keys):
+        self._keys.extend(keys)
+
+    def poll(self, delay=1):
+        if self._keys:
+            return self._keys.popleft()
+        if delay > 1:
+            time.sleep(delay / 1000)
+        return None
+
+    def close(self):
+        pass
+
+
+def make_presenter(backend, cfg):
+    """Crea el presentador configurado ('cv2', 'pygame' o 'null')"""
+    if backend == 'cv2':
+        return Cv2Presenter()
+    if backend == 'pygame':
+        return PygamePresenter(cfg.display_vsync)
+    if backend == 'null':
+        return NullPresenter()
+    raise ValueError(f"Backend de pantalla desconocido: {backend!r} (opciones: {', '.join(BACKENDS)})")
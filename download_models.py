@@ -1,33 +1,399 @@
-import requests
+"""Descarga los modelos de pose de MediaPipe.
+
+Los modelos se descargan en paralelo. Cada uno se escribe en un `.part` que,
+si la descarga se corta, se reanuda desde donde se quedó (cabecera HTTP
+Range) y que solo se renombra al nombre final cuando está completo y
+coincide con `model_manifest.json`, así que nunca queda en models/ un modelo
+truncado. Si el manifiesto no fija el SHA-256 o el tamaño, se usan los que
+anuncia el servidor en una petición HEAD (Content-Length y el MD5 de
+`x-goog-hash`, que da Google Cloud Storage). Los modelos que ya están y
+verifican no se vuelven a descargar.
+
+    python download_models.py                       # los tres modelos
+    python download_models.py lite full             # solo algunos
+    python download_models.py --base-url http://espejo.local/models/   # espejo local
+    python download_models.py --pin                 # guarda en el manifiesto el hash de lo descargado
+    python download_models.py --self-test           # prueba contra un servidor local de mentira
+"""
+import argparse
+import base64
+import contextlib
+import hashlib
+import http.server
+import io
+import json
 import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 import tqdm
 
-url = {
-    "pose_landmarker_lite.task": "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/latest/pose_landmarker_lite.task",
-    "pose_landmarker_full.task": "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_full/float16/latest/pose_landmarker_full.task",
-    "pose_landmarker_heavy.task": "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_heavy/float16/latest/pose_landmarker_heavy.task"
-}
-
-for key, value in url.items():
-    print(f"Descargando {key} desde {value}")
-    # Crear el directorio de destino si no existe
-    os.makedirs(os.path.join(os.path.dirname(__file__), 'models'), exist_ok=True)
-    # Definir la ruta de destino
-    archivo_destino = os.path.join(os.path.join(os.path.dirname(__file__), 'models'), key)
-
-    if os.path.exists(archivo_destino):
-        print(f"El archivo {archivo_destino} ya existe. Omitiendo descarga.")
-        continue
-
-    # Descargar el archivo
-    response = requests.get(value, stream=True)
-    if response.status_code == 200:
-        with open(archivo_destino, 'wb') as f:
-            total_size = int(response.headers.get('content-length', 0))
-            progress_bar = tqdm.tqdm(total=total_size, unit='iB', unit_scale=True)
-            for chunk in response.iter_content(chunk_size=8192):
-                progress_bar.update(len(chunk))
-                f.write(chunk)
-        print("\nDescarga completada.")
-    else:
-        print(f"\nError al descargar: {response.status_code}")
\ No newline at end of file
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, 'models')
+MANIFEST_PATH = os.path.join(BASE_DIR, 'model_manifest.json')
+TIERS = ('lite', 'full', 'heavy')
+CHUNK_SIZE = 1 << 16
+
+
+class DownloadError(Exception):
+    pass
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """{tier: {'file', 'url', 'sha256', 'size'}}"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def file_digest(path, algorithm='sha256'):
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def remote_info(url, timeout=30):
+    """{'size', 'md5'} que anuncia el servidor para `url` (None los que no da o si no responde)"""
+    info = {'size': None, 'md5': None}
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=timeout)
+    except requests.RequestException:
+        return info
+    if response.status_code != 200:
+        return info
+    length = response.headers.get('content-length')
+    if length is not None and length.isdigit():
+        info['size'] = int(length)
+    # x-goog-hash: crc32c=<base64>, md5=<base64> (puede venir repetida; requests la une con comas)
+    for item in response.headers.get('x-goog-hash', '').split(','):
+        name, _, value = item.strip().partition('=')
+        if name == 'md5' and value:
+            info['md5'] = base64.b64decode(value).hex()
+    return info
+
+
+def checks(sha256=None, size=None, md5=None):
+    """Qué se comprueba con estos datos, o None si no hay nada con que comprobar"""
+    if sha256 is not None:
+        return "SHA-256"
+    if md5 is not None:
+        return "MD5 del servidor"
+    if size is not None:
+        return "solo el tamaño"
+    return None
+
+
+def check_file(path, sha256=None, size=None, md5=None):
+    """None si el fichero coincide con el tamaño y los hashes dados; si no, el motivo"""
+    if not os.path.exists(path):
+        return "no existe"
+    if checks(sha256, size, md5) is None:
+        return "no hay hash ni tamaño con que comprobarlo"
+    if size is not None and os.path.getsize(path) != size:
+        return f"tamaño {os.path.getsize(path)} en vez de {size}"
+    if sha256 is not None and file_digest(path) != sha256:
+        return "el SHA-256 no coincide"
+    if md5 is not None and file_digest(path, 'md5') != md5:
+        return "el MD5 no coincide con el del servidor"
+    return None
+
+
+def download(url, dest, sha256=None, size=None, md5=None, retries=3, timeout=30, position=0, quiet=False):
+    """Descarga `url` en `dest` de forma reanudable y verificada. Devuelve el SHA-256 del fichero.
+
+    Los bytes van a `dest + '.part'`; si ya existe (descarga cortada) se pide
+    solo lo que falta con Range. Si el servidor no admite Range (responde
+    200) se empieza de cero, y si responde 206 con un Content-Range que no
+    empieza donde acaba el `.part` se descarta y se empieza de cero en el
+    siguiente intento. Un `.part` que no verifica se borra y se vuelve a
+    descargar. Lanza DownloadError si se agotan los reintentos.
+    """
+    part_path = dest + '.part'
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(min(2 ** (attempt - 1), 10))
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        expected = size
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 416:
+                    # El .part ya tiene todos los bytes que ofrece el servidor: solo falta verificarlo
+                    expected = offset
+                elif response.status_code in (200, 206):
+                    if response.status_code == 200:
+                        offset = 0
+                    else:
+                        # Content-Range: bytes <inicio>-<fin>/<total>; anexar otro rango corrompería el .part
+                        content_range = response.headers.get('content-range', '')
+                        match = re.match(r'bytes (\d+)-\d+/(\d+|\*)$', content_range.strip())
+                        if match is None or int(match.group(1)) != offset:
+                            os.remove(part_path)
+                            error = f"el servidor devolvió el rango '{content_range}' al pedir desde el byte {offset}"
+                            continue
+                    length = response.headers.get('content-length')
+                    if length is not None:
+                        expected = offset + int(length)
+                    with open(part_path, 'ab' if offset else 'wb') as f, \
+                            tqdm.tqdm(total=expected, initial=offset, unit='B', unit_scale=True, position=position,
+                                      desc=os.path.basename(dest), leave=False, disable=quiet) as progress:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            f.write(chunk)
+                            progress.update(len(chunk))
+                else:
+                    raise DownloadError(f"HTTP {response.status_code} al descargar {url}")
+        except requests.RequestException as e:
+            # Conexión cortada o servidor caído: se reintenta continuando el .part
+            error = f"{type(e).__name__}: {e}"
+            continue
+
+        received = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if expected is not None and received < expected:
+            error = f"descarga incompleta ({received} de {expected} bytes)"
+            continue
+        # Sin tamaño en el manifiesto ni en HEAD vale el que anunció esta respuesta
+        known_size = expected if size is None else size
+        problem = check_file(part_path, sha256, known_size, md5)
+        if problem is not None and checks(sha256, known_size, md5) is not None:
+            # Contenido corrupto o de otra versión: no sirve como base para reanudar
+            os.remove(part_path)
+            error = problem
+            continue
+        digest = sha256 or file_digest(part_path)
+        os.replace(part_path, dest)
+        return digest
+    raise DownloadError(f"{os.path.basename(dest)}: {error}")
+
+
+def self_test():
+    """Prueba la descarga contra un servidor HTTP local que imita al de los modelos. Devuelve 0 si todo pasa"""
+    data = os.urandom(300_000)
+    served = {'/m.task': data}   # Lo que sirve el servidor en cada ruta (se cambia en algunos casos)
+    faults = {}                  # 'cut': bytes tras los que se corta la 1ª respuesta; 'misaligned': 206 desde 0;
+                                 # 'bare': HEAD sin tamaño ni hash; 'advertised': contenido del MD5 anunciado
+    ranges = []                  # Cabeceras Range recibidas
+
+    class StandIn(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _respond(self):
+            body = served.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return None
+            start = 0
+            range_header = self.headers.get('Range')
+            ranges.append(range_header)
+            if range_header is not None:
+                start = 0 if faults.get('misaligned') else int(re.match(r'bytes=(\d+)-', range_header).group(1))
+                if start >= len(body):
+                    self.send_response(416)
+                    self.end_headers()
+                    return None
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')
+            else:
+                self.send_response(200)
+            if not (faults.get('bare') and self.command == 'HEAD'):
+                md5 = base64.b64encode(hashlib.md5(faults.get('advertised', body)).digest()).decode()
+                self.send_header('x-goog-hash', f'crc32c=AAAAAA==,md5={md5}')
+                self.send_header('Content-Length', str(len(body) - start))
+            self.end_headers()
+            return body[start:]
+
+        def do_HEAD(self):
+            self._respond()
+
+        def do_GET(self):
+            body = self._respond()
+            if body is None:
+                return
+            cut = faults.pop('cut', None)
+            if cut is not None:
+                self.wfile.write(body[:cut])
+                self.wfile.flush()
+                self.connection.shutdown(2)
+                return
+            self.wfile.write(body)
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def run(pinned=False, existing=None, part=None, base=base_url):
+        """Ejecuta main() en una carpeta nueva: (código de salida, salida, contenido final o None)"""
+        ranges.clear()
+        with tempfile.TemporaryDirectory() as dest:
+            manifest_path = os.path.join(dest, 'manifest.json')
+            save_manifest({'lite': {'file': 'm.task', 'url': base + '/m.task',
+                                    'sha256': hashlib.sha256(data).hexdigest() if pinned else None,
+                                    'size': len(data) if pinned else None}}, manifest_path)
+            path = os.path.join(dest, 'm.task')
+            for name, content in ((path, existing), (path + '.part', part)):
+                if content is not None:
+                    with open(name, 'wb') as f:
+                        f.write(content)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+                code = main(['lite', '--base-url', base, '--dest', dest, '--manifest', manifest_path, '--retries', '2'])
+            final = None
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    final = f.read()
+            return code, output.getvalue(), final
+
+    results = []
+
+    code, output, final = run(existing=data[:1000])
+    results.append(("fichero truncado sin hash en el manifiesto: HEAD lo detecta y se vuelve a descargar",
+                    code == 0 and final == data and 'ya descargado' not in output))
+
+    code, output, final = run(existing=data[:1000] + bytes(len(data) - 1000))
+    results.append(("mismo tamaño pero distinto contenido: el MD5 de x-goog-hash lo detecta",
+                    code == 0 and final == data))
+
+    code, output, final = run(pinned=True, existing=data)
+    results.append(("modelo completo con SHA-256 fijado: no se descarga y se da por verificado",
+                    code == 0 and final == data and ranges == [] and 'verificado (SHA-256)' in output))
+
+    faults['cut'] = 100_000
+    code, output, final = run(pinned=True)
+    results.append(("descarga cortada: se reanuda con Range desde lo recibido",
+                    code == 0 and final == data and len(ranges) == 2
+                    and re.fullmatch(r'bytes=[1-9]\d*-', ranges[1] or '') is not None))
+
+    code, output, final = run(part=data[:50_000])
+    results.append(("un .part previo se completa pidiendo solo lo que falta",
+                    code == 0 and final == data and ranges[-1] == 'bytes=50000-'))
+
+    faults.update(misaligned=True, bare=True)   # Sin hash con que detectar después el .part corrupto
+    code, output, final = run(part=data[:50_000])
+    faults.clear()
+    results.append(("206 que no empieza donde acaba el .part: se rechaza y se descarga de cero",
+                    code == 0 and final == data and ranges[-1] is None))
+
+    faults['advertised'] = b'otro contenido'
+    code, output, final = run()
+    faults.clear()
+    results.append(("MD5 del servidor que no coincide: la descarga falla y no queda modelo",
+                    code == 1 and final is None))
+
+    served['/m.task'] = data[:-1]
+    code, output, final = run(pinned=True)
+    served['/m.task'] = data
+    results.append(("tamaño distinto del fijado en el manifiesto: la descarga falla",
+                    code == 1 and final is None))
+
+    server.shutdown()
+    server.server_close()
+    code, output, final = run(existing=data[:1000], base=base_url)
+    results.append(("sin servidor ni hash: el fichero se da por presente SIN VERIFICAR, nunca por verificado",
+                    'SIN VERIFICAR' in output and 'verificado (' not in output))
+
+    for name, ok in results:
+        print(f"{'OK   ' if ok else 'FALLO'} {name}")
+    return 0 if all(ok for _, ok in results) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Descarga y verifica los modelos de pose de MediaPipe")
+    parser.add_argument('tiers', nargs='*', metavar='tier',
+                        help=f"Modelos a descargar ({', '.join(TIERS)}; por defecto todos)")
+    parser.add_argument('--jobs', type=int, default=3, help="Descargas simultáneas")
+    parser.add_argument('--dest', default=MODELS_DIR, help="Carpeta de destino")
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help="Manifiesto con URL y SHA-256 de cada modelo")
+    parser.add_argument('--base-url', help="Descargar de este servidor (URL base + nombre del fichero) "
+                                           "en lugar de las URL del manifiesto")
+    parser.add_argument('--retries', type=int, default=3, help="Reintentos por modelo")
+    parser.add_argument('--force', action='store_true', help="Descargar aunque el modelo ya verifique")
+    parser.add_argument('--pin', action='store_true',
+                        help="Guardar en el manifiesto el SHA-256 y el tamaño de los modelos descargados")
+    parser.add_argument('--self-test', action='store_true',
+                        help="Probar la descarga contra un servidor local de mentira (no toca models/)")
+    args = parser.parse_args(argv)
+    if args.self_test:
+        return self_test()
+    unknown = [tier for tier in args.tiers if tier not in TIERS]
+    if unknown:
+        parser.error(f"modelo desconocido: {', '.join(unknown)} (opciones: {', '.join(TIERS)})")
+
+    manifest = load_manifest(args.manifest)
+    tiers = args.tiers or list(TIERS)
+    os.makedirs(args.dest, exist_ok=True)
+
+    jobs = {}
+    for tier in tiers:
+        entry = manifest[tier]
+        path = os.path.join(args.dest, entry['file'])
+        url = args.base_url.rstrip('/') + '/' + entry['file'] if args.base_url else entry['url']
+        expected = {'sha256': entry.get('sha256'), 'size': entry.get('size'), 'md5': None}
+        if expected['sha256'] is None:
+            if not args.pin:
+                print(f"Aviso: {entry['file']} no tiene SHA-256 en el manifiesto; se comprueba con el tamaño y el MD5 "
+                      f"que anuncie el servidor (usa --pin tras una descarga de confianza)")
+            info = remote_info(url)
+            expected['md5'] = info['md5']
+            if expected['size'] is None:
+                expected['size'] = info['size']
+        if not args.force and os.path.exists(path):
+            checked = checks(**expected)
+            if checked is None:
+                # Sin manifiesto ni servidor no hay con qué compararlo, y tampoco de dónde descargarlo
+                print(f"{entry['file']}: ya existe, SIN VERIFICAR (ni el manifiesto ni el servidor dan hash o tamaño)")
+                continue
+            problem = check_file(path, **expected)
+            if problem is None:
+                print(f"{entry['file']}: ya descargado y verificado ({checked})")
+                continue
+            print(f"{entry['file']}: {problem}; se vuelve a descargar")
+        if args.force and os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+        jobs[tier] = (url, path, expected)
+
+    failed = []
+    if jobs:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            futures = {tier: executor.submit(download, url, path, retries=args.retries, position=i, **expected)
+                       for i, (tier, (url, path, expected)) in enumerate(jobs.items())}
+            for tier, future in futures.items():
+                entry = manifest[tier]
+                try:
+                    digest = future.result()
+                except (DownloadError, OSError) as e:
+                    failed.append(tier)
+                    print(f"Error: {e}")
+                    continue
+                checked = checks(**jobs[tier][2]) or "solo el Content-Length de la descarga"
+                print(f"{entry['file']}: descargado ({digest[:12]}…, comprobado: {checked})")
+
+    if args.pin:
+        for tier in tiers:
+            entry = manifest[tier]
+            path = os.path.join(args.dest, entry['file'])
+            if tier not in failed and os.path.exists(path):
+                entry['sha256'] = file_digest(path)
+                entry['size'] = os.path.getsize(path)
+        save_manifest(manifest, args.manifest)
+        print(f"Manifiesto actualizado: {args.manifest}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import bisect
+import collections
+import math
+
+
+class ControlFilter:
+    """Base de los filtros del punto de control (coordenadas normalizadas, tiempo en segundos).
+
+    `update` recibe cada medida con su instante de captura y `predict` devuelve
+    la posición estimada para el instante de render, extrapolando como mucho
+    `max_prediction` segundos más allá de la última medida.
+    """
+
+    # Si pasa más tiempo que esto sin medidas, la siguiente reinicia el filtro
+    RESET_GAP = 0.5
+
+    def __init__(self, max_prediction=0.0):
+        self.max_prediction = max_prediction
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        self.x = None       # Posición filtrada [x, y]
+        self.v = [0.0, 0.0]  # Velocidad estimada [vx, vy] por segundo
+
+    def update(self, point, t):
+        if self.t is None or t - self.t > self.RESET_GAP:
+            self.t = t
+            self.x = [point[0], point[1]]
+            self.v = [0.0, 0.0]
+            return
+        dt = t - self.t
+        if dt <= 0:
+            return
+        self._update(point, dt)
+        self.t = t
+
+    def _update(self, point, dt):
+        raise NotImplementedError
+
+    def predict(self, t):
+        if self.x is None:
+            return None
+        h = min(max(t - self.t, 0.0), self.max_prediction)
+        return (max(0.0, min(1.0, self.x[0] + self.v[0] * h)),
+                max(0.0, min(1.0, self.x[1] + self.v[1] * h)))
+
+
+class PassThroughFilter(ControlFilter):
+    """Sin filtrado ni predicción: la cesta sigue la última medida tal cual"""
+
+    def _update(self, point, dt):
+        self.x = [point[0], point[1]]
+
+    def predict(self, t):
+        if self.x is None:
+            return None
+        return (self.x[0], self.x[1])
+
+
+class OneEuroFilter(ControlFilter):
+    """Filtro One Euro (Casiez et al.): suaviza mucho en reposo y poco en movimientos rápidos"""
+
+    def __init__(self, min_cutoff=1.5, beta=4.0, d_cutoff=1.0, max_prediction=0.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        super().__init__(max_prediction)
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _update(self, point, dt):
+        a_d = self._alpha(dt, self.d_cutoff)
+        for i in (0, 1):
+            raw_v = (point[i] - self.x[i]) / dt
+            self.v[i] = a_d * raw_v + (1 - a_d) * self.v[i]
+            cutoff = self.min_cutoff + self.beta * abs(self.v[i])
+            a = self._alpha(dt, cutoff)
+            self.x[i] = a * point[i] + (1 - a) * self.x[i]
+
+
+class KalmanFilter(ControlFilter):
+    """Kalman de velocidad constante, independiente por eje (estado [posición, velocidad])"""
+
+    def __init__(self, process_noise=30.0, measurement_noise=1e-4, max_prediction=0.0):
+        self.q = process_noise          # Varianza de la aceleración (ruido de proceso)
+        self.r = measurement_noise      # Varianza de la medida
+        super().__init__(max_prediction)
+
+    def reset(self):
+        super().reset()
+        # Covarianza por eje: [p00, p01, p11]
+        self.P = [[1.0, 0.0, 1.0], [1.0, 0.0, 1.0]]
+
+    def _update(self, point, dt):
+        q = self.q
+        dt2 = dt * dt
+        for i in (0, 1):
+            p00, p01, p11 = self.P[i]
+            # Predicción
+            x = self.x[i] + self.v[i] * dt
+            p00 = p00 + 2 * dt * p01 + dt2 * p11 + q * dt2 * dt2 / 4
+            p01 = p01 + dt * p11 + q * dt2 * dt / 2
+            p11 = p11 + q * dt2
+            # Corrección con la medida
+            s = p00 + self.r
+            k0 = p00 / s
+            k1 = p01 / s
+            y = point[i] - x
+            self.x[i] = x + k0 * y
+            self.v[i] += k1 * y
+            self.P[i] = [(1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01]
+
+
+def make_filter(mode, cfg):
+    """Crea el filtro configurado en `config` ('one_euro', 'kalman' o 'none')"""
+    max_prediction = cfg.filter_max_prediction if cfg.filter_predict else 0.0
+    if mode == 'one_euro':
+        return OneEuroFilter(cfg.one_euro_min_cutoff, cfg.one_euro_beta, cfg.one_euro_d_cutoff, max_prediction)
+    if mode == 'kalman':
+        return KalmanFilter(cfg.kalman_process_noise, cfg.kalman_measurement_noise, max_prediction)
+    return PassThroughFilter()
+
+
+class LatencyProbe:
+    """Estima la latencia efectiva del control comparando la salida con las medidas.
+
+    Busca el retardo L que mejor explica la salida en el instante de render t
+    como la medida capturada en t - L (solo eje x, el que controla la cesta).
+    Comparando modos se obtiene la latencia que añade o elimina cada filtro.
+    """
+
+    def __init__(self, window=240, max_lag=0.5, step=0.005):
+        self.raw = collections.deque(maxlen=window)
+        self.out = collections.deque(maxlen=window)
+        self.max_lag = max_lag
+        self.step = step
+
+    def add_raw(self, point, t):
+        self.raw.append((t, point[0]))
+
+    def add_output(self, point, t):
+        self.out.append((t, point[0]))
+
+    def _raw_at(self, times, values, t):
+        i = bisect.bisect_left(times, t)
+        if i <= 0 or i >= len(times):
+            return None
+        t0, t1 = times[i - 1], times[i]
+        w = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+        return values[i - 1] + w * (values[i] - values[i - 1])
+
+    def estimate(self):
+        """Latencia efectiva en segundos (None si aún no hay datos suficientes)"""
+        if len(self.raw) < 10 or len(self.out) < 10:
+            return None
+        times = [t for t, _ in self.raw]
+        values = [x for _, x in self.raw]
+        best_lag, best_err = None, None
+        for n in range(int(self.max_lag / self.step) + 1):
+            lag = n * self.step
+            err, count = 0.0, 0
+            for t, x in self.out:
+                ref = self._raw_at(times, values, t - lag)
+                if ref is not None:
+                    err += abs(ref - x)
+                    count += 1
+            if count >= 10 and (best_err is None or err / count < best_err):
+                best_lag, best_err = lag, err / count
+        return best_lag
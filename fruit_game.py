@@ -1,12 +1,30 @@
+import os
+import random
 import sys
+from concurrent.futures import ThreadPoolExecutor, wait
 import cv2
-import mediapipe as mp
 import numpy as np
 import pygame
-import random
 import time
 from settings import *
 from config import config
+from sprites import SpriteCache, DirtyRects, blit
+from text_cache import NeonTextCache
+from asset_pack import load_game_pack
+from buffers import BufferPool
+from capture import FrameGrabber
+from pose import PoseEstimator
+from preprocess import InferencePreprocessor
+from tracker import FlowTracker
+from filters import LatencyProbe, make_filter
+from model_tiers import ModelTierManager
+from profiler import FrameProfiler, DebugHUD
+from crt import CRTEffect
+from governor import QualityGovernor
+from display import make_presenter
+from landmark_trace import TraceWriter, TraceReader, EVENT_NONE, EVENT_RESTART
+from telemetry import TelemetryLog, HighScoreTable
+from simulation import Simulation, FRUIT_TYPES, CAUGHT, MISSED, BOMB, HEART, GAME_OVER
 
 class FruitCatcherGame:
     def __init__(self):
@@ -14,9 +32,6 @@ class FruitCatcherGame:
         pygame.init()
         pygame.mixer.init()
         
-        # Inicializar display para poder usar convert_alpha()
-        pygame.display.set_mode((1, 1))
-        
         # Cargar música y sonidos
         pygame.mixer.music.load(game_song)
         pygame.mixer.music.set_volume(0.5)
@@ -25,43 +40,32 @@ class FruitCatcherGame:
         self.score_sound = pygame.mixer.Sound(score_sound)
         self.lost_life_sound = pygame.mixer.Sound(lost_life_sound)
         
-        # Escalar imágenes - frutas más grandes y convertir a RGBA para transparencia
-        self.bucket_img = pygame.transform.scale(bucket_img.convert_alpha(), (80, 80))
-        self.fruit_imgs = [pygame.transform.scale(img.convert_alpha(), (60, 60)) for img in fruit_list]
-        # Definir nombres y valores por tipo de fruta (en el mismo orden que `fruit_list` en `settings.py`)
-        # Orden en `settings.py`: apple, banana, strawberry, watermelon
-        self.fruit_types = [
-            {"name": "Manzana", "img": self.fruit_imgs[0], "value": 10},
-            {"name": "Banana", "img": self.fruit_imgs[1], "value": 5},
-            {"name": "Fresa", "img": self.fruit_imgs[2], "value": 15},
-            {"name": "Sandia", "img": self.fruit_imgs[3], "value": 20},
-        ]
-        self.bomb_img = pygame.transform.scale(bomb_img.convert_alpha(), (60, 60))
-        self.heart_img = pygame.transform.scale(heart_img.convert_alpha(), (30, 30))
-        self.heart_falling_img = pygame.transform.scale(heart_img.convert_alpha(), (60, 60))  # Corazón para atrapar
-        self.return_to_menu_img = pygame.transform.scale(return_to_menu, (30, 30))
-        self.volume_img = pygame.transform.scale(volume, (30, 30))
-        self.mute_img = pygame.transform.scale(mute, (30, 30))
-        
-        # Dimensiones fijas para proporción 16:9
-        # La cámara central debe mantener proporción 6:9 (más ancha)
-        self.camera_width = 720  # Ancho de la cámara (proporción 6)
-        self.camera_height = 1080  # Alto de la cámara (proporción 9)
-        
-        # Ventana total en proporción 16:9
-        # Altura = altura de la cámara
-        self.window_height = self.camera_height  # 1080
-        # Ancho = altura * (16/9)
-        self.window_width = int(self.window_height * 16 / 9)  # 1920
-        
-        # Calcular el ancho de los paneles laterales para centrar la cámara
-        total_side_space = self.window_width - self.camera_width
-        self.panel_width = total_side_space // 2  # 600 cada lado
+        # Cache de sprites BGR premultiplicados: salen ya escalados del paquete mapeado en memoria
+        # (asset_pack.py) y, si falta alguno, se decodifica el PNG una sola vez por resolución
+        pack = None
+        if config.asset_pack is not None:
+            pack = load_game_pack(config.asset_pack, sorted({*config.asset_pack_heights, config.render_height}),
+                                  self.DESIGN_HEIGHT)
+        self.sprites = SpriteCache(load_image, pack)
+        # Textos neón ya rasterizados (se vacía al cambiar la resolución de render)
+        self.text_cache = NeonTextCache(config.text_cache_entries)
+        self.fruit_names = ["apple", "banana", "strawberry", "watermelon"]
+        # Buffers reutilizados del pipeline de la cámara y zonas tapadas por los sprites
+        self.buffers = BufferPool()
+        self.sprite_underlay = DirtyRects(buffers=self.buffers)
+
+        # Resolución interna de render (16:9) y tamaño de la ventana, que hace el único reescalado
+        self.display_height = config.display_height
+        self.display_width = int(self.display_height * 16 / 9)
+        # Último frame de cámara ya recortado y escalado (una vista del área de cámara del canvas)
+        # y el área de juego de la que sale, para reescalarla si cambia la resolución de render
+        self.camera_frame = None
+        self.camera_play = None
+        self.configure_layout(config.render_height)
         
         # Variables del juego
         self.is_mute = False
         self.game_started = False
-        self.game_over = False
         self.return_to_menu = False
         
         # Fuentes
@@ -69,168 +73,190 @@ class FruitCatcherGame:
         self.header_font = pygame.font.SysFont(None, 72)
         self.small_font = pygame.font.SysFont(None, 24)
         
-        # Variables de frutas
-        self.created_fruits = []
-        self.last_fruit_time = 0
-        self.base_fruit_interval = 1000  # ms - intervalo base
-        self.fruit_interval = 1000  # ms - intervalo actual (se ajusta dinámicamente)
-        self.fruit_speed = 3
-        self.max_fruit_speed = 25  # Velocidad máxima
-        self.speed_increment = 0.5  # Incremento de velocidad por fruta atrapada
-        
-        # Variables del jugador
-        self.bucket_x = 325  # posición inicial
-        self.score = 0
-        self.lives = 3
-        self.highest_score = 0
+        # Lógica del juego (frutas, cesta, puntos y vidas) sin dependencias de pygame ni OpenCV.
+        # Trabaja siempre en píxeles del diseño de referencia, sea cual sea la resolución de render.
+        # Con la semilla (guardada en las trazas) y las mismas entradas la partida se repite igual
+        self.sim_seed = config.sim_seed if config.sim_seed is not None else random.randrange(2 ** 31)
+        self.sim = Simulation(self.DESIGN_CAMERA_WIDTH, self.DESIGN_HEIGHT, seed=self.sim_seed, clock=time.monotonic,
+                              tick_rate=config.sim_tick_rate, initial_speed=config.fruit_speed,
+                              max_speed=config.max_fruit_speed, speed_increment=config.fruit_speed_increment,
+                              base_interval=config.fruit_interval)
+        # Tabla de récords persistente: la puntuación máxima sobrevive entre sesiones
+        self.highscores = HighScoreTable(config.highscore_file, config.highscore_size)
+        self.sim.highest_score = self.highscores.best
+        # Telemetría de la sesión: solo se activa en run() (el benchmark y los replays no escriben logs)
+        self.telemetry = TelemetryLog()
+        self.game_start_time = 0.0
+        
         # Modo de juego: 1=cabeza, 2=mano derecha, 3=mano izquierda
         self.play_mode = 1
         
-        # MediaPipe setup
-        BaseOptions = mp.tasks.BaseOptions
-        PoseLandmarker = mp.tasks.vision.PoseLandmarker
-        PoseLandmarkerOptions = mp.tasks.vision.PoseLandmarkerOptions
-        VisionRunningMode = mp.tasks.vision.RunningMode
-        
-        self.options = PoseLandmarkerOptions(
-            base_options=BaseOptions(model_asset_path=config.model_path),
-            running_mode=VisionRunningMode.VIDEO,
-            num_poses=1
-        )
+        # Modelo de pose: fijo o el más preciso que cabe en el presupuesto de latencia de esta máquina
+        self.tier_manager = ModelTierManager(os.path.dirname(config.model_path), config.target_inference_latency,
+                                             config.tier_benchmark_cache, config.tier_switch_window)
+        # (con 'auto' la medida se hace en segundo plano durante el menú, ver warm_up_pose)
+        model_path = config.model_path
+        if config.model_tier and config.model_tier != 'auto':
+            model_path = self.tier_manager.model_path(config.model_tier)
         
-        self.mp_pose = mp.solutions.pose
-        self.PoseLandmarker = mp.tasks.vision.PoseLandmarker
+        # MediaPipe setup: inferencia asíncrona (LIVE_STREAM) o síncrona (VIDEO).
+        # El modelo no se carga aquí sino en warm_up_pose
+        self.pose = PoseEstimator(model_path, mode=config.pose_running_mode,
+                                  num_poses=1, max_fps=config.max_inference_fps)
+        # Tareas de arranque en segundo plano (cámara y modelo) e instantes clave del arranque
+        self.startup_tasks = None
+        # Captura de cámara (se crea en run); se pausa en los menús
+        self.stream = None
+        self.starting = False
+        self.start_requested = False
+        self.startup_marks = {}
+        self.last_pose_seq = 0
+        # Últimos landmarks (nariz, muñeca izquierda, muñeca derecha) en coordenadas del área de juego
+        self.landmarks = (None, None, None)
+        self.landmarks_time = 0.0
+        # Grabación de la traza de landmarks (se abre con la primera partida)
+        self.trace_writer = None
+        self.trace_event = EVENT_NONE
+        # Recorte + reducción previos a la inferencia (y seguimiento por ROI opcional)
+        self.preprocessor = InferencePreprocessor(config.inference_height, config.pose_roi_tracking,
+                                                  config.pose_roi_padding, config.pose_roi_min_size,
+                                                  buffers=self.buffers)
+        # Tamaño (ancho, alto) del área de juego recortada antes de escalar
+        self.play_size = None
+        # Seguimiento del punto de control por flujo óptico entre inferencias (None = inferir cada frame)
+        self.tracker = None
+        if config.pose_tracking:
+            self.tracker = FlowTracker(config.pose_keyframe_interval, config.pose_track_height,
+                                       max_fb_error=config.pose_track_max_fb_error,
+                                       min_confidence=config.pose_track_min_confidence,
+                                       min_interval=1 / (config.max_inference_fps or 30))
+        # Landmarks del último fotograma clave (los seguidos solo sustituyen el punto de control)
+        self.pose_landmarks = (None, None, None)
+        # Filtro del punto de control (suavizado + predicción) y medidor de su latencia
+        self.control_filter = make_filter(config.control_filter, config)
+        self.latency_probe = LatencyProbe()
+
+        # Post-proceso CRT: 'off', 'scanlines' o 'full' (se cambia en caliente con la tecla C)
+        self.crt = CRTEffect(config.crt_quality)
+
+        # Tiempos por etapa del bucle (capture → display) y tabla de percentiles en pantalla
+        self.profiler = FrameProfiler(self.PROFILE_STAGES, window=config.profile_window,
+                                      counters=self.PROFILE_COUNTERS)
+        self.debug_hud = DebugHUD(self.profiler)
+        self.debug_hud.visible = config.debug_hud
+
+        # Ventana y teclado ('cv2', 'pygame' o 'null'); el último volcado decide si el siguiente
+        # puede ser parcial (solo las zonas de `dirty_rects`) o tiene que ser el frame entero
+        self.presenter = make_presenter(config.display_backend, config)
+
+        # Gobernador de calidad: se crea al terminar el arranque, cuando ya se sabe qué modelo se usa
+        self.governor = None
+        self.quality_applied = {}
+        self.quality_forced_tier = None     # Modelo impuesto por el gobernador (None = decide el gestor)
+        self.quality_restore_tier = None    # Modelo que había antes de imponerlo
+        self.dirty_rects = []
+        self.presented_layout = None
+        self.presented_hud = None
+
         
+    # Diseño de referencia: todas las posiciones y tamaños del layout están en píxeles de una
+    # ventana 1920x1080 con la cámara de 720x1080 en el centro, y se escalan al render real
+    DESIGN_HEIGHT = 1080
+    DESIGN_CAMERA_WIDTH = 720
+
+    def configure_layout(self, render_height):
+        """Ajusta el layout, los sprites y las capas a una resolución interna de render (16:9)"""
+        self.ui_scale = render_height / self.DESIGN_HEIGHT
+        # Ventana de render en proporción 16:9; la cámara central mantiene proporción 6:9
+        self.window_height = render_height
+        self.window_width = int(render_height * 16 / 9)
+        self.camera_height = render_height
+        self.camera_width = self.px(self.DESIGN_CAMERA_WIDTH)
+        # Paneles laterales para centrar la cámara
+        self.panel_width = (self.window_width - self.camera_width) // 2
+
+        # Los sprites se escalan desde las imágenes originales al tamaño de render
+        px = self.px
+        fruit_sprites = [self.sprites.add(name, (px(60), px(60))) for name in self.fruit_names]
+        fruit_icons = [self.sprites.add(name, (px(36), px(36))) for name in self.fruit_names]
+        self.bucket_sprite = self.sprites.add("bucket", (px(80), px(80)))
+        self.bomb_sprite = self.sprites.add("bomb", (px(60), px(60)))
+        self.heart_sprite = self.sprites.add("heart", (px(30), px(30)))
+        self.heart_falling_sprite = self.sprites.add("heart", (px(60), px(60)))
+
+        # Nombres y valores por tipo de fruta (en el mismo orden que `fruit_names` en `settings.py`)
+        # Orden en `settings.py`: apple, banana, strawberry, watermelon
+        self.fruit_types = [
+            {"name": name, "sprite": sprite, "icon": icon, "value": value}
+            for (name, value), sprite, icon in zip(FRUIT_TYPES, fruit_sprites, fruit_icons)
+        ]
+        # Sprite de cada tipo de objeto de la simulación (frutas, bomba, corazón)
+        self.kind_sprites = fruit_sprites + [self.bomb_sprite, self.heart_falling_sprite]
+
+        # Las capas compuestas a la resolución anterior ya no sirven
+        self.game_canvas = None
+        self.menu_cache = {}
+        self.menu_presented = None
+        self.camera_fresh = False
+        self.sprite_underlay.discard()
+        self.text_cache.clear()
+        if self.camera_frame is not None:
+            # Reescalar la última cámara al nuevo tamaño: sin frame la partida esperaría al siguiente
+            # (hasta 1 s) y con un vídeo terminado se acabaría
+            self.show_camera(self.camera_play)
+
+    def px(self, value):
+        """Convierte una medida del diseño de referencia (1080p) a píxeles de render"""
+        return int(round(value * self.ui_scale))
+
+    def text_width(self, text, font_scale, thickness):
+        """Ancho en píxeles de render de un texto TRIPLEX con escala y grosor del diseño"""
+        (width, _), _ = self.text_cache.text_size(text, cv2.FONT_HERSHEY_TRIPLEX, font_scale * self.ui_scale,
+                                                  max(1, self.px(thickness)))
+        return width
+
     def reset_game(self):
         """Reinicia el juego a su estado inicial"""
-        self.created_fruits = []
-        self.last_fruit_time = 0
-        self.bucket_x = 325
-        self.bucket_y = 200  # Posición vertical de la cesta (en la cabeza)
-        self.score = 0
-        self.lives = 3
-        self.game_over = False
+        self.sim.reset()
         self.return_to_menu = False
-        self.fruit_speed = 3  # Reiniciar velocidad
-        
-    def create_new_fruit(self, frame_width):
-        """Crea nuevas frutas, bombas o corazones que caen"""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_fruit_time >= self.fruit_interval:
-            # Determinar qué tipo de objeto cae
-            rand_val = random.random()
-            
-            # Corazones solo aparecen si el jugador tiene 2 vidas o menos
-            if rand_val < 0.02 and self.lives <= 2:  # 2% probabilidad de corazón (solo si lives <= 2)
-                is_heart = True
-                is_bomb = False
-            elif rand_val < 0.22:  # 20% probabilidad de bomba
-                is_heart = False
-                is_bomb = True
-            else:  # 78% probabilidad de fruta
-                is_heart = False
-                is_bomb = False
-            
-            max_x = frame_width - 60
-            # Seleccionar fruta (si no es bomba/ corazón) y guardar su nombre/valor
-            if is_heart:
-                chosen_img = self.heart_falling_img
-                chosen_name = "Corazón"
-                chosen_value = 0
-            elif is_bomb:
-                chosen_img = self.bomb_img
-                chosen_name = "Bomba"
-                chosen_value = 0
-            else:
-                chosen_type = random.choice(self.fruit_types)
-                chosen_img = chosen_type["img"]
-                chosen_name = chosen_type["name"]
-                chosen_value = chosen_type["value"]
-
-            new_fruit = {
-                "x": random.randint(0, max(max_x, 100)),
-                "y": 0,
-                "img": chosen_img,
-                "is_bomb": is_bomb,
-                "is_heart": is_heart,
-                "name": chosen_name,
-                "value": chosen_value,
-            }
-            self.created_fruits.append(new_fruit)
-            self.last_fruit_time = current_time
-            
-    def update_fruits(self, frame_height):
-        """Actualiza la posición de las frutas y verifica colisiones"""
-        # Ajustar el intervalo de frutas según la velocidad para mantener densidad similar
-        # A mayor velocidad, menor intervalo (más frutas)
-        speed_ratio = self.fruit_speed / 5.0  # Ratio respecto a velocidad inicial
-        self.fruit_interval = max(500, int(self.base_fruit_interval / speed_ratio))  # Mínimo 300ms
-        
-        for fruit in self.created_fruits[:]:
-            fruit["y"] += self.fruit_speed
-            
-            # Verificar colisión
-            if self.check_collision(fruit):
-                if fruit["is_bomb"]:
-                    self.bomb_sound.play()
-                    self.lives -= 1
-                    self.lost_life_sound.play()
-                elif fruit.get("is_heart", False):
-                    # Atrapar corazón: recuperar vida (máximo 3 vidas)
-                    if self.lives < 3:
-                        self.lives += 1
-                        self.score_sound.play()
-                else:
-                    # Atrapar fruta: sumar su valor
+        self.trace_event = EVENT_RESTART
+        self.control_filter.reset()
+        if self.stream is not None:
+            self.stream.resume()
+        if self.tracker is not None:
+            self.tracker.reset()
+        self.game_start_time = time.monotonic()
+        self.telemetry.push('game_start', self.play_mode, self.tier_manager.current)
+        if self.governor is not None:
+            # Los frames del menú y de la partida anterior no cuentan
+            self.governor.pause()
+        
+    def play_event_sounds(self, events):
+        """Reproduce los sonidos correspondientes a los eventos de la simulación"""
+        for event in events:
+            if event["type"] == BOMB:
+                self.bomb_sound.play()
+                self.lost_life_sound.play()
+            elif event["type"] == HEART:
+                if event["life_gained"]:
                     self.score_sound.play()
-                    added = fruit.get("value", 1)
-                    self.score += added
-                    # Incrementar velocidad progresivamente hasta el máximo
-                    if self.fruit_speed < self.max_fruit_speed:
-                        self.fruit_speed += self.speed_increment
-                self.created_fruits.remove(fruit)
-            # Verificar si la fruta salió de la pantalla
-            elif fruit["y"] > frame_height:
-                self.created_fruits.remove(fruit)
-                # Solo perder vida si es una fruta (no bomba ni corazón)
-                if not fruit["is_bomb"] and not fruit.get("is_heart", False):
-                    self.lost_life_sound.play()
-                    self.lives -= 1
-                    
-        # Verificar game over
-        if self.lives <= 0:
-            self.game_over = True
-            if self.score > self.highest_score:
-                self.highest_score = self.score
-                
-    def check_collision(self, fruit):
-        """Verifica si una fruta colisiona con la cesta"""
-        bucket_rect = pygame.Rect(self.bucket_x, self.bucket_y, 80, 80)
-        fruit_rect = pygame.Rect(fruit["x"], fruit["y"], 60, 60)
-        return bucket_rect.colliderect(fruit_rect)
-    
-    def update_bucket_position(self, x_norm, y_norm, frame_width, frame_height, mode=None):
-        """Actualiza la posición de la cesta basándose en coordenadas normalizadas.
-        mode: 1=cabeza, 2=mano derecha, 3=mano izquierda
-        """
-        if x_norm is not None and y_norm is not None:
-            # Mapear la posición normalizada al tamaño del frame
-            self.bucket_x = int(x_norm * frame_width) - 40  # Centrar la cesta
-            # Ajustar verticalmente según el modo
-            if mode == 1 or mode is None:
-                # Cabeza: colocar la cesta encima de la nariz (como antes)
-                offset_y = int(frame_height * 0.25)
-                self.bucket_y = int(y_norm * frame_height) - offset_y
+            elif event["type"] == CAUGHT:
+                self.score_sound.play()
+            elif event["type"] == MISSED:
+                self.lost_life_sound.play()
+
+    def log_events(self, events):
+        """Manda los eventos de la simulación a la telemetría y apunta las partidas terminadas en los récords"""
+        for event in events:
+            if event["type"] == GAME_OVER:
+                rank = self.highscores.add(event["score"], self.play_mode)
+                if rank is not None:
+                    # Guardar el JSON es E/S: lo hace el hilo de la telemetría con una copia de la tabla
+                    self.telemetry.defer(self.highscores.save, list(self.highscores.entries))
+                duration = round(time.monotonic() - self.game_start_time, 2)
+                self.telemetry.push('game_over', event["score"], duration, self.play_mode, rank)
             else:
-                # Mano: colocar la cesta centrada en la palma.
-                # Usamos la coordenada de la muñeca/palma y colocamos la
-                # cesta de modo que su centro vertical coincida con la palma.
-                bucket_h = 80
-                self.bucket_y = int(y_norm * frame_height) - (bucket_h // 2)
-
-            # Limitar dentro de los bordes
-            self.bucket_x = max(0, min(self.bucket_x, frame_width - 80))
-            self.bucket_y = max(0, min(self.bucket_y, frame_height - 80))
+                self.telemetry.push('event', event["type"], event["kind"], self.sim.score, self.sim.lives)
     
     # --- RETRO 80s CONSTANTS ---
     NEON_PINK = (180, 105, 255)      # Hot Pink (BGR)
@@ -240,199 +266,226 @@ class FruitCatcherGame:
     NEON_PURPLE = (255, 0, 255)      # Magenta/Purple (BGR)
     GRID_COLOR = (50, 0, 50)         # Dark Purple for grid
     
-    # Precomputed masks
-    crt_mask = None
-    
-    def _init_crt_masks(self, width, height):
-        """Precalcula las máscaras para el efecto CRT"""
-        # 1. Scanlines (lineas horizontales oscuras)
-        scanline_mask = np.ones((height, width, 3), dtype=np.float32)
-        scanline_mask[1::2, :] = 0.75  # Oscurecer lineas alternas
-        
-        # 2. Vignette (oscurecer bordes)
-        X_result, Y_result = np.meshgrid(np.linspace(-1, 1, width), np.linspace(-1, 1, height))
-        distance_map = np.sqrt(X_result**2 + Y_result**2)
-        vignette_mask = 1 - np.clip(distance_map - 0.4, 0, 1) * 0.6
-        vignette_mask = np.stack([vignette_mask] * 3, axis=2)
-        
-        # Combinar ambas máscaras en una sola
-        self.crt_mask = (scanline_mask * vignette_mask).astype(np.float32)
-
     def draw_neon_text(self, img, text, pos, font_scale, color, thickness=2, font=cv2.FONT_HERSHEY_TRIPLEX):
-        """Dibuja texto con efecto de brillo neon"""
-        x, y = pos
-        # Glow effect (thick dark outline/shadow)
-        cv2.putText(img, text, (x, y), font, font_scale, color, thickness, cv2.LINE_AA)
-        # Inner bright core
-        cv2.putText(img, text, (x, y), font, font_scale, (255, 255, 255), 1, cv2.LINE_AA)
+        """Dibuja texto con efecto de brillo neon (posición en píxeles de render; escala y grosor del diseño)"""
+        # Glow (trazo grueso de color) + núcleo blanco, rasterizados una vez y mezclados como sprite
+        self.text_cache.draw(img, text, pos, font_scale * self.ui_scale, color, max(1, self.px(thickness)), font)
 
     def apply_crt_effect(self, canvas):
-        """Aplica efecto de scanlines y viñeta usando máscara precalculada"""
-        h, w = canvas.shape[:2]
-        
-        # Inicializar máscara si no existe o si cambió el tamaño
-        if self.crt_mask is None or self.crt_mask.shape[:2] != (h, w):
-            self._init_crt_masks(w, h)
-            
-        # Aplicar efectos usando multiplicación rápida
-        # Convertir canvas a float, multiplicar por mascara, y volver a uint8
-        # Optimizacion: cv2.multiply maneja uint8 * float si se usa correctamente, 
-        # pero aquí lo más rápido y seguro en Python puro es:
-        
-        return cv2.multiply(canvas, self.crt_mask, dtype=cv2.CV_8U)
+        """Aplica el efecto CRT con la calidad actual (tecla C) sobre un buffer de salida reutilizado"""
+        display_frame = self.crt.apply(canvas)
+        self.buffers.note_copy(display_frame.nbytes)
+        return display_frame
 
-    def draw_game_overlay(self, frame):
-        """Dibuja los elementos del juego sobre el frame de la cámara con diseño vertical"""
-        h, w = frame.shape[:2]
-        
-        # El frame ya viene recortado a proporción 6:9 y escalado desde el loop principal
-        
-        # Crear canvas con proporción 16:9
+    # Bandas verticales (y0, y1) del panel izquierdo que cambian durante la partida
+    HUD_SCORE_ROWS = (70, 135)
+    HUD_LIVES_ROWS = (235, 400)
+    HUD_SPEED_ROWS = (445, 476)
+
+    # Capas del compositor de la partida
+    game_background = None
+    game_canvas = None
+
+    def _build_game_background(self, cam_w, cam_h):
+        """Prepara la capa estática de la partida: grid, borde de cámara, etiquetas y tabla de valores"""
         total_width = self.window_width
         total_height = self.window_height
-        
-        # Crear canvas negro (fondo retro)
-        canvas = np.zeros((total_height, total_width, 3), dtype=np.uint8)
-        
-        # Dibujar Grid Retro en el fondo (paneles laterales)
-        grid_size = 40
-        # Lineas verticales
+        px = self.px
+        left_x = px(40)
+
+        background = np.zeros((total_height, total_width, 3), dtype=np.uint8)
+
+        # Grid Retro en el fondo (paneles laterales)
+        grid_size = max(px(40), 4)
         for x in range(0, total_width, grid_size):
-            cv2.line(canvas, (x, 0), (x, total_height), self.GRID_COLOR, 1)
-        # Lineas horizontales
+            cv2.line(background, (x, 0), (x, total_height), self.GRID_COLOR, 1)
         for y in range(0, total_height, grid_size):
-            cv2.line(canvas, (0, y), (total_width, y), self.GRID_COLOR, 1)
-            
-        # Colocar el frame de la cámara en el centro
-        # Dibujar borde neon alrededor de la camara
-        cv2.rectangle(canvas, 
-                     (self.panel_width - 5, 0), 
-                     (self.panel_width + w + 5, h), 
+            cv2.line(background, (0, y), (total_width, y), self.GRID_COLOR, 1)
+
+        # Borde neon alrededor de la cámara
+        cv2.rectangle(background,
+                     (self.panel_width - px(5), 0),
+                     (self.panel_width + cam_w + px(5), cam_h),
                      self.NEON_PURPLE, -1)
-        
-        canvas[0:h, self.panel_width:self.panel_width+w] = frame
-        
-        # Dibujar frutas usando el canal alfa (ajustando posición X)
-        for fruit in self.created_fruits:
-            fruit_surface = fruit["img"]
-            
-            y_pos = int(fruit["y"])
-            x_pos = int(fruit["x"]) + self.panel_width  # Ajustar para el panel izquierdo
-            
-            if 0 <= y_pos < h - 60 and self.panel_width <= x_pos < self.panel_width + w - 60:
-                # Obtener array RGBA
-                fruit_rgba = pygame.surfarray.array3d(fruit_surface)
-                fruit_alpha = pygame.surfarray.array_alpha(fruit_surface)
-                
-                # Transponer y convertir RGB a BGR
-                fruit_bgr = cv2.cvtColor(np.transpose(fruit_rgba, (1, 0, 2)), cv2.COLOR_RGB2BGR)
-                alpha = np.transpose(fruit_alpha)
-                
-                # Normalizar alpha a rango 0-1
-                alpha_normalized = alpha.astype(float) / 255.0
-                alpha_3ch = np.stack([alpha_normalized] * 3, axis=2)
-                
-                # Extraer región de interés del canvas
-                roi = canvas[y_pos:y_pos+60, x_pos:x_pos+60]
-                
-                # Mezclar usando alpha blending
-                blended = (fruit_bgr * alpha_3ch + roi * (1 - alpha_3ch)).astype(np.uint8)
-                canvas[y_pos:y_pos+60, x_pos:x_pos+60] = blended
-    
-        # Dibujar cesta usando el canal alfa (ajustando posición X)
-        y_pos = int(self.bucket_y)
-        x_pos = int(self.bucket_x) + self.panel_width  # Ajustar para el panel izquierdo
-        
-        if 0 <= y_pos < h - 80 and self.panel_width <= x_pos < self.panel_width + w - 80:
-            bucket_rgba = pygame.surfarray.array3d(self.bucket_img)
-            bucket_alpha = pygame.surfarray.array_alpha(self.bucket_img)
-            
-            bucket_bgr = cv2.cvtColor(np.transpose(bucket_rgba, (1, 0, 2)), cv2.COLOR_RGB2BGR)
-            alpha = np.transpose(bucket_alpha)
-            
-            alpha_normalized = alpha.astype(float) / 255.0
-            alpha_3ch = np.stack([alpha_normalized] * 3, axis=2)
-            
-            roi = canvas[y_pos:y_pos+80, x_pos:x_pos+80]
-            blended = (bucket_bgr * alpha_3ch + roi * (1 - alpha_3ch)).astype(np.uint8)
-            canvas[y_pos:y_pos+80, x_pos:x_pos+80] = blended
-        
-        # === PANEL IZQUIERDO: Puntuación y Vidas ===
-        left_x = 40
-        
-        # Titulo SCORE
-        self.draw_neon_text(canvas, 'SCORE', (left_x, 60), 1.0, self.NEON_CYAN)
-        # Valor SCORE
-        self.draw_neon_text(canvas, f'{self.score:05d}', (left_x, 120), 1.5, self.NEON_PINK)
-
-        # Vidas debajo de la puntuación
-        self.draw_neon_text(canvas, 'LIVES', (left_x, 200), 1.0, self.NEON_CYAN)
-        
-        for i in range(self.lives):
-            y_heart = 240 + i * 50
-            if y_heart < total_height - 30:
-                heart_size = 30
-                heart_large = pygame.transform.scale(self.heart_img, (heart_size, heart_size))
-                heart_rgba = pygame.surfarray.array3d(heart_large)
-                heart_alpha = pygame.surfarray.array_alpha(heart_large)
-                heart_bgr = cv2.cvtColor(np.transpose(heart_rgba, (1, 0, 2)), cv2.COLOR_RGB2BGR)
-                alpha = np.transpose(heart_alpha)
-                alpha_normalized = alpha.astype(float) / 255.0
-                alpha_3ch = np.stack([alpha_normalized] * 3, axis=2)
-                x_heart_pos = left_x + 10
-                roi = canvas[y_heart:y_heart+heart_size, x_heart_pos:x_heart_pos+heart_size]
-                blended = (heart_bgr * alpha_3ch + roi * (1 - alpha_3ch)).astype(np.uint8)
-                canvas[y_heart:y_heart+heart_size, x_heart_pos:x_heart_pos+heart_size] = blended
-
-        # Mostrar la velocidad
-        self.draw_neon_text(canvas, 'SPEED', (left_x, 420), 0.8, self.NEON_CYAN)
-        # Barra de velocidad retro
-        bar_width = 150
-        bar_height = 20
-        fill_width = int((self.fruit_speed / self.max_fruit_speed) * bar_width)
-        cv2.rectangle(canvas, (left_x, 450), (left_x + bar_width, 450 + bar_height), (50, 50, 50), -1) # Fondo barra
-        cv2.rectangle(canvas, (left_x, 450), (left_x + fill_width, 450 + bar_height), self.NEON_YELLOW, -1) # Relleno
-        cv2.rectangle(canvas, (left_x, 450), (left_x + bar_width, 450 + bar_height), (255, 255, 255), 2) # Borde
+
+        # Etiquetas del panel izquierdo
+        self.draw_neon_text(background, 'SCORE', (left_x, px(60)), 1.0, self.NEON_CYAN)
+        self.draw_neon_text(background, 'LIVES', (left_x, px(200)), 1.0, self.NEON_CYAN)
+        self.draw_neon_text(background, 'SPEED', (left_x, px(420)), 0.8, self.NEON_CYAN)
 
         # === LISTA DE PUNTUACIONES POR FRUTA ===
-        self.draw_neon_text(canvas, 'VALUES', (left_x, 520), 0.8, self.NEON_CYAN)
-        
+        self.draw_neon_text(background, 'VALUES', (left_x, px(520)), 0.8, self.NEON_CYAN)
+
         start_y = 560
         row_h = 50
         for idx, ftype in enumerate(self.fruit_types):
-            y_row = start_y + idx * row_h
-            if y_row + 40 >= total_height:
+            y_row = px(start_y + idx * row_h)
+            if y_row + px(40) >= total_height:
                 break
             # Dibujar icono
-            icon_size = 36
-            icon = pygame.transform.scale(ftype["img"], (icon_size, icon_size))
-            icon_rgba = pygame.surfarray.array3d(icon)
-            icon_alpha = pygame.surfarray.array_alpha(icon)
-            icon_bgr = cv2.cvtColor(np.transpose(icon_rgba, (1, 0, 2)), cv2.COLOR_RGB2BGR)
-            alpha = np.transpose(icon_alpha)
-            alpha_normalized = alpha.astype(float) / 255.0
-            alpha_3ch = np.stack([alpha_normalized] * 3, axis=2)
+            icon_size = px(36)
             x_icon = left_x
-            roi = canvas[y_row:y_row+icon_size, x_icon:x_icon+icon_size]
-            blended = (icon_bgr * alpha_3ch + roi * (1 - alpha_3ch)).astype(np.uint8)
-            canvas[y_row:y_row+icon_size, x_icon:x_icon+icon_size] = blended
+            blit(background, ftype["icon"], x_icon, y_row)
 
             # Texto
-            text_x = x_icon + icon_size + 15
-            self.draw_neon_text(canvas, f'{ftype["value"]} PTS', (text_x, y_row + 26), 0.6, self.NEON_GREEN)
+            text_x = x_icon + icon_size + px(15)
+            self.draw_neon_text(background, f'{ftype["value"]} PTS', (text_x, y_row + px(26)), 0.6, self.NEON_GREEN)
+
+        self.game_background = background
+        # El canvas se reutiliza entre frames; parte de una copia del fondo
+        self.game_canvas = background.copy()
+        self.game_canvas_size = (cam_w, cam_h)
+        # Vista del área de cámara: la cámara se escala directamente aquí
+        self.camera_view = self.game_canvas[0:cam_h, self.panel_width:self.panel_width + cam_w]
+        self.hud_state = {}
+        self.sprite_underlay.discard()
+        self.presented_layout = None
+
+    def _update_hud_region(self, name, value, rows, draw):
+        """Redibuja una banda del HUD solo si su valor ha cambiado desde el último frame"""
+        if self.hud_state.get(name) == value:
+            return
+        y0, y1 = self.px(rows[0]), self.px(rows[1])
+        # Restaurar la banda desde el fondo estático y dibujar el nuevo valor encima
+        self.game_canvas[y0:y1, :self.panel_width] = self.game_background[y0:y1, :self.panel_width]
+        draw(self.game_canvas)
+        self.hud_state[name] = value
+        self.dirty_rects.append((0, y0, self.panel_width, y1 - y0))
+
+    def _draw_score(self, canvas):
+        # El marcador cambia a menudo: se compone desde el atlas de dígitos en vez de cachear cada valor
+        self.text_cache.draw_digits(canvas, f'{self.sim.score:05d}', (self.px(40), self.px(120)),
+                                    1.5 * self.ui_scale, self.NEON_PINK, max(1, self.px(2)))
+
+    def _draw_lives(self, canvas):
+        for i in range(self.sim.lives):
+            y_heart = self.px(240 + i * 50)
+            if y_heart < self.window_height - self.px(30):
+                blit(canvas, self.heart_sprite, self.px(50), y_heart)
+
+    def _draw_speed_bar(self, canvas):
+        px = self.px
+        left_x, top = px(40), px(450)
+        bar_width = px(150)
+        bar_height = px(20)
+        fill_width = int((self.sim.fruit_speed / self.sim.max_fruit_speed) * bar_width)
+        cv2.rectangle(canvas, (left_x, top), (left_x + bar_width, top + bar_height), (50, 50, 50), -1) # Fondo barra
+        cv2.rectangle(canvas, (left_x, top), (left_x + fill_width, top + bar_height), self.NEON_YELLOW, -1) # Relleno
+        cv2.rectangle(canvas, (left_x, top), (left_x + bar_width, top + bar_height), (255, 255, 255), max(1, px(2))) # Borde
+
+    # Etapas del bucle principal que mide el perfilador (en orden de ejecución)
+    # ('submit' es el envío a MediaPipe: casi nada en LIVE_STREAM, la inferencia entera en modo VIDEO)
+    PROFILE_STAGES = ('capture', 'preprocess', 'track', 'submit', 'inference', 'landmarks', 'simulation', 'compose',
+                      'crt', 'display')
+    # Memoria por frame: arrays reservados, bytes reservados y bytes de imagen copiados;
+    # y frames enviados al modelo de pose (con seguimiento, solo los fotogramas clave)
+    PROFILE_COUNTERS = ('allocs', 'alloc_bytes', 'copy_bytes', 'keyframes')
+
+    def camera_viewport(self):
+        """Vista del canvas de la partida donde va la cámara (crea las capas si hace falta)"""
+        if self.game_canvas is None or self.game_canvas_size != (self.camera_width, self.camera_height):
+            self._build_game_background(self.camera_width, self.camera_height)
+        return self.camera_view
+
+    def draw_game_overlay(self, frame=None):
+        """Dibuja los elementos del juego sobre el frame de la cámara con diseño vertical.
+
+        Normalmente `process_camera_frame` ya ha escalado la cámara dentro del
+        canvas; si no llegó frame nuevo solo se restauran las zonas que tapaban
+        los sprites del frame anterior. Cualquier otro `frame` (del tamaño del
+        área de cámara) se copia entero.
+        """
+        view = self.camera_viewport()
+        canvas = self.game_canvas
+        h, w = view.shape[:2]
+
+        if frame is not None and frame is not self.camera_frame:
+            np.copyto(view, frame)
+            self.buffers.note_copy(view.nbytes)
+            self.sprite_underlay.discard()
+        elif self.camera_fresh:
+            # La cámara nueva ya ha sobrescrito los sprites del frame anterior
+            self.sprite_underlay.discard()
+        else:
+            self.buffers.note_copy(self.sprite_underlay.restore(canvas))
+        self.camera_fresh = False
+        # Zonas del canvas que cambian en este frame: el área de cámara y las bandas del HUD redibujadas
+        self.dirty_rects.clear()
+        self.dirty_rects.append((self.panel_width, 0, w, h))
+        
+        # Las frutas y la cesta se recortan al área de la cámara
+        camera_clip = (self.panel_width, 0, self.panel_width + w, h)
+        underlay = self.sprite_underlay
+
+        # Dibujar frutas con los sprites premultiplicados (ajustando posición X),
+        # interpoladas entre los dos últimos ticks de simulación y escaladas al render
+        scale = self.ui_scale
+        x, _, kind, _, alive = self.sim.objects.active()
+        y = self.sim.render_y()
+        live = alive.nonzero()[0]
+        xs = (x[live] * scale + self.panel_width).astype(int).tolist()  # Ajustar para el panel izquierdo
+        ys = (y[live] * scale).astype(int).tolist()
+        for x_pos, y_pos, k in zip(xs, ys, kind[live].tolist()):
+            sprite = self.kind_sprites[k]
+            underlay.save(canvas, x_pos, y_pos, sprite.width, sprite.height, camera_clip)
+            blit(canvas, sprite, x_pos, y_pos, camera_clip)
+
+        # Dibujar cesta (ajustando posición X)
+        bucket_x = self.px(self.sim.bucket_x) + self.panel_width
+        bucket_y = self.px(self.sim.bucket_y)
+        underlay.save(canvas, bucket_x, bucket_y, self.bucket_sprite.width, self.bucket_sprite.height, camera_clip)
+        blit(canvas, self.bucket_sprite, bucket_x, bucket_y, camera_clip)
+        self.buffers.note_copy(underlay.nbytes)
+        
+        # === PANEL IZQUIERDO: solo se repintan las bandas cuyo valor cambió ===
+        self._update_hud_region('score', self.sim.score, self.HUD_SCORE_ROWS, self._draw_score)
+        self._update_hud_region('lives', self.sim.lives, self.HUD_LIVES_ROWS, self._draw_lives)
+        self._update_hud_region('speed', self.sim.fruit_speed, self.HUD_SPEED_ROWS, self._draw_speed_bar)
         
-        # Aplicar efecto CRT final
-        return self.apply_crt_effect(canvas)
+        return canvas
     
-    def draw_start_screen(self):
+    # Periodo (ms) del texto parpadeante de los menús
+    BLINK_PERIOD = 500
+    # Pantallas de menú guardadas antes de vaciar la cache
+    MENU_CACHE_SIZE = 16
+
+    def menu_screen(self, ticks):
+        """Pantalla de inicio o de game over para el instante `ticks` (ms) y su estado visual.
+
+        Solo se compone si su estado (fase del parpadeo, modo elegido o
+        puntuaciones) no está ya en la cache.
+        """
+        # En los menús no se usa la cámara: el hilo de captura deja de decodificar hasta la partida
+        if self.stream is not None:
+            self.stream.pause()
+        blink = (ticks // self.BLINK_PERIOD) % 2 == 0
+        if not self.game_started:
+            state = ('start', blink, self.play_mode, self.starting, self.start_requested, self.window_width,
+                     self.window_height)
+        else:
+            state = ('game_over', blink, self.sim.score, self.sim.highest_score, self.window_width, self.window_height)
+        canvas = self.menu_cache.get(state)
+        if canvas is None:
+            if len(self.menu_cache) >= self.MENU_CACHE_SIZE:
+                self.menu_cache.clear()
+            if not self.game_started:
+                canvas = self.draw_start_screen(blink)
+            else:
+                canvas = self.draw_game_over_screen(blink)
+            self.menu_cache[state] = canvas
+        return canvas, state
+
+    def draw_start_screen(self, blink=None):
         """Dibuja la pantalla de inicio con estilo retro"""
+        if blink is None:
+            blink = (pygame.time.get_ticks() // self.BLINK_PERIOD) % 2 == 0
         h = self.window_height
         w = self.window_width
         
         canvas = np.zeros((h, w, 3), dtype=np.uint8)
         
         # Grid de fondo
-        grid_size = 50
+        grid_size = max(self.px(50), 4)
         for x in range(0, w, grid_size):
             cv2.line(canvas, (x, 0), (x, h), self.GRID_COLOR, 1)
         for y in range(0, h, grid_size):
@@ -442,33 +495,38 @@ class FruitCatcherGame:
 
         # Title
         title = 'FRUIT CATCHER'
-        (t_w, t_h), _ = cv2.getTextSize(title, cv2.FONT_HERSHEY_TRIPLEX, 3.0, 5)
-        self.draw_neon_text(canvas, title, (center_x - t_w // 2, 250), 3.0, self.NEON_PINK, 5)
+        t_w = self.text_width(title, 3.0, 5)
+        self.draw_neon_text(canvas, title, (center_x - t_w // 2, self.px(250)), 3.0, self.NEON_PINK, 5)
 
         # Subtitle
         subtitle = 'RETRO EDITION'
-        (s_w, s_h), _ = cv2.getTextSize(subtitle, cv2.FONT_HERSHEY_TRIPLEX, 1.5, 3)
-        self.draw_neon_text(canvas, subtitle, (center_x - s_w // 2, 320), 1.5, self.NEON_CYAN, 3)
+        s_w = self.text_width(subtitle, 1.5, 3)
+        self.draw_neon_text(canvas, subtitle, (center_x - s_w // 2, self.px(320)), 1.5, self.NEON_CYAN, 3)
 
-        # Blinking "INSERT COIN" (Press Space)
-        if (pygame.time.get_ticks() // 500) % 2 == 0:
-            msg = 'PRESS SPACE TO START'
-            (m_w, m_h), _ = cv2.getTextSize(msg, cv2.FONT_HERSHEY_TRIPLEX, 1.2, 2)
-            self.draw_neon_text(canvas, msg, (center_x - m_w // 2, 500), 1.2, self.NEON_YELLOW, 2)
+        # Blinking "INSERT COIN" (Press Space); mientras cargan la cámara y el modelo, aviso de carga
+        if blink:
+            if not self.starting:
+                msg = 'PRESS SPACE TO START'
+            elif self.start_requested:
+                msg = 'GET READY...'
+            else:
+                msg = 'LOADING...'
+            m_w = self.text_width(msg, 1.2, 2)
+            self.draw_neon_text(canvas, msg, (center_x - m_w // 2, self.px(500)), 1.2, self.NEON_YELLOW, 2)
 
         # Instructions
         instr1 = 'MOVE HEAD TO CONTROL BUCKET'
         instr2 = 'AVOID BOMBS!'
-        (i1_w, _), _ = cv2.getTextSize(instr1, cv2.FONT_HERSHEY_TRIPLEX, 0.8, 2)
-        (i2_w, _), _ = cv2.getTextSize(instr2, cv2.FONT_HERSHEY_TRIPLEX, 0.8, 2)
+        i1_w = self.text_width(instr1, 0.8, 2)
+        i2_w = self.text_width(instr2, 0.8, 2)
         
-        self.draw_neon_text(canvas, instr1, (center_x - i1_w // 2, 600), 0.8, self.NEON_GREEN)
-        self.draw_neon_text(canvas, instr2, (center_x - i2_w // 2, 650), 0.8, self.NEON_GREEN)
+        self.draw_neon_text(canvas, instr1, (center_x - i1_w // 2, self.px(600)), 0.8, self.NEON_GREEN)
+        self.draw_neon_text(canvas, instr2, (center_x - i2_w // 2, self.px(650)), 0.8, self.NEON_GREEN)
 
         # Exit
         exit_msg = 'PRESS ESC TO EXIT'
-        (e_w, _), _ = cv2.getTextSize(exit_msg, cv2.FONT_HERSHEY_TRIPLEX, 0.7, 1)
-        self.draw_neon_text(canvas, exit_msg, (center_x - e_w // 2, 800), 0.7, (200, 200, 200))
+        e_w = self.text_width(exit_msg, 0.7, 1)
+        self.draw_neon_text(canvas, exit_msg, (center_x - e_w // 2, self.px(800)), 0.7, (200, 200, 200))
 
         # Modes
         m_start_y = 860
@@ -479,20 +537,22 @@ class FruitCatcherGame:
         ]
         for i, mode_text in enumerate(modes):
             color = self.NEON_GREEN if self.play_mode == (i+1) else (100, 100, 100)
-            (mw, _), _ = cv2.getTextSize(mode_text, cv2.FONT_HERSHEY_TRIPLEX, 0.8, 2)
-            self.draw_neon_text(canvas, mode_text, (center_x - mw // 2, m_start_y + i*40), 0.8, color)
+            mw = self.text_width(mode_text, 0.8, 2)
+            self.draw_neon_text(canvas, mode_text, (center_x - mw // 2, self.px(m_start_y + i*40)), 0.8, color)
         
-        return self.apply_crt_effect(canvas)
+        return canvas
     
-    def draw_game_over_screen(self):
+    def draw_game_over_screen(self, blink=None):
         """Dibuja la pantalla de game over retro"""
+        if blink is None:
+            blink = (pygame.time.get_ticks() // self.BLINK_PERIOD) % 2 == 0
         h = self.window_height
         w = self.window_width
         
         canvas = np.zeros((h, w, 3), dtype=np.uint8)
         
         # Grid
-        grid_size = 50
+        grid_size = max(self.px(50), 4)
         for x in range(0, w, grid_size):
             cv2.line(canvas, (x, 0), (x, h), self.GRID_COLOR, 1)
         for y in range(0, h, grid_size):
@@ -502,228 +562,601 @@ class FruitCatcherGame:
 
         # GAME OVER
         title = 'GAME OVER'
-        (t_w, t_h), _ = cv2.getTextSize(title, cv2.FONT_HERSHEY_TRIPLEX, 3.0, 5)
-        self.draw_neon_text(canvas, title, (center_x - t_w // 2, 250), 3.0, (0, 0, 255), 5) # Red Neon
+        t_w = self.text_width(title, 3.0, 5)
+        self.draw_neon_text(canvas, title, (center_x - t_w // 2, self.px(250)), 3.0, (0, 0, 255), 5) # Red Neon
 
         # Scores
-        score_text = f'SCORE: {self.score}'
-        best_text = f'HIGH SCORE: {self.highest_score}'
+        score_text = f'SCORE: {self.sim.score}'
+        best_text = f'HIGH SCORE: {self.sim.highest_score}'
         
-        (sc_w, _), _ = cv2.getTextSize(score_text, cv2.FONT_HERSHEY_TRIPLEX, 1.5, 3)
-        (b_w, _), _ = cv2.getTextSize(best_text, cv2.FONT_HERSHEY_TRIPLEX, 1.5, 3)
+        sc_w = self.text_width(score_text, 1.5, 3)
+        b_w = self.text_width(best_text, 1.5, 3)
         
-        self.draw_neon_text(canvas, score_text, (center_x - sc_w // 2, 400), 1.5, self.NEON_CYAN)
-        self.draw_neon_text(canvas, best_text, (center_x - b_w // 2, 460), 1.5, self.NEON_YELLOW)
+        self.draw_neon_text(canvas, score_text, (center_x - sc_w // 2, self.px(400)), 1.5, self.NEON_CYAN)
+        self.draw_neon_text(canvas, best_text, (center_x - b_w // 2, self.px(460)), 1.5, self.NEON_YELLOW)
 
         # Retry
-        if (pygame.time.get_ticks() // 500) % 2 == 0:
+        if blink:
             retry = 'PRESS SPACE TO RETRY'
-            (r_w, _), _ = cv2.getTextSize(retry, cv2.FONT_HERSHEY_TRIPLEX, 1.2, 2)
-            self.draw_neon_text(canvas, retry, (center_x - r_w // 2, 600), 1.2, self.NEON_GREEN)
+            r_w = self.text_width(retry, 1.2, 2)
+            self.draw_neon_text(canvas, retry, (center_x - r_w // 2, self.px(600)), 1.2, self.NEON_GREEN)
 
-        return self.apply_crt_effect(canvas)
+        return canvas
     
+    def extract_landmarks(self, result):
+        """Devuelve las coordenadas normalizadas (x, y) de nariz, muñeca izquierda y muñeca derecha"""
+        nose = None
+        left_wrist = None
+        right_wrist = None
+        if result is not None and result.pose_landmarks:
+            for person_landmarks in result.pose_landmarks:
+                # Landmark 0 es la nariz; 15 y 16 son muñecas (left=15, right=16)
+                if len(person_landmarks) > 0:
+                    nose = (person_landmarks[0].x, person_landmarks[0].y)
+                if len(person_landmarks) > 15:
+                    left_wrist = (person_landmarks[15].x, person_landmarks[15].y)
+                if len(person_landmarks) > 16:
+                    right_wrist = (person_landmarks[16].x, person_landmarks[16].y)
+        return nose, left_wrist, right_wrist
+
+    def play_area(self, w_original, h_original):
+        """Rectángulo (x0, y0, ancho, alto) del área de juego 6:9 centrada en un frame"""
+        target_aspect = 6 / 9  # Proporción 6:9 (más ancha que 9:14)
+        current_aspect = w_original / h_original
+        
+        if current_aspect > target_aspect:
+            # Frame es más ancho, recortar los lados
+            new_width = int(h_original * target_aspect)
+            return ((w_original - new_width) // 2, 0, new_width, h_original)
+        # Frame es más alto, recortar arriba y abajo
+        new_height = int(w_original / target_aspect)
+        return (0, (h_original - new_height) // 2, w_original, new_height)
+
+    def play_landmarks(self, result, roi):
+        """Nariz y muñecas normalizadas al área de juego (deshaciendo el recorte de la ROI)"""
+        if roi is None or self.play_size is None:
+            return (None, None, None)
+        return tuple(self.preprocessor.to_play_coords(point, roi, *self.play_size)
+                     for point in self.extract_landmarks(result))
+
+    def control_point(self, landmarks):
+        """Punto de control de la cesta según el modo de juego (normalizado al área de juego)"""
+        nose, left_wrist, right_wrist = landmarks
+        if self.play_mode == 1:
+            point = nose
+        elif self.play_mode == 2:
+            # Player selected 'mano derecha' — use the LEFT wrist adjusted
+            # because the camera image is mirrored; this makes the
+            # basket follow the player's real right hand on screen.
+            point = left_wrist
+        elif self.play_mode == 3:
+            # Player selected 'mano izquierda' — use the RIGHT wrist adjusted
+            point = right_wrist
+        else:
+            point = None
+        return point
+
+    def process_camera_frame(self, frame, frame_time):
+        """Recorta y voltea el frame, envía una versión reducida a la inferencia y lo escala al área de cámara.
+
+        Sin copias intermedias: solo se voltea el recorte (a un buffer reutilizado),
+        y el escalado escribe directamente en el área de cámara del canvas.
+        """
+        # Recortar a proporción 6:9 ANTES de voltear y de la inferencia: el modelo solo ve el área de juego.
+        # El recorte de la imagen volteada en x0 es el recorte de la original en w - x0 - ancho
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0, play_w, play_h = self.play_area(frame_w, frame_h)
+        crop = frame[y0:y0 + play_h, frame_w - x0 - play_w:frame_w - x0]
+        play = self.buffers.get('play', (play_h, play_w, 3))
+        cv2.flip(crop, 1, dst=play)
+        self.buffers.note_copy(play.nbytes)
+        self.play_size = (play_w, play_h)
+        self.profiler.lap('preprocess')
+        
+        # Propagar el punto de control hasta este frame con flujo óptico
+        if self.tracker is not None:
+            self.tracker.add_frame(play, frame_time)
+            self.profiler.lap('track')
+        
+        # Enviar a MediaPipe (reducido y, en modo ROI, solo la caja alrededor del jugador)
+        # con la marca de tiempo real de captura. En LIVE_STREAM no bloquea: el resultado
+        # se recoge más tarde con pose.latest() junto con la ROI usada
+        # (sin estimador, p. ej. en el benchmark de solo render, no se envía nada).
+        # Con seguimiento solo se envían los fotogramas clave
+        if self.pose is not None and self.pose.ready() and \
+                (self.tracker is None or self.tracker.wants_keyframe(frame_time)):
+            inference_img, roi = self.preprocessor.prepare(play)
+            self.profiler.lap('preprocess')
+            if self.pose.submit(inference_img, frame_time, meta=roi):
+                self.profiler.count('keyframes', 1)
+                if self.tracker is not None:
+                    self.tracker.requested(frame_time)
+            self.profiler.lap('submit')
+        
+        self.show_camera(play)
+
+    def show_camera(self, play=None):
+        """Escala el área de juego para que ocupe toda la altura de la ventana, dentro del canvas (None = en negro)"""
+        view = self.camera_viewport()
+        if play is None:
+            view[...] = 0
+        elif view.shape == play.shape:
+            view[...] = play
+        else:
+            cv2.resize(play, (view.shape[1], view.shape[0]), dst=view, interpolation=cv2.INTER_LINEAR)
+        self.buffers.note_copy(view.nbytes)
+        self.camera_play = play
+        self.camera_frame = view
+        self.camera_fresh = True
+
+    def record_buffer_stats(self, stream=None):
+        """Pasa al perfilador las asignaciones y copias del frame (incluidas las del hilo de captura)"""
+        if stream is not None:
+            allocations, nbytes = stream.take_allocations()
+            if allocations:
+                self.buffers.note_allocation(nbytes, allocations)
+        allocations, allocated, copied = self.buffers.take()
+        self.profiler.count('allocs', allocations)
+        self.profiler.count('alloc_bytes', allocated)
+        self.profiler.count('copy_bytes', copied)
+
+    def update_from_pose(self, now):
+        """Mueve la cesta con el punto de control filtrado y extrapolado al instante de render `now`.
+
+        Devuelve True si ha llegado un resultado de pose nuevo.
+        """
+        result, capture_time, seq, roi = self.pose.latest()
+        fresh = seq != self.last_pose_seq
+        if fresh:
+            self.last_pose_seq = seq
+            landmarks = self.play_landmarks(result, roi)
+            if self.tracker is None:
+                point = self.update_landmarks(landmarks, capture_time)
+                # Si se pierde el punto, la siguiente inferencia vuelve a buscar en el área completa
+                self.preprocessor.update_track(point)
+            else:
+                # Fotograma clave: el seguidor corrige el punto y lo entrega con el resto de frames
+                self.pose_landmarks = landmarks
+                self.tracker.keyframe(self.control_point(landmarks), capture_time, self.control_confidence(result))
+            # La inferencia corre fuera del bucle: se anota su duración cuando llega el resultado
+            self.profiler.record('inference', self.pose.last_inference_time)
+            
+            # Cambiar de modelo en caliente si la latencia se sale del presupuesto de forma sostenida
+            # (salvo mientras el gobernador de calidad tenga impuesto uno)
+            if config.model_tier == 'auto' and self.quality_forced_tier is None:
+                self.tier_manager.observe(self.pose.last_inference_time, now)
+                tier = self.tier_manager.check(now)
+                if tier is not None:
+                    print(f"Cambiando a modelo de pose: {tier}")
+                    self.pose.swap_model(self.tier_manager.model_path(tier))
+                    self.telemetry.push('tier', tier)
+        
+        if self.tracker is not None:
+            self.follow_tracker()
+        self.steer(now)
+        return fresh
+
+    def follow_tracker(self):
+        """Usa como medida el punto seguido en el último frame (una vez por frame, como un resultado de pose)"""
+        tracked = self.tracker.take()
+        if tracked is None:
+            return
+        point, frame_time = tracked
+        # La traza guarda la medida como cualquier otra, así que el replay no necesita el seguidor
+        landmarks = list(self.pose_landmarks)
+        if self.play_mode in (1, 2, 3):
+            landmarks[self.play_mode - 1] = point
+        point = self.update_landmarks(tuple(landmarks), frame_time)
+        self.preprocessor.update_track(point)
+
+    # Índice del landmark de MediaPipe que da el punto de control en cada modo (ver control_point)
+    CONTROL_LANDMARKS = {1: 0, 2: 15, 3: 16}
+
+    def control_confidence(self, result):
+        """Visibilidad (0-1) que da MediaPipe al landmark de control; 0 si no se ha detectado"""
+        index = self.CONTROL_LANDMARKS.get(self.play_mode)
+        if index is None or result is None or not result.pose_landmarks or len(result.pose_landmarks[0]) <= index:
+            return 0.0
+        visibility = result.pose_landmarks[0][index].visibility
+        return 1.0 if visibility is None else visibility
+
+    def update_landmarks(self, landmarks, capture_time):
+        """Registra una medida nueva de pose y alimenta el filtro con el punto de control"""
+        self.landmarks = landmarks
+        self.landmarks_time = capture_time
+        point = self.control_point(landmarks)
+        if point is not None:
+            self.control_filter.update(point, capture_time)
+            self.latency_probe.add_raw(point, capture_time)
+        return point
+
+    def steer(self, now):
+        """Coloca la cesta en el punto filtrado y extrapolado al instante de render `now`"""
+        point = self.control_filter.predict(now)
+        if point is not None:
+            self.latency_probe.add_output(point, now)
+            self.sim.set_control(point[0], point[1], mode=self.play_mode)
+
+    def start_governor(self):
+        """Crea el gobernador con los escalones de config.quality_ladder que bajan la calidad actual"""
+        if not config.quality_governor:
+            return
+        base = {'crt': self.crt.quality, 'render_height': self.window_height,
+                'inference_fps': config.max_inference_fps, 'model': None}
+        ladder = [(knob, value) for knob, value in config.quality_ladder if self._degrades(knob, value, base)]
+        if not ladder:
+            return
+        self.governor = QualityGovernor(ladder, base, config.target_fps, config.quality_window,
+                                        config.quality_headroom)
+        self.quality_applied = dict(base)
+        self.debug_hud.status = f"quality {self.governor.describe()}"
+
+    def _degrades(self, knob, value, base):
+        """True si el escalón (knob, value) baja la calidad respecto a `base`"""
+        if knob == 'crt':
+            return CRTEffect.QUALITIES.index(value) < CRTEffect.QUALITIES.index(base['crt'])
+        if knob == 'render_height':
+            return value < base['render_height']
+        if knob == 'inference_fps':
+            return 0 < value and (base['inference_fps'] == 0 or value < base['inference_fps'])
+        if knob == 'model':
+            tiers = ModelTierManager.TIERS
+            current = self.tier_manager.current
+            return (current is not None and value in self.tier_manager.available()
+                    and tiers.index(value) > tiers.index(current))
+        raise ValueError(f"Escalón de calidad desconocido: {knob!r}")
+
+    def apply_quality(self, level):
+        """Aplica los ajustes de un nivel del gobernador (solo los que cambian) y lo registra"""
+        for knob, value in self.governor.settings(level).items():
+            if self.quality_applied.get(knob) == value:
+                continue
+            self.quality_applied[knob] = value
+            if knob == 'crt':
+                self.crt.quality = value
+            elif knob == 'render_height':
+                self.configure_layout(value)
+            elif knob == 'inference_fps':
+                self.pose.max_fps = value
+            elif knob == 'model':
+                self.force_tier(value)
+        description = self.governor.describe(level)
+        frame_ms = round(self.governor.trigger_frame_time * 1000, 2)
+        print(f"Calidad: nivel {description}, {frame_ms:.1f} ms/frame")
+        self.debug_hud.status = f"quality {description}"
+        step = '='.join(map(str, self.governor.ladder[level - 1])) if level else None
+        self.telemetry.push('quality', level, step, frame_ms)
+
+    def force_tier(self, tier):
+        """Impone un modelo de pose o, con None, devuelve el que había y el control al gestor de modelos"""
+        if tier is None:
+            tier = self.quality_restore_tier
+            self.quality_forced_tier = None
+        else:
+            if self.quality_forced_tier is None:
+                self.quality_restore_tier = self.tier_manager.current
+            self.quality_forced_tier = tier
+        if tier is not None and tier != self.tier_manager.current:
+            print(f"Cambiando a modelo de pose: {tier}")
+            self.tier_manager.force(tier, time.monotonic())
+            self.pose.swap_model(self.tier_manager.model_path(tier))
+            self.telemetry.push('tier', tier)
+
+    def warm_up_pose(self):
+        """Elige el modelo, lo carga y hace una inferencia de calentamiento (en segundo plano, durante el menú)"""
+        inference_height = config.inference_height or self.DESIGN_HEIGHT
+        inference_size = (inference_height * 6 // 9, inference_height)
+        if config.model_tier == 'auto':
+            tier = self.tier_manager.select(inference_size)
+            if tier is not None:
+                self.pose.model_path = self.tier_manager.model_path(tier)
+                print(f"Modelo de pose: {tier} ({self.tier_manager.benchmarks[tier] * 1000:.1f} ms)")
+        self.pose.open()
+        return self.pose.warm_up(inference_size)
+
+    def begin_startup(self, stream):
+        """Abre la cámara y prepara el modelo en hilos aparte mientras se muestra el menú"""
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="Startup")
+        self.startup_tasks = (executor.submit(stream.start), executor.submit(self.warm_up_pose))
+        executor.shutdown(wait=False)
+
+    def startup_state(self):
+        """'loading' mientras siguen las tareas de arranque, 'ready' o un mensaje de error"""
+        if self.startup_tasks is None:
+            return 'ready'
+        camera, pose = self.startup_tasks
+        if not (camera.done() and pose.done()):
+            return 'loading'
+        if camera.exception() is not None or not camera.result():
+            return "No se pudo abrir la cámara"
+        if pose.exception() is not None:
+            return f"No se pudo cargar el modelo de pose: {pose.exception()}"
+        return 'ready'
+
+    def mark_startup(self, name):
+        """Guarda (solo la primera vez) el instante de un hito del arranque (time.time, para compararlo entre procesos)"""
+        self.startup_marks.setdefault(name, time.time())
+
+    def start_game(self):
+        self.game_started = True
+        self.start_requested = False
+        self.mark_startup('start')
+        # reset_game también reanuda la captura (en pausa desde el menú)
+        self.reset_game()
+
     def run(self):
         """Loop principal del juego"""
         win_name = "Fruit Catcher - Camera Edition"
-        with self.PoseLandmarker.create_from_options(self.options) as landmarker:
-            cap = cv2.VideoCapture(0)
-            
-            if not cap.isOpened():
-                print("Error: No se pudo abrir la cámara")
-                return
-            
-            # Configurar resolución de la cámara con proporción 6:9
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_width)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_height)
-            
-            # Configurar FPS a 30
-            cap.set(cv2.CAP_PROP_FPS, 30)
-            
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            if fps == 0:
-                fps = 30  # Forzar 30 FPS si la cámara no devuelve un valor válido
-            
-            frame_ms = int(1000 / fps)
-            timestamp = 0
-            
-            # Reproducir música
-            if not self.is_mute:
-                pygame.mixer.music.play(-1)
-            
-            # Configurar ventana con proporción 16:9
-            cv2.namedWindow(win_name, cv2.WINDOW_NORMAL)
-            cv2.resizeWindow(win_name, self.window_width, self.window_height)
-            
-            while True:
-                canvas = None
-                if self.game_started and not self.game_over:
-                    # Leer y procesar frame de cámara solo durante el juego
-                    ret, frame = cap.read()
-                    if not ret:
+        # Captura en un hilo aparte: el bucle nunca espera a la cámara
+        # (la captura se pide al tamaño de diseño: no depende de la resolución de render)
+        stream = self.stream = FrameGrabber(config.camera_source, self.DESIGN_CAMERA_WIDTH, self.DESIGN_HEIGHT,
+                                            fps=30, buffer_size=config.capture_buffer_size)
+        
+        # Arranque escalonado: el menú sale enseguida y, mientras el jugador lo mira, se abre
+        # la cámara y se carga y calienta el modelo de pose. ESPACIO solo arranca la partida
+        # cuando ambos están listos (si se pulsa antes, se espera a que terminen)
+        self.begin_startup(stream)
+        
+        # Log de la sesión en segundo plano (nunca bloquea el bucle)
+        self.telemetry = TelemetryLog(config.telemetry_dir, config.telemetry_max_bytes,
+                                      config.telemetry_backups).start()
+        
+        # Reproducir música
+        if not self.is_mute:
+            pygame.mixer.music.play(-1)
+        
+        # Configurar ventana con proporción 16:9
+        self.presenter.open(win_name, (self.display_width, self.display_height))
+        
+        profiler = self.profiler
+        self.starting = True
+        while True:
+            profiler.begin()
+            if self.starting:
+                state = self.startup_state()
+                if state != 'loading':
+                    self.starting = False
+                    if state != 'ready':
+                        print(f"Error: {state}")
                         break
-                    
-                    # Voltear frame horizontalmente
-                    frame = cv2.flip(frame, 1)
-                    
-                    # Convertir a formato MediaPipe
-                    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
-                    
-                    # Detectar pose
-                    result = landmarker.detect_for_video(mp_image, timestamp)
-                    timestamp += frame_ms
-                    
-                    # Obtener posición de la nariz y muñecas si hay detección
-                    nose_x = None
-                    nose_y = None
-                    left_wrist_x = None
-                    left_wrist_y = None
-                    right_wrist_x = None
-                    right_wrist_y = None
-                    if result.pose_landmarks:
-                        for person_landmarks in result.pose_landmarks:
-                            # Landmark 0 es la nariz
-                            try:
-                                nose = person_landmarks[0]
-                                nose_x = nose.x
-                                nose_y = nose.y
-                            except Exception:
-                                nose_x = None
-                                nose_y = None
-                            # Landmarks 15 y 16 son muñecas (left=15, right=16)
-                            try:
-                                lw = person_landmarks[15]
-                                left_wrist_x = lw.x
-                                left_wrist_y = lw.y
-                            except Exception:
-                                left_wrist_x = None
-                                left_wrist_y = None
-                            try:
-                                rw = person_landmarks[16]
-                                right_wrist_x = rw.x
-                                right_wrist_y = rw.y
-                            except Exception:
-                                right_wrist_x = None
-                                right_wrist_y = None
-                    
-                    # Recortar frame a proporción 6:9 ANTES de procesar el juego
-                    h_original, w_original = frame.shape[:2]
-                    target_aspect = 6 / 9  # Proporción 6:9 (más ancha que 9:14)
-                    current_aspect = w_original / h_original
-                    
-                    start_x = 0
-                    start_y = 0
-                    
-                    if current_aspect > target_aspect:
-                        # Frame es más ancho, recortar los lados
-                        new_width = int(h_original * target_aspect)
-                        start_x = (w_original - new_width) // 2
-                        frame = frame[:, start_x:start_x+new_width]
-                    else:
-                        # Frame es más alto, recortar arriba y abajo
-                        new_height = int(w_original / target_aspect)
-                        start_y = (h_original - new_height) // 2
-                        frame = frame[start_y:start_y+new_height, :]
-                    
-                    # Ajustar coordenadas de nariz y muñecas al frame recortado
-                    def adjust_norm_coords(norm_x, norm_y):
-                        if norm_x is None or norm_y is None:
-                            return None, None
-                        x_pixel = norm_x * w_original
-                        y_pixel = norm_y * h_original
-                        adj_x = (x_pixel - start_x) / frame.shape[1]
-                        adj_y = (y_pixel - start_y) / frame.shape[0]
-                        adj_x = max(0.0, min(1.0, adj_x))
-                        adj_y = max(0.0, min(1.0, adj_y))
-                        return adj_x, adj_y
-
-                    nose_x_adjusted, nose_y_adjusted = adjust_norm_coords(nose_x, nose_y)
-                    left_wrist_x_adjusted, left_wrist_y_adjusted = adjust_norm_coords(left_wrist_x, left_wrist_y)
-                    right_wrist_x_adjusted, right_wrist_y_adjusted = adjust_norm_coords(right_wrist_x, right_wrist_y)
-                    
-                    # Escalar el frame para que ocupe toda la altura de la ventana
-                    h_before_scale = frame.shape[0]
-                    w_before_scale = frame.shape[1]
-                    scale_factor = 1.0
-                    
-                    if h_before_scale != self.window_height:
-                        scale_factor = self.window_height / h_before_scale
-                        new_width = int(w_before_scale * scale_factor)
-                        frame = cv2.resize(frame, (new_width, self.window_height), interpolation=cv2.INTER_LINEAR)
-                    
-                    # Actualizar posición de la cesta con dimensiones escaladas según modo seleccionado
-                    chosen_x = None
-                    chosen_y = None
-                    if self.play_mode == 1:
-                        chosen_x, chosen_y = nose_x_adjusted, nose_y_adjusted
-                    elif self.play_mode == 2:
-                        # Player selected 'mano derecha' — use the LEFT wrist adjusted
-                        # because the camera image is mirrored; this makes the
-                        # basket follow the player's real right hand on screen.
-                        chosen_x, chosen_y = left_wrist_x_adjusted, left_wrist_y_adjusted
-                    elif self.play_mode == 3:
-                        # Player selected 'mano izquierda' — use the RIGHT wrist adjusted
-                        chosen_x, chosen_y = right_wrist_x_adjusted, right_wrist_y_adjusted
-
-                    if chosen_x is not None and chosen_y is not None:
-                        self.update_bucket_position(chosen_x, chosen_y, frame.shape[1], frame.shape[0], mode=self.play_mode)
-                    
-                    # Crear y actualizar frutas con el ancho del frame escalado
-                    self.create_new_fruit(frame.shape[1])
-                    self.update_fruits(frame.shape[0])
-                    
-                    # Dibujar overlay del juego
-                    canvas = self.draw_game_overlay(frame)
-                else:
-                    # Pantallas de inicio o game over, sin cámara
-                    if not self.game_started:
-                        canvas = self.draw_start_screen()
-                    else:
-                        canvas = self.draw_game_over_screen()
-                
-                # Simplemente mostrar el canvas sin intentar obtener el tamaño de la ventana
-                # (compatible con todas las versiones de OpenCV)
-                display_frame = canvas
-                
-                # Mostrar frame
-                
-                # Calcular y mostrar FPS
-                current_ticks = cv2.getTickCount()
-                fps_calc = cv2.getTickFrequency() / (current_ticks - timestamp_fps_start) if 'timestamp_fps_start' in locals() else 30.0
-                timestamp_fps_start = current_ticks
+                    self.mark_startup('ready')
+                    self.start_governor()
+                    self.telemetry.push('session', self.sim_seed, self.window_height, self.tier_manager.current,
+                                        self.crt.quality)
+                    if self.start_requested:
+                        self.start_game()
+            
+            canvas = None
+            fresh_pose = None
+            if self.game_started and not self.sim.game_over:
+                # Tomar el frame más reciente de la cámara (sin bloquear)
+                # (solo se espera si todavía no hay ningún frame procesado)
+                frame, frame_time, is_new = stream.read(timeout=1.0 if self.camera_frame is None else 0.0)
+                profiler.lap('capture')
+                if is_new:
+                    self.process_camera_frame(frame, frame_time)
+                    profiler.lap('preprocess')
+                elif stream.exhausted or self.camera_frame is None:
+                    break
                 
-                cv2.putText(display_frame, f"FPS: {int(fps_calc)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                # Consumir el último resultado de pose disponible (sin esperar a la inferencia)
+                now = time.monotonic()
+                fresh_pose = self.update_from_pose(now)
+                if config.trace_record:
+                    self.record_trace(now)
+                profiler.lap('landmarks')
                 
-                cv2.imshow(win_name, display_frame)
+                # La simulación avanza en ticks fijos según el tiempo real, no según los FPS
+                events = self.sim.advance(now)
+                self.play_event_sounds(events)
+                self.log_events(events)
+                profiler.lap('simulation')
                 
-                # Manejar teclas
-                key = cv2.waitKey(1) & 0xFF
+                # Dibujar overlay del juego (con el último frame procesado si no llegó uno nuevo)
+                canvas = self.draw_game_overlay(self.camera_frame)
+                self.menu_presented = None
+            else:
+                # Pantallas de inicio o game over, sin cámara: solo se recomponen si cambia algo
+                ticks = pygame.time.get_ticks()
+                canvas, state = self.menu_screen(ticks)
+                state = (state, self.crt.quality)
+                if state == self.menu_presented and not self.debug_hud.visible:
+                    canvas = None
+                self.menu_presented = state
+            profiler.lap('compose')
+            if canvas is not None:
+                key = self.present(canvas, self.dirty_rects if fresh_pose is not None else None)
+                self.mark_startup('game_frame' if fresh_pose is not None else 'menu_frame')
+            else:
+                # La ventana ya muestra este estado: dormir hasta el próximo parpadeo o una tecla
+                # (durante la carga se despierta más a menudo para empezar en cuanto esté lista)
+                delay = self.BLINK_PERIOD - ticks % self.BLINK_PERIOD
+                key = self.presenter.poll(min(delay, 50) if self.starting else delay)
+            self.record_buffer_stats(stream)
+            if fresh_pose is not None:
+                # Tiempo del frame de juego y, si llegó un resultado nuevo, su inferencia y latencia
+                inference = (round(self.pose.last_inference_time * 1000, 2),
+                             round(self.pose.last_latency * 1000, 2)) if fresh_pose else (None, None)
+                self.telemetry.push('frame', round(profiler.elapsed() * 1000, 2), *inference)
+                # Bajar o subir la calidad según el tiempo de frame sostenido
+                if self.governor is not None:
+                    self.governor.observe(profiler.elapsed(), now)
+                    level = self.governor.check(now)
+                    if level is not None:
+                        self.apply_quality(level)
 
-                if key == 27:  # ESC
-                    break
-                elif key == 32:  # ESPACIO
-                    if not self.game_started:
-                        self.game_started = True
-                        self.reset_game()
-                    elif self.game_over:
-                        self.reset_game()
-                        self.game_over = False  # Asegurar que no esté en game over
-                # Selección de modo en pantalla de inicio (1,2,3)
-                elif not self.game_started and key in (ord('1'), ord('2'), ord('3')):
-                    sel = int(chr(key))
-                    if sel in (1, 2, 3):
-                        self.play_mode = sel
-                elif key == ord('m') or key == ord('M'):  # Mute/Unmute
-                    self.is_mute = not self.is_mute
-                    if self.is_mute:
-                        pygame.mixer.music.stop()
+            if key == 'escape':
+                break
+            elif key == 'space':
+                if not self.game_started:
+                    self.mark_startup('start_pressed')
+                    if self.starting:
+                        # Se empieza en cuanto terminen de cargarse la cámara y el modelo
+                        self.start_requested = True
                     else:
-                        pygame.mixer.music.play(-1)
+                        self.start_game()
+                elif self.sim.game_over:
+                    self.reset_game()
+            # Selección de modo en pantalla de inicio (1,2,3)
+            elif not self.game_started and key in ('1', '2', '3'):
+                self.play_mode = int(key)
+            elif key == 'd':  # Tabla de tiempos por etapa
+                self.debug_hud.toggle()
+            elif key == 'c':  # Calidad del efecto CRT
+                print(f"Efecto CRT: {self.crt.cycle()}")
+                if self.governor is not None:
+                    # La elección del jugador pasa a ser la calidad base del gobernador
+                    self.governor.base['crt'] = self.quality_applied['crt'] = self.crt.quality
+            elif key == 'm':  # Mute/Unmute
+                self.is_mute = not self.is_mute
+                if self.is_mute:
+                    pygame.mixer.music.stop()
+                else:
+                    pygame.mixer.music.play(-1)
+        
+        # Si se sale durante la carga, se espera a que terminen las tareas antes de cerrar lo que abrieron
+        wait(self.startup_tasks)
+        stream.stop()
+        self.pose.close()
+        self.shutdown()
+
+    def present(self, canvas, dirty=None):
+        """Aplica el CRT, dibuja el HUD de depuración, muestra el frame y devuelve la tecla pulsada.
+
+        `dirty`: zonas del canvas que han cambiado desde el frame anterior (None = todo). Solo se
+        usan si el frame anterior salió del mismo canvas con el mismo CRT; si no, se vuelca entero.
+        """
+        display_frame = self.apply_crt_effect(canvas)
+        self.profiler.lap('crt')
+        
+        # FPS y, si está activa (tecla D), la tabla de tiempos por etapa
+        hud = self.debug_hud.draw(display_frame)
+        
+        # El CRT trabaja píxel a píxel, así que las zonas sin cambios del canvas tampoco cambian a la salida
+        layout = (id(canvas), display_frame.shape, self.crt.quality)
+        rects = None
+        if dirty is not None and layout == self.presented_layout:
+            # El HUD se redibuja cada frame; también hay que borrar lo que tapaba el anterior
+            rects = dirty + [hud, self.presented_hud]
+        self.presented_layout = layout if dirty is not None else None
+        self.presented_hud = hud
+        self.presenter.present(display_frame, rects)
+        
+        # Manejar teclas
+        key = self.presenter.poll(1)
+        self.profiler.lap('display')
+        return key
+
+    def shutdown(self):
+        """Cierra ventana, traza, telemetría y audio y guarda las estadísticas de la sesión"""
+        self.presenter.close()
+        
+        self.telemetry.push('session_end', self.profiler.frames, self.telemetry.records_dropped)
+        self.telemetry.close()
+        
+        if self.trace_writer is not None:
+            self.trace_writer.close()
+            print(f"Traza de landmarks guardada en {self.trace_writer.path} ({self.trace_writer.records} frames)")
+        
+        if config.profile_dump:
+            self.profiler.dump(config.profile_dump)
+            print(f"Tiempos por etapa guardados en {config.profile_dump}.csv/.json")
+        
+        latency = self.latency_probe.estimate()
+        if latency is not None:
+            print(f"Latencia efectiva del control ({config.control_filter}): {latency * 1000:.0f} ms")
+        if self.tracker is not None and self.tracker.frames:
+            print(f"Seguimiento por flujo óptico: {self.tracker.keyframes} inferencias en {self.tracker.frames} frames, "
+                  f"{self.tracker.losses} pérdidas")
+        pygame.quit()
+
+    def record_trace(self, now):
+        """Añade a la traza el frame actual: instante, última medida de pose, modo y reinicios"""
+        if self.trace_writer is None:
+            self.trace_writer = TraceWriter(config.trace_record, self.sim_seed, (self.sim.width, self.sim.height))
+        self.trace_writer.write(now, self.landmarks_time, self.play_mode, self.landmarks, self.trace_event)
+        self.trace_event = EVENT_NONE
+
+    def run_replay(self, path):
+        """Juega una traza grabada sin cámara ni MediaPipe.
+
+        Cada registro es un frame: se repiten los reinicios, el modo, las medidas
+        de pose y los instantes de render originales, así que con la misma
+        semilla la partida es idéntica. Sin `replay_realtime` los frames se
+        procesan tan rápido como permiten la simulación y el render.
+        """
+        win_name = "Fruit Catcher - Replay"
+        trace = TraceReader(path)
+        self.sim.rng = random.Random(trace.seed)
+        self.sim.width, self.sim.height = trace.play_size
+        # Sin cámara el área de juego queda en negro
+        self.show_camera()
+        self.game_started = True
+
+        self.presenter.open(win_name, (self.display_width, self.display_height))
+        
+        profiler = self.profiler
+        start = time.perf_counter()
+        previous = None
+        for record in trace.records:
+            profiler.begin()
+            now = float(record['time'])
+            if config.replay_realtime and previous is not None:
+                # Los huecos largos (menús entre partidas) no se esperan
+                time.sleep(min(max(now - previous, 0.0), Simulation.MAX_FRAME_TIME))
+            previous = now
+
+            if record['event'] == EVENT_RESTART:
+                self.reset_game()
+            self.play_mode = int(record['mode'])
+            capture_time = float(record['capture_time'])
+            if capture_time != self.landmarks_time:
+                self.update_landmarks(TraceReader.landmarks(record), capture_time)
+            self.steer(now)
+            profiler.lap('landmarks')
+            
+            self.play_event_sounds(self.sim.advance(now))
+            profiler.lap('simulation')
             
-            cap.release()
-            cv2.destroyAllWindows()
-            pygame.quit()
+            canvas = self.draw_game_overlay(self.camera_frame)
+            profiler.lap('compose')
+            key = self.present(canvas, self.dirty_rects)
+            self.record_buffer_stats()
+            if key == 'escape':
+                break
+            elif key == 'd':
+                self.debug_hud.toggle()
+        
+        elapsed = time.perf_counter() - start
+        print(f"Replay: {profiler.frames} frames en {elapsed:.2f} s, puntuación {self.sim.score}, "
+              f"máxima {self.sim.highest_score}")
+        self.shutdown()
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fruit Catcher - Camera Edition")
+    parser.add_argument('source', nargs='?', help="Índice de cámara o vídeo")
+    parser.add_argument('--record', metavar='TRAZA', help="Grabar la traza de landmarks en este fichero")
+    parser.add_argument('--replay', metavar='TRAZA', help="Jugar una traza grabada (sin cámara ni MediaPipe)")
+    parser.add_argument('--realtime', action='store_true', help="Reproducir la traza a su velocidad original")
+    parser.add_argument('--seed', type=int, help="Semilla de la simulación")
+    parser.add_argument('--profile', metavar='PREFIJO', help="Guardar al salir los tiempos por etapa en PREFIJO.csv/.json")
+    parser.add_argument('--display', choices=('cv2', 'pygame', 'null'), help="Backend de la ventana")
+    args = parser.parse_args()
+    if args.source is not None:
+        config.camera_source = args.source
+    if args.record:
+        config.trace_record = args.record
+    if args.seed is not None:
+        config.sim_seed = args.seed
+    if args.profile:
+        config.profile_dump = args.profile
+    if args.display:
+        config.display_backend = args.display
+    config.replay_realtime = args.realtime or config.replay_realtime
     game = FruitCatcherGame()
-    game.run()
+    if args.replay:
+        game.run_replay(args.replay)
+    else:
+        game.run()
@@ -0,0 +1,87 @@
+import collections
+import statistics
+
+
+class QualityGovernor:
+    """Mantiene el FPS objetivo recorriendo una escalera de degradaciones con histéresis.
+
+    El nivel N aplica sobre `base` los N primeros escalones (ajuste, valor) de `ladder`.
+    """
+
+    def __init__(self, ladder, base, target_fps=30, window=2.0, headroom=0.75):
+        self.ladder = list(ladder)
+        self.base = dict(base)
+        self.budget = 1.0 / target_fps
+        self.window = window
+        self.headroom = headroom
+        self.level = 0
+        self._samples = collections.deque()
+        self._last_change = None
+        self.trigger_frame_time = None   # Mediana que provocó el último cambio de nivel
+        self._speedups = {}              # Nivel -> cuántas veces más rápido fue el frame al bajar a él
+        self._pending = None             # Mediana antes de la última bajada, hasta medir el nivel nuevo
+
+    def settings(self, level=None):
+        """Valor de cada ajuste en un nivel (por defecto el actual)"""
+        level = self.level if level is None else level
+        settings = dict(self.base)
+        settings.update(self.ladder[:level])
+        return settings
+
+    def describe(self, level=None):
+        level = self.level if level is None else level
+        if level == 0:
+            return f"0/{len(self.ladder)} (máxima)"
+        knob, value = self.ladder[level - 1]
+        return f"{level}/{len(self.ladder)} ({knob}={value})"
+
+    def pause(self):
+        """Descarta las medidas (al volver de un menú no se mezclan con las de la partida anterior)"""
+        self._samples.clear()
+        self._last_change = None
+
+    def observe(self, frame_time, now):
+        """Registra la duración de un frame de partida"""
+        if self._last_change is None:
+            self._last_change = now
+        self._samples.append((now, frame_time))
+        # Se guarda algo más de lo que pide la comprobación más larga para que la cubra entera
+        while self._samples and now - self._samples[0][0] > self.window * 4:
+            self._samples.popleft()
+
+    def _median_since(self, since):
+        # Sin medidas que cubran el intervalo entero (p. ej. justo tras un cambio) no se decide
+        if not self._samples or self._samples[0][0] > since:
+            return None
+        return statistics.median(frame_time for t, frame_time in self._samples if t >= since)
+
+    def check(self, now):
+        """Devuelve el nivel al que conviene pasar, o None si se mantiene el actual"""
+        if self._last_change is None or now - self._last_change < self.window:
+            return None
+        recent = self._median_since(now - self.window)
+        if recent is None:
+            return None
+        if self._pending is not None:
+            self._speedups[self.level] = max(self._pending / max(recent, 1e-6), 1.0)
+            self._pending = None
+        # Baja un escalón si la mediana de la última ventana no cabe en el presupuesto (1 / target_fps)
+        if recent > self.budget and self.level < len(self.ladder):
+            return self._change(self.level + 1, now, recent)
+        # Sube si durante 3 ventanas la mediana, escalada por lo que aceleró este escalón al bajar, queda por
+        # debajo de headroom · presupuesto: como cuenta con volver a pagar el escalón, no oscila entre un nivel
+        # que cabe y otro que no
+        if self.level > 0 and now - self._last_change >= self.window * 3:
+            relaxed = self._median_since(now - self.window * 3)
+            if relaxed is not None and relaxed * self._speedups.get(self.level, 1.0) < self.budget * self.headroom:
+                return self._change(self.level - 1, now, relaxed)
+        return None
+
+    def _change(self, level, now, frame_time):
+        # Las medidas del nivel anterior se descartan: no se vuelve a decidir hasta tener una ventana completa
+        self._pending = frame_time if level > self.level else None
+        self.level = level
+        self._last_change = now
+        self._samples.clear()
+        self.trigger_frame_time = frame_time
+        return level
@@ -0,0 +1,98 @@
+import os
+import struct
+
+import numpy as np
+
+# Cabecera fija: magic, versión, tamaño de registro, semilla de la simulación y tamaño del área de juego
+MAGIC = b'IPMTRACE'
+VERSION = 1
+HEADER = struct.Struct('<8sIIqII')
+
+# Un registro por frame de juego (68 bytes). `points` son nariz, muñeca izquierda (15) y
+# muñeca derecha (16) ya normalizadas al área de juego; NaN si el landmark no se detectó
+TRACE_DTYPE = np.dtype([
+    ('time', '<f8'),            # Instante de render del frame (time.monotonic)
+    ('capture_time', '<f8'),    # Instante de captura de la medida de pose más reciente
+    ('mode', 'u1'),             # Modo de juego (1=cabeza, 2=mano derecha, 3=mano izquierda)
+    ('event', 'u1'),            # EVENT_*
+    ('pad', '<u2'),
+    ('points', '<f8', (3, 2)),
+])
+
+EVENT_NONE = 0
+EVENT_RESTART = 1   # La partida se (re)inicia en este frame
+
+
+class TraceWriter:
+    """Graba la traza de landmarks en registros de tamaño fijo, en bloques para no escribir en cada frame"""
+
+    def __init__(self, path, seed, play_size, chunk=256):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, TRACE_DTYPE.itemsize, seed, play_size[0], play_size[1]))
+        self._chunk = np.zeros(chunk, dtype=TRACE_DTYPE)
+        self._count = 0
+        self.records = 0
+
+    def write(self, now, capture_time, mode, landmarks, event=EVENT_NONE):
+        record = self._chunk[self._count]
+        record['time'] = now
+        record['capture_time'] = capture_time
+        record['mode'] = mode
+        record['event'] = event
+        points = record['points']
+        for i, point in enumerate(landmarks):
+            points[i] = point if point is not None else (np.nan, np.nan)
+        self._count += 1
+        self.records += 1
+        if self._count == len(self._chunk):
+            self.flush()
+
+    def flush(self):
+        if self._count:
+            self._file.write(self._chunk[:self._count].tobytes())
+            self._count = 0
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """Abre una traza como array estructurado mapeado en memoria (no se lee entera a RAM)"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            magic, version, record_size, seed, width, height = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != TRACE_DTYPE.itemsize:
+            raise ValueError(f"{path} no es una traza de landmarks compatible")
+        self.path = path
+        self.seed = seed
+        self.play_size = (width, height)
+        if os.path.getsize(path) > HEADER.size:
+            self.records = np.memmap(path, dtype=TRACE_DTYPE, mode='r', offset=HEADER.size)
+        else:
+            self.records = np.zeros(0, dtype=TRACE_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def landmarks(record):
+        """(nariz, muñeca izquierda, muñeca derecha) como tuplas, o None si faltaba"""
+        return tuple(None if np.isnan(x) else (float(x), float(y)) for x, y in record['points'])
+
+    @property
+    def duration(self):
+        if len(self.records) == 0:
+            return 0.0
+        return float(self.records[-1]['time'] - self.records[0]['time'])
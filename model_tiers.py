@@ -0,0 +1,162 @@
+import collections
+import json
+import os
+import statistics
+import time
+
+import numpy as np
+
+
+class ModelTierManager:
+    """Elige el modelo de pose (lite/full/heavy) que cabe en el presupuesto de latencia.
+
+    Al arrancar mide cada `.task` disponible (o reutiliza las medidas guardadas
+    de una ejecución anterior) y elige el más preciso cuya latencia no supera
+    `target_latency`. Durante la partida recibe la latencia real de cada
+    inferencia y recomienda bajar o subir de modelo cuando la situación se
+    mantiene durante `window` segundos.
+    """
+
+    # De más precisa a más ligera
+    TIERS = ('heavy', 'full', 'lite')
+
+    def __init__(self, models_dir, target_latency=0.033, cache_path=None, window=3.0, headroom=0.6):
+        self.models_dir = models_dir
+        self.target_latency = target_latency
+        self.cache_path = cache_path
+        self.window = window
+        # Solo se sube de modelo si el actual va holgado (mediana < target * headroom)
+        self.headroom = headroom
+
+        self.benchmarks = {}
+        self.tiers = []
+        self.current = None
+        self._samples = collections.deque()
+        self._last_switch = 0.0
+
+    def model_path(self, tier):
+        return os.path.join(self.models_dir, f'pose_landmarker_{tier}.task')
+
+    def available(self):
+        return [tier for tier in self.TIERS if os.path.exists(self.model_path(tier))]
+
+    def _file_key(self, tier, frame_size):
+        stat = os.stat(self.model_path(tier))
+        return f'{stat.st_size}:{int(stat.st_mtime)}:{frame_size[0]}x{frame_size[1]}'
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, 'w') as f:
+                json.dump(cache, f, indent=2)
+        except OSError:
+            pass
+
+    def _measure(self, tier, frame_size, runs):
+        """Latencia mediana de un modelo sobre un frame negro del tamaño de inferencia"""
+        import mediapipe as mp
+
+        options = mp.tasks.vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=self.model_path(tier)),
+            running_mode=mp.tasks.vision.RunningMode.VIDEO,
+            num_poses=1,
+        )
+        frame = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+        times = []
+        with mp.tasks.vision.PoseLandmarker.create_from_options(options) as landmarker:
+            # La primera inferencia incluye el calentamiento del grafo; no cuenta
+            landmarker.detect_for_video(image, 0)
+            for i in range(runs):
+                start = time.perf_counter()
+                landmarker.detect_for_video(image, (i + 1) * 33)
+                times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    def benchmark(self, frame_size, runs=15):
+        """Mide (o carga de la cache) la latencia de cada modelo disponible"""
+        cache = self._load_cache()
+        changed = False
+        for tier in self.available():
+            key = self._file_key(tier, frame_size)
+            entry = cache.get(tier)
+            if entry is None or entry.get('key') != key:
+                entry = {'key': key, 'latency': self._measure(tier, frame_size, runs)}
+                cache[tier] = entry
+                changed = True
+            self.benchmarks[tier] = entry['latency']
+        if changed:
+            self._save_cache(cache)
+        return dict(self.benchmarks)
+
+    def select(self, frame_size):
+        """Elige el modelo más preciso que cabe en el presupuesto (o el más ligero si ninguno cabe)"""
+        tiers = self.tiers = self.available()
+        if not tiers:
+            return None
+        self.benchmark(frame_size)
+        chosen = tiers[-1]
+        for tier in tiers:
+            if self.benchmarks[tier] <= self.target_latency:
+                chosen = tier
+                break
+        self.current = chosen
+        self._last_switch = time.monotonic()
+        return chosen
+
+    def observe(self, latency, now):
+        """Registra la latencia de una inferencia real"""
+        self._samples.append((now, latency))
+        while self._samples and now - self._samples[0][0] > self.window * 3:
+            self._samples.popleft()
+
+    def _median_since(self, since):
+        values = [latency for t, latency in self._samples if t >= since]
+        return statistics.median(values) if values else None
+
+    def check(self, now):
+        """Devuelve el modelo al que conviene cambiar, o None si se mantiene el actual"""
+        if self.current is None or now - self._last_switch < self.window:
+            return None
+        tiers = self.tiers
+        if self.current not in tiers:
+            return None
+        index = tiers.index(self.current)
+
+        recent = self._median_since(now - self.window)
+        if recent is None:
+            return None
+
+        # Por encima del presupuesto de forma sostenida: bajar a un modelo más ligero
+        if recent > self.target_latency and index + 1 < len(tiers):
+            return self._switch(tiers[index + 1], now)
+
+        # Holgura sostenida durante más tiempo: probar el siguiente más preciso si se estima que cabe
+        if index > 0 and now - self._last_switch >= self.window * 3:
+            relaxed = self._median_since(now - self.window * 3)
+            heavier = tiers[index - 1]
+            if relaxed < self.target_latency * self.headroom and heavier in self.benchmarks:
+                ratio = self.benchmarks[heavier] / max(self.benchmarks.get(self.current, relaxed), 1e-6)
+                if relaxed * ratio <= self.target_latency:
+                    return self._switch(heavier, now)
+        return None
+
+    def force(self, tier, now):
+        """Cambio de modelo decidido desde fuera (gobernador de calidad); reinicia las medidas"""
+        return self._switch(tier, now)
+
+    def _switch(self, tier, now):
+        self.current = tier
+        self._last_switch = now
+        self._samples.clear()
+        return tier
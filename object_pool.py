@@ -0,0 +1,75 @@
+import numpy as np
+
+
+class ObjectPool:
+    """Almacén de objetos que caen como estructura de arrays (x, y, kind, value, alive).
+
+    Las ranuras liberadas se reutilizan con una lista libre y la capacidad se
+    duplica cuando hace falta, así que mover, colisionar y descartar objetos se
+    hace con una sola pasada vectorizada sobre las primeras `size` ranuras.
+    """
+
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        # Posición vertical en el tick anterior (para interpolar el render)
+        self.y_prev = np.zeros(capacity, dtype=np.float64)
+        self.kind = np.zeros(capacity, dtype=np.int16)
+        self.value = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        # Ranuras usadas alguna vez (las demás están libres y sin inicializar)
+        self.size = 0
+        self.count = 0
+        self._free = []
+
+    @property
+    def capacity(self):
+        return len(self.x)
+
+    def clear(self):
+        self.alive[:self.size] = False
+        self.size = 0
+        self.count = 0
+        self._free.clear()
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for name in ('x', 'y', 'y_prev', 'kind', 'value', 'alive'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def spawn(self, x, y, kind, value):
+        """Añade un objeto y devuelve su ranura"""
+        if self._free:
+            index = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            index = self.size
+            self.size += 1
+        self.x[index] = x
+        self.y[index] = y
+        self.y_prev[index] = y
+        self.kind[index] = kind
+        self.value[index] = value
+        self.alive[index] = True
+        self.count += 1
+        return index
+
+    def kill(self, indices):
+        """Libera las ranuras indicadas (array de índices de objetos vivos)"""
+        if len(indices) == 0:
+            return
+        self.alive[indices] = False
+        self.count -= len(indices)
+        self._free.extend(indices.tolist())
+
+    def active(self):
+        """Vistas de las ranuras en uso: (x, y, kind, value, alive)"""
+        n = self.size
+        return self.x[:n], self.y[:n], self.kind[:n], self.value[:n], self.alive[:n]
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,198 @@
+import threading
+import time
+
+import numpy as np
+
+
+class PoseEstimator:
+    """Envoltorio del PoseLandmarker de MediaPipe: asíncrono en 'live_stream' (ver `latest`) o síncrono en 'video'"""
+
+    # Si el callback no llega en este tiempo se da la inferencia por perdida
+    IN_FLIGHT_TIMEOUT = 1.0
+
+    def __init__(self, model_path, mode="live_stream", num_poses=1, max_fps=30):
+        self.model_path = model_path
+        self.mode = mode
+        self.num_poses = num_poses
+        self.max_fps = max_fps
+
+        self.landmarker = None
+        self._lock = threading.Lock()
+        # Protege el cambio de modelo en caliente frente a una llamada de detección en curso
+        self._swap_lock = threading.Lock()
+        self._latest = (None, 0.0, 0, None)   # (resultado, timestamp de captura, secuencia, meta)
+        self._in_flight = False
+        self._last_ts_ms = -1
+        self._last_submit = 0.0
+        self._pending = {}
+
+        # Estadísticas
+        self.frames_submitted = 0
+        self.frames_skipped = 0
+        self.last_latency = 0.0     # Segundos desde la captura hasta tener el resultado
+        self.last_inference_time = 0.0  # Segundos desde el envío hasta tener el resultado
+
+    @property
+    def max_fps(self):
+        return 1.0 / self.min_interval if self.min_interval else 0
+
+    @max_fps.setter
+    def max_fps(self, max_fps):
+        # Límite de inferencias por segundo (0 = sin límite); se puede cambiar en caliente
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+
+    def _create(self, model_path):
+        # MediaPipe (~1 s de importación) se importa con el primer modelo, para que el menú salga antes
+        import mediapipe as mp
+
+        BaseOptions = mp.tasks.BaseOptions
+        PoseLandmarker = mp.tasks.vision.PoseLandmarker
+        PoseLandmarkerOptions = mp.tasks.vision.PoseLandmarkerOptions
+        VisionRunningMode = mp.tasks.vision.RunningMode
+
+        if self.mode == "live_stream":
+            options = PoseLandmarkerOptions(
+                base_options=BaseOptions(model_asset_path=model_path),
+                running_mode=VisionRunningMode.LIVE_STREAM,
+                num_poses=self.num_poses,
+                result_callback=self._on_result,
+            )
+        else:
+            options = PoseLandmarkerOptions(
+                base_options=BaseOptions(model_asset_path=model_path),
+                running_mode=VisionRunningMode.VIDEO,
+                num_poses=self.num_poses,
+            )
+        return PoseLandmarker.create_from_options(options)
+
+    def open(self):
+        self.landmarker = self._create(self.model_path)
+        return self
+
+    def warm_up(self, size=(320, 480), timeout=5.0):
+        """Hace una inferencia sobre un frame negro (el resultado se descarta).
+
+        La primera inferencia inicializa el grafo de MediaPipe y tarda mucho más
+        que las siguientes; así no se nota al empezar la partida. Devuelve los
+        segundos que ha tardado.
+        """
+        import mediapipe as mp
+
+        frame = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+        start = time.monotonic()
+        ts_ms = max(int(start * 1000), self._last_ts_ms + 1)
+        self._last_ts_ms = ts_ms
+        with self._swap_lock:
+            if self.mode == "live_stream":
+                done = threading.Event()
+                # Sin instante de captura: el callback solo avisa de que ha terminado
+                self._pending[ts_ms] = (None, done, start)
+                self.landmarker.detect_async(image, ts_ms)
+            else:
+                done = None
+                self.landmarker.detect_for_video(image, ts_ms)
+        if done is not None:
+            done.wait(timeout)
+        return time.monotonic() - start
+
+    def swap_model(self, model_path):
+        """Carga otro modelo en un hilo aparte y lo activa cuando está listo, sin parar el juego"""
+        def load():
+            new_landmarker = self._create(model_path)
+            with self._swap_lock:
+                old_landmarker = self.landmarker
+                self.landmarker = new_landmarker
+                self.model_path = model_path
+                # El modelo nuevo puede aceptar frames ya; el resultado pendiente del viejo sigue siendo válido
+                self._in_flight = False
+            if old_landmarker is not None:
+                old_landmarker.close()
+
+        thread = threading.Thread(target=load, name="PoseModelSwap", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        with self._swap_lock:
+            landmarker, self.landmarker = self.landmarker, None
+        if landmarker is not None:
+            landmarker.close()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """Callback de MediaPipe (se ejecuta en su propio hilo)"""
+        pending = self._pending.pop(timestamp_ms, None)
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight = False
+            if pending is None:
+                return
+            capture_time, meta, submit_time = pending
+            if capture_time is None:
+                # Inferencia de calentamiento (warm_up)
+                meta.set()
+                return
+            # Tras un cambio de modelo pueden llegar resultados desordenados: se ignoran los viejos
+            if capture_time < self._latest[1]:
+                return
+            self.last_latency = now - capture_time
+            self.last_inference_time = now - submit_time
+            self._latest = (result, capture_time, self._latest[2] + 1, meta)
+
+    def ready(self, now=None):
+        """True si se puede enviar un frame nuevo sin saturar el modelo"""
+        now = time.monotonic() if now is None else now
+        if self._in_flight:
+            if now - self._last_submit < self.IN_FLIGHT_TIMEOUT:
+                return False
+            self._in_flight = False
+            self._pending.clear()
+        return now - self._last_submit >= self.min_interval
+
+    def submit(self, frame, capture_time, meta=None):
+        """Envía un frame con su marca de tiempo de captura (time.monotonic, en segundos).
+
+        `meta` acompaña al resultado (p. ej. la ROI usada) para interpretarlo al recogerlo.
+
+        Devuelve False si el frame se descarta porque hay una inferencia en curso
+        o se superaría el límite de FPS de inferencia.
+        """
+        now = time.monotonic()
+        if not self.ready(now):
+            self.frames_skipped += 1
+            return False
+
+        # MediaPipe exige timestamps en ms estrictamente crecientes
+        ts_ms = max(int(capture_time * 1000), self._last_ts_ms + 1)
+        self._last_ts_ms = ts_ms
+        self._last_submit = now
+        self.frames_submitted += 1
+
+        import mediapipe as mp
+
+        # mp.Image copia los píxeles: el llamador puede reutilizar `frame` en cuanto vuelve submit
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+        with self._swap_lock:
+            if self.mode == "live_stream":
+                self._in_flight = True
+                self._pending[ts_ms] = (capture_time, meta, now)
+                self.landmarker.detect_async(mp_image, ts_ms)
+            else:
+                result = self.landmarker.detect_for_video(mp_image, ts_ms)
+                done = time.monotonic()
+                with self._lock:
+                    self.last_latency = done - capture_time
+                    self.last_inference_time = done - now
+                    self._latest = (result, capture_time, self._latest[2] + 1, meta)
+        return True
+
+    def latest(self):
+        """Devuelve (resultado, timestamp de captura, secuencia, meta) del último resultado disponible"""
+        with self._lock:
+            return self._latest
@@ -0,0 +1,78 @@
+import cv2
+
+from buffers import BufferPool
+
+
+class InferencePreprocessor:
+    """Prepara la imagen del modelo de pose: recorte opcional a una ROI alrededor del punto de control y reducción.
+
+    Cada imagen va con su ROI (x0, y0, ancho, alto) en px del área de juego para devolver allí los landmarks.
+    """
+
+    def __init__(self, inference_height=480, roi_tracking=False, roi_padding=(0.3, 0.3), roi_min_size=192,
+                 buffers=None):
+        # Altura máxima de la imagen de inferencia (0 = sin reducir)
+        self.inference_height = inference_height
+        self.roi_tracking = roi_tracking
+        # Media anchura y media altura de la caja ROI como fracción del ancho y del alto del área de juego
+        self.roi_padding = roi_padding
+        # Lado mínimo de la caja ROI en píxeles del área de juego
+        self.roi_min_size = roi_min_size
+        # Último punto de control conocido (normalizado al área de juego)
+        self.track_point = None
+        self.buffers = buffers if buffers is not None else BufferPool()
+
+    def compute_roi(self, play_w, play_h):
+        """Caja a inspeccionar: alrededor del último punto conocido o el área completa"""
+        if not self.roi_tracking or self.track_point is None:
+            return (0, 0, play_w, play_h)
+        pad_x, pad_y = self.roi_padding
+        half_w = min(max(int(pad_x * play_w), self.roi_min_size // 2), play_w // 2)
+        half_h = min(max(int(pad_y * play_h), self.roi_min_size // 2), play_h // 2)
+        cx = int(self.track_point[0] * play_w)
+        cy = int(self.track_point[1] * play_h)
+        x0 = max(0, min(cx - half_w, play_w - 2 * half_w))
+        y0 = max(0, min(cy - half_h, play_h - 2 * half_h))
+        return (x0, y0, 2 * half_w, 2 * half_h)
+
+    def prepare(self, play_frame):
+        """Devuelve (imagen para el modelo, roi)"""
+        play_h, play_w = play_frame.shape[:2]
+        roi = self.compute_roi(play_w, play_h)
+        x0, y0, roi_w, roi_h = roi
+        crop = play_frame[y0:y0 + roi_h, x0:x0 + roi_w]
+
+        # Reducir con la escala que llevaría el área completa a la resolución de inferencia: la ROI mantiene
+        # la misma densidad de píxeles y envía al modelo tantos píxeles menos como área recorta
+        # (INTER_AREA conserva mejor los detalles al reducir)
+        if self.inference_height and play_h > self.inference_height:
+            scale = self.inference_height / play_h
+            size = (max(1, int(round(roi_w * scale))), max(1, int(round(roi_h * scale))))
+            image = self.buffers.get('inference', (size[1], size[0], 3))
+            cv2.resize(crop, size, dst=image, interpolation=cv2.INTER_AREA)
+        elif crop.flags['C_CONTIGUOUS']:
+            # El área completa ya es contigua: se envía sin copiar
+            return crop, roi
+        else:
+            # MediaPipe necesita un buffer contiguo (un recorte sin reducir no lo es)
+            image = self.buffers.get('inference', crop.shape)
+            image[...] = crop
+        self.buffers.note_copy(image.nbytes)
+        return image, roi
+
+    @staticmethod
+    def to_play_coords(point, roi, play_w, play_h):
+        """Pasa un landmark normalizado a la imagen de inferencia a coordenadas normalizadas del área de juego"""
+        if point is None:
+            return None
+        x0, y0, roi_w, roi_h = roi
+        # La reducción de tamaño no altera las coordenadas normalizadas dentro de la ROI
+        adj_x = (x0 + point[0] * roi_w) / play_w
+        adj_y = (y0 + point[1] * roi_h) / play_h
+        adj_x = max(0.0, min(1.0, adj_x))
+        adj_y = max(0.0, min(1.0, adj_y))
+        return adj_x, adj_y
+
+    def update_track(self, point):
+        """Actualiza el punto seguido; None (pérdida) vuelve a buscar en el área completa"""
+        self.track_point = point
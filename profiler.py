@@ -0,0 +1,180 @@
+import csv
+import json
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameProfiler:
+    """Tiempos por etapa del bucle principal en un buffer circular de los últimos `window` frames.
+
+    Los `counters` son magnitudes por frame que no son tiempos (asignaciones, bytes copiados...).
+    """
+
+    TOTAL = 'total'
+
+    def __init__(self, stages, window=600, counters=()):
+        self.stages = list(stages) + [self.TOTAL]
+        self.counters = list(counters)
+        self.index = {name: i for i, name in enumerate(self.stages + self.counters)}
+        self._total = len(self.stages) - 1
+        self.window = window
+        self.samples = np.full((window, len(self.index)), np.nan)
+        self.frames = 0
+        self._row = None
+        self._frame_start = 0.0
+        self._mark = 0.0
+
+    def begin(self):
+        """Empieza un frame nuevo (cierra el total del anterior)"""
+        now = time.perf_counter()
+        if self._row is not None:
+            self._row[self._total] = now - self._frame_start
+        # Las etapas que no se ejecutan en el frame quedan como NaN (los percentiles solo se calculan al resumir)
+        self._row = self.samples[self.frames % self.window]
+        self._row[:] = np.nan
+        self.frames += 1
+        self._frame_start = self._mark = now
+
+    def elapsed(self):
+        """Segundos desde el inicio del frame actual"""
+        return time.perf_counter() - self._frame_start
+
+    def lap(self, stage):
+        """Atribuye a `stage` el tiempo transcurrido desde la marca anterior"""
+        if self._row is None:
+            return
+        now = time.perf_counter()
+        i = self.index[stage]
+        previous = self._row[i]
+        # Una etapa que se cierra varias veces en el mismo frame suma sus tiempos
+        self._row[i] = now - self._mark if previous != previous else previous + now - self._mark
+        self._mark = now
+
+    def record(self, stage, seconds):
+        """Guarda en el frame actual un tiempo medido en otra parte"""
+        if self._row is not None and seconds is not None:
+            self._row[self.index[stage]] = seconds
+
+    def count(self, counter, amount):
+        """Suma `amount` al contador `counter` del frame actual"""
+        if self._row is None:
+            return
+        i = self.index[counter]
+        previous = self._row[i]
+        self._row[i] = amount if previous != previous else previous + amount
+
+    def _filled(self):
+        # El frame en curso todavía no tiene total: se excluye
+        done = self.frames - 1
+        if done <= 0:
+            return self.samples[:0]
+        if done < self.window:
+            return self.samples[:done]
+        current = done % self.window
+        return np.concatenate((self.samples[current + 1:], self.samples[:current]))
+
+    def fps(self):
+        """FPS medios de los frames del buffer"""
+        totals = self._filled()[:, self._total]
+        if len(totals) == 0:
+            return 0.0
+        return 1.0 / max(float(np.mean(totals)), 1e-9)
+
+    def summary(self):
+        """{etapa: {'count', 'p50', 'p95', 'p99', 'max'}} en milisegundos"""
+        data = self._filled() * 1000.0
+        result = {}
+        for i, name in enumerate(self.stages):
+            column = data[:, i]
+            column = column[~np.isnan(column)]
+            if len(column) == 0:
+                continue
+            p50, p95, p99 = np.percentile(column, (50, 95, 99))
+            result[name] = {'count': int(len(column)), 'p50': round(float(p50), 3), 'p95': round(float(p95), 3),
+                            'p99': round(float(p99), 3), 'max': round(float(column.max()), 3)}
+        return result
+
+    def counter_summary(self):
+        """{contador: {'mean', 'max'}} por frame (los frames sin anotar cuentan como 0)"""
+        data = self._filled()
+        result = {}
+        for name in self.counters:
+            column = np.nan_to_num(data[:, self.index[name]])
+            if len(column) == 0:
+                continue
+            result[name] = {'mean': round(float(column.mean()), 1), 'max': float(column.max())}
+        return result
+
+    def dump(self, path_prefix):
+        """Escribe `<prefix>.csv` (un frame por fila, ms) y `<prefix>.json` (percentiles por etapa)"""
+        data = self._filled()
+        if len(data) == 0:
+            return
+        times = len(self.stages)
+        with open(path_prefix + '.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.stages + self.counters)
+            for row in data:
+                writer.writerow(['' if np.isnan(v) else f'{v * 1000:.3f}' for v in row[:times]] +
+                                ['' if np.isnan(v) else f'{v:.0f}' for v in row[times:]])
+        with open(path_prefix + '.json', 'w') as f:
+            json.dump({'frames': self.frames, 'fps': round(self.fps(), 2), 'stages': self.summary(),
+                       'counters': self.counter_summary()}, f, indent=2)
+
+
+class DebugHUD:
+    """Tabla de percentiles por etapa dibujada sobre el frame final (se recalcula cada `refresh` s)"""
+
+    def __init__(self, profiler, refresh=0.5):
+        self.profiler = profiler
+        self.refresh = refresh
+        self.visible = False
+        self._lines = []
+        self._width = 0
+        # Línea de estado extra al pie de la tabla (p. ej. el nivel del gobernador de calidad)
+        self.status = None
+        self._fps = 0.0
+        self._last = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._last = 0.0
+
+    def _update(self, now):
+        self._last = now
+        self._fps = self.profiler.fps()
+        if not self.visible:
+            return
+        self._lines = [f"{'stage':<11}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for name, stats in self.profiler.summary().items():
+            self._lines.append(f"{name:<11}{stats['p50']:>7.1f}{stats['p95']:>7.1f}{stats['p99']:>7.1f}")
+        # Contadores por frame (media y máximo); los de bytes en KB
+        counters = self.profiler.counter_summary()
+        if counters:
+            self._lines.append(f"{'per frame':<11}{'mean':>7}{'max':>14}")
+        for name, stats in counters.items():
+            unit = 1024 if name.endswith('bytes') else 1
+            label = name[:-len('bytes')] + 'KB' if unit > 1 else name
+            digits = 2 if stats['max'] <= 1 else 0
+            self._lines.append(f"{label:<11}{stats['mean'] / unit:>7.{digits}f}{stats['max'] / unit:>14.0f}")
+        if self.status:
+            self._lines.append(self.status)
+        self._width = max(cv2.getTextSize(line, cv2.FONT_HERSHEY_PLAIN, 1.2, 1)[0][0] for line in self._lines)
+
+    def draw(self, canvas):
+        """Dibuja el FPS (y la tabla si está visible); devuelve el rectángulo (x, y, ancho, alto) que tapa"""
+        now = time.monotonic()
+        if now - self._last >= self.refresh:
+            self._update(now)
+        cv2.putText(canvas, f"FPS: {int(self._fps)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        if not self.visible or not self._lines:
+            return (0, 0, 160, 40)
+        x, y, line_h = 10, 50, 22
+        bottom = y + line_h * len(self._lines) + 8
+        cv2.rectangle(canvas, (x - 5, y), (x + 300, bottom), (0, 0, 0), -1)
+        for i, line in enumerate(self._lines):
+            cv2.putText(canvas, line, (x, y + line_h * (i + 1)), cv2.FONT_HERSHEY_PLAIN, 1.2, (0, 255, 0), 1)
+        # Algunas líneas son más anchas que el fondo negro
+        return (0, 0, x + max(300, self._width) + 2, bottom + 1)
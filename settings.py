@@ -1,8 +1,5 @@
-import pygame
 import os
 
-pygame.init()
-
 # Dimensiones de la ventana del juego
 screen_width = 900/2
 screen_height = 1600/2
@@ -13,22 +10,59 @@ game_caption = "Fruit Catcher - Camera Edition"
 # Obtener el directorio base del script
 base_dir = os.path.dirname(__file__)
 
-# Imágenes de frutas
-apple = pygame.image.load(os.path.join(base_dir, "imgs/apple.png"))
-banana = pygame.image.load(os.path.join(base_dir, "imgs/banana.png"))
-watermelon = pygame.image.load(os.path.join(base_dir, "imgs/watermelon.png"))
-strawberry = pygame.image.load(os.path.join(base_dir, "imgs/strawberry.png"))
-fruit_list = [apple, banana, strawberry, watermelon]
-
-# Imágenes de bomba, corazón, cesta y botones
-bomb_img = pygame.image.load(os.path.join(base_dir, "imgs/bomb.png"))
-heart_img = pygame.image.load(os.path.join(base_dir, "imgs/heart.png"))
-bucket_img = pygame.image.load(os.path.join(base_dir, "imgs/bucket.png"))
-return_to_menu = pygame.image.load(os.path.join(base_dir, "imgs/return_to_menu.png"))
-
-# Imágenes de control de volumen
-volume = pygame.image.load(os.path.join(base_dir, "imgs/volume.png"))
-mute = pygame.image.load(os.path.join(base_dir, "imgs/mute.png"))
+# Imágenes: importar settings no inicializa pygame ni lee ningún PNG; cada imagen
+# se carga con `load_image` la primera vez que se pide
+IMAGE_FILES = {
+    # Frutas
+    "apple": "imgs/apple.png",
+    "banana": "imgs/banana.png",
+    "watermelon": "imgs/watermelon.png",
+    "strawberry": "imgs/strawberry.png",
+    # Bomba, corazón, cesta y botones
+    "bomb": "imgs/bomb.png",
+    "heart": "imgs/heart.png",
+    "bucket": "imgs/bucket.png",
+    "return_to_menu": "imgs/return_to_menu.png",
+    # Control de volumen
+    "volume": "imgs/volume.png",
+    "mute": "imgs/mute.png",
+}
+fruit_names = ["apple", "banana", "strawberry", "watermelon"]
+
+# Lados (en píxeles del diseño de referencia, 1080p) a los que el juego dibuja cada imagen;
+# asset_pack.py los preescala a cada resolución de render
+SPRITE_SIZES = {
+    "apple": (60, 36), "banana": (60, 36), "strawberry": (60, 36), "watermelon": (60, 36),  # objeto e icono
+    "bomb": (60,),
+    "heart": (30, 60),  # vidas y corazón que cae
+    "bucket": (80,),
+}
+
+_images = {}
+
+
+def load_image(name):
+    """Surface de pygame de una imagen de IMAGE_FILES (se lee del disco una sola vez)"""
+    image = _images.get(name)
+    if image is None:
+        import pygame
+        image = _images[name] = pygame.image.load(os.path.join(base_dir, IMAGE_FILES[name]))
+    return image
+
+
+# Nombres de las variables que antes se cargaban al importar
+_LEGACY_IMAGES = {"apple": "apple", "banana": "banana", "watermelon": "watermelon", "strawberry": "strawberry",
+                  "bomb_img": "bomb", "heart_img": "heart", "bucket_img": "bucket",
+                  "return_to_menu": "return_to_menu", "volume": "volume", "mute": "mute"}
+
+
+def __getattr__(name):
+    # settings.apple, settings.fruit_list... siguen funcionando, pero cargan la imagen al pedirla
+    if name == "fruit_list":
+        return [load_image(fruit) for fruit in fruit_names]
+    if name in _LEGACY_IMAGES:
+        return load_image(_LEGACY_IMAGES[name])
+    raise AttributeError(f"module 'settings' has no attribute {name!r}")
 
 # Sonidos
 game_song = os.path.join(base_dir, "sounds/game_song.mp3")
@@ -0,0 +1,256 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from object_pool import ObjectPool
+
+# Eventos que emite la simulación para las capas de audio y render
+CAUGHT = 'caught'        # Fruta atrapada
+MISSED = 'missed'        # Fruta que se escapó por abajo
+BOMB = 'bomb'            # Bomba atrapada
+HEART = 'heart'          # Corazón atrapado
+GAME_OVER = 'game_over'
+
+# Tipos de fruta (nombre, puntos) en el mismo orden que `fruit_list` en `settings.py`
+FRUIT_TYPES = [("Manzana", 10), ("Banana", 5), ("Fresa", 15), ("Sandia", 20)]
+KIND_BOMB = len(FRUIT_TYPES)
+KIND_HEART = KIND_BOMB + 1
+
+
+class Simulation:
+    """Lógica del juego sin pygame ni OpenCV: aparición, caída, colisiones, puntos y vidas.
+
+    Avanza en ticks fijos de 1 / `tick_rate` s (velocidades en px/s); el azar sale de un `random.Random` con semilla.
+    """
+
+    FRUIT_SIZE = 60
+    BUCKET_SIZE = 80
+    MAX_LIVES = 3
+
+    # Tiempo real máximo que se simula de una vez (evita la espiral de muerte tras un parón)
+    MAX_FRAME_TIME = 0.25
+
+    def __init__(self, width=720, height=1080, seed=None, clock=None, tick_rate=60,
+                 initial_speed=90, max_speed=750, speed_increment=15, base_interval=1000):
+        # Tamaño del área de juego en píxeles
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+
+        self.base_fruit_interval = base_interval  # ms - intervalo base
+        self.min_fruit_interval = 500  # ms - intervalo mínimo (más bajo en modo frenesí)
+        self.spawn_batch = 1  # Objetos creados cada vez que toca (más en modo frenesí)
+        self.initial_fruit_speed = initial_speed  # px/s - velocidad inicial de caída
+        self.max_fruit_speed = max_speed  # px/s - velocidad máxima
+        self.speed_increment = speed_increment  # px/s - incremento por fruta atrapada
+        self.highest_score = 0
+        # Objetos que caen (frutas, bombas y corazones)
+        self.objects = ObjectPool()
+        self._no_index = np.zeros(0, dtype=np.intp)
+        self.reset()
+
+    def reset(self):
+        """Reinicia la partida (la puntuación máxima se conserva)"""
+        self.objects.clear()
+        # Tiempo de simulación (ms); la primera fruta aparece en el primer tick
+        self.time = 0.0
+        self.last_fruit_time = -self.base_fruit_interval
+        self.fruit_interval = self.base_fruit_interval  # ms - intervalo actual (se ajusta dinámicamente)
+        self.fruit_speed = self.initial_fruit_speed
+        # Acumulador de tiempo real pendiente y fracción de tick para interpolar
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self._last_now = None
+        self.bucket_x = 325
+        self.bucket_y = 200  # Posición vertical de la cesta (en la cabeza)
+        self.score = 0
+        self.lives = self.MAX_LIVES
+        self.game_over = False
+
+    def set_control(self, x_norm, y_norm, mode=None):
+        """Coloca la cesta a partir del punto de control normalizado.
+        mode: 1=cabeza, 2=mano derecha, 3=mano izquierda
+        """
+        if x_norm is None or y_norm is None:
+            return
+        # Mapear la posición normalizada al tamaño del área de juego
+        self.bucket_x = int(x_norm * self.width) - self.BUCKET_SIZE // 2  # Centrar la cesta
+        # Ajustar verticalmente según el modo
+        if mode == 1 or mode is None:
+            # Cabeza: colocar la cesta encima de la nariz
+            offset_y = int(self.height * 0.25)
+            self.bucket_y = int(y_norm * self.height) - offset_y
+        else:
+            # Mano: la cesta queda centrada verticalmente en la palma
+            self.bucket_y = int(y_norm * self.height) - (self.BUCKET_SIZE // 2)
+
+        # Limitar dentro de los bordes
+        self.bucket_x = max(0, min(self.bucket_x, self.width - self.BUCKET_SIZE))
+        self.bucket_y = max(0, min(self.bucket_y, self.height - self.BUCKET_SIZE))
+
+    def spawn(self, now):
+        """Crea nuevas frutas, bombas o corazones cuando toca según el intervalo"""
+        if now - self.last_fruit_time < self.fruit_interval:
+            return
+        max_x = self.width - self.FRUIT_SIZE
+        for _ in range(self.spawn_batch):
+            rand_val = self.rng.random()
+
+            # Corazones solo aparecen si el jugador tiene 2 vidas o menos
+            if rand_val < 0.02 and self.lives <= 2:  # 2% probabilidad de corazón
+                kind, value = KIND_HEART, 0
+            elif rand_val < 0.22:  # 20% probabilidad de bomba
+                kind, value = KIND_BOMB, 0
+            else:  # 78% probabilidad de fruta
+                kind = self.rng.randrange(len(FRUIT_TYPES))
+                value = FRUIT_TYPES[kind][1]
+
+            self.objects.spawn(self.rng.randint(0, max(max_x, 100)), 0, kind, value)
+        self.last_fruit_time = now
+
+    def advance(self, now=None, control=None, mode=None):
+        """Simula el tiempo real transcurrido desde la llamada anterior en ticks fijos.
+
+        now: instante en segundos (por defecto el del reloj inyectado).
+        Devuelve los eventos de todos los ticks ejecutados y actualiza `alpha`.
+        """
+        if now is None:
+            now = self.clock()
+        if self._last_now is None:
+            self._last_now = now
+        elapsed = min(now - self._last_now, self.MAX_FRAME_TIME)
+        self._last_now = now
+        self.accumulator += max(elapsed, 0.0)
+
+        events = []
+        while self.accumulator >= self.dt:
+            events.extend(self.step(control, mode))
+            self.accumulator -= self.dt
+        self.alpha = self.accumulator / self.dt
+        return events
+
+    def step(self, control=None, mode=None):
+        """Avanza un tick fijo de simulación y devuelve la lista de eventos producidos.
+
+        control: punto de control (x, y) normalizado opcional para mover la cesta antes del tick.
+        """
+        if self.game_over:
+            return []
+        if control is not None:
+            self.set_control(control[0], control[1], mode)
+
+        events = []
+        self.time += self.dt * 1000
+        self.spawn(self.time)
+
+        # Ajustar el intervalo de frutas según la velocidad para mantener densidad similar
+        # A mayor velocidad, menor intervalo (más frutas)
+        speed_ratio = self.fruit_speed / 150.0  # Ratio respecto a 150 px/s
+        self.fruit_interval = max(self.min_fruit_interval, int(self.base_fruit_interval / speed_ratio))
+
+        # Movimiento, colisión AABB con la cesta y descarte fuera de pantalla en pasadas vectorizadas.
+        # Las ranuras libres también se mueven: da igual y evita indexar con la máscara
+        x, y, kind, value, alive = self.objects.active()
+        self.objects.y_prev[:self.objects.size] = y
+        y += self.fruit_speed * self.dt
+        # Solapamiento AABB expresado como distancia al centro: |x - cx| < (B + F) / 2
+        half = (self.BUCKET_SIZE + self.FRUIT_SIZE) / 2
+        cx = self.bucket_x + (self.BUCKET_SIZE - self.FRUIT_SIZE) / 2
+        cy = self.bucket_y + (self.BUCKET_SIZE - self.FRUIT_SIZE) / 2
+        caught = (np.abs(x - cx) < half) & (np.abs(y - cy) < half) & alive
+        gone = (y > self.height) & alive
+        gone &= ~caught
+
+        # Las colisiones son pocas por tick: se resuelven una a una por el orden de las reglas
+        caught_idx = np.flatnonzero(caught) if caught.any() else self._no_index
+        for i in caught_idx.tolist():
+            k = int(kind[i])
+            if k == KIND_BOMB:
+                self.lives -= 1
+                events.append({"type": BOMB, "kind": k})
+            elif k == KIND_HEART:
+                # Atrapar corazón: recuperar vida (máximo 3 vidas)
+                gained = self.lives < self.MAX_LIVES
+                if gained:
+                    self.lives += 1
+                events.append({"type": HEART, "kind": k, "life_gained": gained})
+            else:
+                # Atrapar fruta: sumar su valor e incrementar la velocidad hasta el máximo
+                self.score += int(value[i])
+                if self.fruit_speed < self.max_fruit_speed:
+                    self.fruit_speed += self.speed_increment
+                events.append({"type": CAUGHT, "kind": k, "value": int(value[i])})
+
+        # Solo se pierde vida si lo que sale por abajo es una fruta (no bomba ni corazón)
+        gone_idx = np.flatnonzero(gone) if gone.any() else self._no_index
+        for k in kind[gone_idx][kind[gone_idx] < KIND_BOMB].tolist():
+            self.lives -= 1
+            events.append({"type": MISSED, "kind": k})
+
+        self.objects.kill(caught_idx)
+        self.objects.kill(gone_idx)
+
+        # Verificar game over
+        if self.lives <= 0:
+            self.game_over = True
+            if self.score > self.highest_score:
+                self.highest_score = self.score
+            events.append({"type": GAME_OVER, "score": self.score})
+        return events
+
+    def render_y(self):
+        """Posición vertical de cada ranura interpolada entre los dos últimos ticks"""
+        y_prev = self.objects.y_prev[:self.objects.size]
+        return y_prev + (self.objects.y[:self.objects.size] - y_prev) * self.alpha
+
+
+def autopilot(sim):
+    """Entrada de prueba: sigue la fruta más baja que no sea bomba"""
+    x, y, kind, _, alive = sim.objects.active()
+    targets = np.flatnonzero(alive & (kind != KIND_BOMB))
+    if len(targets) == 0:
+        return None
+    target = targets[np.argmax(y[targets])]
+    return (x[target] + Simulation.FRUIT_SIZE / 2) / sim.width, 0.75
+
+
+def run_headless(sim, ticks, inputs=None, restart=True):
+    """Ejecuta `ticks` pasos fijos sin reloj real y devuelve el recuento de eventos.
+
+    inputs: iterable de puntos de control (o None) por tick; por defecto el piloto automático.
+    """
+    counts = {}
+    inputs = iter(inputs) if inputs is not None else None
+    for _ in range(ticks):
+        control = next(inputs, None) if inputs is not None else autopilot(sim)
+        for event in sim.step(control, mode=2):
+            counts[event["type"]] = counts.get(event["type"], 0) + 1
+        if sim.game_over and restart:
+            sim.reset()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulación del juego sin ventana (pruebas de estrés)")
+    parser.add_argument("--ticks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tick-rate", type=int, default=60, help="Ticks de simulación por segundo")
+    parser.add_argument("--frenzy", action="store_true", help="Modo frenesí: cientos de objetos a la vez")
+    args = parser.parse_args()
+
+    sim = Simulation(seed=args.seed, tick_rate=args.tick_rate)
+    if args.frenzy:
+        sim.min_fruit_interval = 0
+        sim.base_fruit_interval = 100
+        sim.spawn_batch = 4
+    start = time.perf_counter()
+    counts = run_headless(sim, args.ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{args.ticks} ticks en {elapsed:.2f} s ({args.ticks / elapsed:.0f} ticks/s)")
+    print(f"Eventos: {counts}")
+    print(f"Puntuación máxima: {sim.highest_score}")
@@ -0,0 +1,146 @@
+import cv2
+import numpy as np
+import pygame
+
+
+class Sprite:
+    """Sprite preconvertido a BGR premultiplicado listo para mezclar con el canvas"""
+
+    __slots__ = ("premul", "inv_alpha", "width", "height")
+
+    def __init__(self, bgr, alpha):
+        alpha16 = alpha.astype(np.uint16)[:, :, None]
+        # Color premultiplicado (redondeo hacia abajo para que premul + fondo nunca pase de 255)
+        self.premul = np.ascontiguousarray((bgr.astype(np.uint16) * alpha16 // 255).astype(np.uint8))
+        # Alfa inverso en uint16 para multiplicar el fondo sin desbordar (255 * 255 < 65536)
+        self.inv_alpha = np.ascontiguousarray(255 - alpha16)
+        self.height, self.width = bgr.shape[:2]
+
+    @classmethod
+    def from_surface(cls, surface):
+        """Convierte una Surface de pygame con canal alfa"""
+        rgb = np.transpose(pygame.surfarray.array3d(surface), (1, 0, 2))
+        alpha = np.transpose(pygame.surfarray.array_alpha(surface))
+        return cls(cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR), alpha)
+
+    @classmethod
+    def from_arrays(cls, premul, inv_alpha):
+        """Sprite sobre arrays ya en formato de mezcla (p. ej. vistas de un paquete mapeado en memoria)"""
+        sprite = cls.__new__(cls)
+        sprite.premul = premul
+        sprite.inv_alpha = inv_alpha
+        sprite.height, sprite.width = premul.shape[:2]
+        return sprite
+
+
+class SpriteCache:
+    """Cache de sprites indexada por (nombre de imagen, tamaño).
+
+    Los sprites salen del paquete preescalado (`asset_pack.AssetPack`) si lo
+    hay y contiene ese tamaño; si no, se decodifica la imagen con `loader(nombre)`
+    (una Surface de pygame) y se escala una sola vez.
+    """
+
+    def __init__(self, loader, pack=None):
+        self._sprites = {}
+        self.loader = loader
+        self.pack = pack
+
+    def add(self, name, size):
+        key = (name, tuple(size))
+        if key not in self._sprites:
+            if self.pack is not None and key in self.pack:
+                self._sprites[key] = self.pack.sprite(*key)
+            else:
+                scaled = pygame.transform.scale(self.loader(name), key[1])
+                self._sprites[key] = Sprite.from_surface(scaled)
+        return self._sprites[key]
+
+    def get(self, name, size):
+        return self._sprites[(name, tuple(size))]
+
+    def __contains__(self, key):
+        return key in self._sprites
+
+    def __len__(self):
+        return len(self._sprites)
+
+
+def blit(canvas, sprite, x, y, clip=None):
+    """Mezcla un sprite sobre el canvas en (x, y) usando aritmética entera.
+
+    clip: rectángulo (x0, y0, x1, y1) fuera del cual no se dibuja; por defecto el canvas entero.
+    Devuelve False si el sprite queda totalmente fuera.
+    """
+    if clip is None:
+        clip = (0, 0, canvas.shape[1], canvas.shape[0])
+    x0 = max(x, clip[0])
+    y0 = max(y, clip[1])
+    x1 = min(x + sprite.width, clip[2])
+    y1 = min(y + sprite.height, clip[3])
+    if x0 >= x1 or y0 >= y1:
+        return False
+
+    # Región visible del sprite
+    sx0, sy0 = x0 - x, y0 - y
+    sx1, sy1 = sx0 + (x1 - x0), sy0 + (y1 - y0)
+
+    roi = canvas[y0:y1, x0:x1]
+    # fondo * (255 - a) / 255 con redondeo exacto usando desplazamientos
+    t = roi * sprite.inv_alpha[sy0:sy1, sx0:sx1]
+    t += 128
+    t += t >> 8
+    t >>= 8
+    t += sprite.premul[sy0:sy1, sx0:sx1]
+    roi[...] = t
+    return True
+
+
+class DirtyRects:
+    """Guarda los píxeles que tapan los sprites para restaurarlos en el frame siguiente sin recopiar el fondo"""
+
+    def __init__(self, capacity=1 << 18, buffers=None):
+        self._arena = np.empty(capacity, dtype=np.uint8)
+        self._rects = []
+        self._used = 0
+        self.buffers = buffers
+
+    @property
+    def nbytes(self):
+        """Bytes guardados en este frame"""
+        return self._used
+
+    def save(self, canvas, x, y, width, height, clip=None):
+        """Guarda la zona de (x, y, ancho, alto) recortada a `clip` que va a pisar un sprite"""
+        if clip is None:
+            clip = (0, 0, canvas.shape[1], canvas.shape[0])
+        x0, y0 = max(x, clip[0]), max(y, clip[1])
+        x1, y1 = min(x + width, clip[2]), min(y + height, clip[3])
+        if x0 >= x1 or y0 >= y1:
+            return
+        region = canvas[y0:y1, x0:x1]
+        # Las zonas van seguidas en un buffer plano que se reutiliza y solo crece (cada crecimiento se anota)
+        end = self._used + region.size
+        if end > len(self._arena):
+            arena = np.empty(max(2 * len(self._arena), end), dtype=np.uint8)
+            arena[:self._used] = self._arena[:self._used]
+            self._arena = arena
+            if self.buffers is not None:
+                self.buffers.note_allocation(arena.nbytes)
+        np.copyto(self._arena[self._used:end].reshape(region.shape), region)
+        self._rects.append((y0, y1, x0, x1, self._used))
+        self._used = end
+
+    def restore(self, canvas):
+        """Devuelve las zonas guardadas (en orden inverso, por si se solapan) y vacía la lista"""
+        for y0, y1, x0, x1, offset in reversed(self._rects):
+            region = canvas[y0:y1, x0:x1]
+            np.copyto(region, self._arena[offset:offset + region.size].reshape(region.shape))
+        restored = self._used
+        self.discard()
+        return restored
+
+    def discard(self):
+        """Olvida las zonas guardadas (el fondo se ha repintado entero)"""
+        self._rects.clear()
+        self._used = 0
@@ -0,0 +1,412 @@
+"""Telemetría de la sesión y tabla de récords persistente.
+
+El bucle del juego solo hace `TelemetryLog.push(tipo, valores...)`: una tupla
+de tamaño fijo añadida a un deque (operación atómica, sin locks ni E/S). Un
+hilo escritor vacía la cola cada `flush_interval` segundos y escribe el lote
+de una vez en un log JSONL que rota al superar `max_bytes`
+(telemetry.jsonl → telemetry.1.jsonl → ...). Si el escritor se queda atrás,
+la cola descarta los registros más viejos en lugar de frenar el render.
+
+Resumen offline de los logs:
+
+    python telemetry.py                       # telemetry/ junto al juego
+    python telemetry.py telemetry/ --games    # además, una línea por partida
+    python telemetry.py --self-test           # comprueba el resumen con un log de prueba
+"""
+import argparse
+import collections
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Campos de cada tipo de registro (los valores se pasan en este orden a `push`)
+RECORD_FIELDS = {
+    'session': ('seed', 'render_height', 'tier', 'crt'),
+    'game_start': ('mode', 'tier'),
+    'event': ('type', 'object', 'score', 'lives'),  # object: índice del tipo de objeto de la simulación
+    'frame': ('frame_ms', 'inference_ms', 'latency_ms'),
+    'game_over': ('score', 'duration', 'mode', 'rank'),
+    'tier': ('tier',),
+    'quality': ('level', 'step', 'frame_ms'),  # step: escalón del nivel ('crt=off', ...) o None en el nivel 0
+    'session_end': ('frames', 'dropped'),
+}
+
+LOG_NAME = 'telemetry'
+
+
+def log_paths(directory, backups=None):
+    """Ficheros del log en orden cronológico (del backup más viejo al actual)"""
+    paths = []
+    index = 1
+    while backups is None or index <= backups:
+        path = os.path.join(directory, f'{LOG_NAME}.{index}.jsonl')
+        if not os.path.exists(path):
+            break
+        paths.append(path)
+        index += 1
+    paths.reverse()
+    current = os.path.join(directory, f'{LOG_NAME}.jsonl')
+    if os.path.exists(current):
+        paths.append(current)
+    return paths
+
+
+class TelemetryLog:
+    """Log de telemetría con escritura por lotes en un hilo aparte.
+
+    Con `directory=None` los registros se descartan, pero el hilo sigue
+    ejecutando las tareas de `defer` (p. ej. guardar la tabla de récords).
+    """
+
+    def __init__(self, directory=None, max_bytes=10 * 1024 * 1024, backups=5, queue_size=8192,
+                 flush_interval=0.5):
+        self.directory = directory
+        self.enabled = directory is not None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self._queue = collections.deque(maxlen=queue_size)
+        # Tareas de `defer`: cola aparte sin límite para que nunca se pierdan
+        self._tasks = collections.deque()
+        self._wake = threading.Event()
+        self._thread = None
+        self._running = False
+        self._file = None
+
+        # Estadísticas
+        self.records_pushed = 0
+        self.records_written = 0
+        self.records_dropped = 0
+        self.rotations = 0
+
+    def start(self):
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._writer, name="TelemetryWriter", daemon=True)
+        self._thread.start()
+        return self
+
+    def push(self, kind, *values):
+        """Encola un registro (nunca bloquea; si la cola está llena se pierde el más viejo)"""
+        if not self.enabled:
+            return
+        if len(self._queue) == self._queue.maxlen:
+            self.records_dropped += 1
+        self._queue.append((kind, time.time(), values))
+        self.records_pushed += 1
+
+    def defer(self, function, *args):
+        """Ejecuta `function(*args)` en el hilo escritor (E/S que no debe hacer el bucle del juego)"""
+        self._tasks.append((function, args))
+        self._wake.set()
+
+    def _writer(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _drain(self):
+        lines = []
+        while True:
+            try:
+                kind, timestamp, values = self._queue.popleft()
+            except IndexError:
+                break
+            record = {'t': round(timestamp, 3), 'kind': kind}
+            record.update(zip(RECORD_FIELDS[kind], values))
+            lines.append(json.dumps(record, separators=(',', ':')))
+        self._write(lines)
+        while True:
+            try:
+                function, args = self._tasks.popleft()
+            except IndexError:
+                break
+            try:
+                function(*args)
+            except OSError as e:
+                print(f"Telemetría: error en tarea diferida: {e}")
+
+    def _write(self, lines):
+        if not lines or not self.enabled:
+            return
+        try:
+            if self._file is None:
+                self._file = open(os.path.join(self.directory, f'{LOG_NAME}.jsonl'), 'a', encoding='utf-8')
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+            self.records_written += len(lines)
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            # Un disco lleno no debe tumbar el juego: se pierde el lote
+            print(f"Telemetría: no se pudo escribir el log: {e}")
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        base = os.path.join(self.directory, LOG_NAME)
+        oldest = f'{base}.{self.backups}.jsonl'
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.backups - 1, 0, -1):
+            path = f'{base}.{index}.jsonl'
+            if os.path.exists(path):
+                os.replace(path, f'{base}.{index + 1}.jsonl')
+        if self.backups > 0:
+            os.replace(f'{base}.jsonl', f'{base}.1.jsonl')
+        else:
+            os.remove(f'{base}.jsonl')
+        self.rotations += 1
+
+    def close(self):
+        """Escribe lo pendiente y para el hilo"""
+        if self._thread is None:
+            return
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HighScoreTable:
+    """Mejores puntuaciones guardadas en un JSON (escritura atómica: fichero temporal + rename)"""
+
+    def __init__(self, path, size=10):
+        self.path = path
+        self.size = size
+        self.entries = []
+        if path is not None:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+            self.entries = sorted((e for e in entries if isinstance(e.get('score'), int)),
+                                  key=lambda e: -e['score'])[:self.size]
+        except FileNotFoundError:
+            self.entries = []
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Tabla de récords ilegible ({self.path}): {e}; se empieza de cero")
+            self.entries = []
+
+    @property
+    def best(self):
+        return self.entries[0]['score'] if self.entries else 0
+
+    def add(self, score, mode, when=None):
+        """Inserta una partida; devuelve su puesto (1 = récord) o None si no entra en la tabla"""
+        if score <= 0:
+            return None
+        rank = sum(1 for e in self.entries if e['score'] >= score)
+        if rank >= self.size:
+            return None
+        when = time.time() if when is None else when
+        self.entries.insert(rank, {'score': int(score), 'mode': int(mode),
+                                   'date': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(when))})
+        del self.entries[self.size:]
+        return rank + 1
+
+    def save(self, entries=None):
+        """Guarda la tabla (o la copia `entries`, si se guarda desde otro hilo)"""
+        if self.path is None:
+            return
+        entries = self.entries if entries is None else entries
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def read_records(paths):
+    """Recorre los registros de varios ficheros JSONL (las líneas cortadas se ignoran)"""
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarize(records):
+    """Resumen de uno o varios logs: partidas, puntuaciones, eventos y tiempos de frame"""
+    sessions = 0
+    games = []
+    events = collections.Counter()
+    frame_ms = []
+    inference_ms = []
+    tiers = collections.Counter()
+    quality_changes = 0
+    quality_level = 0
+    dropped = 0
+    for record in records:
+        kind = record.get('kind')
+        if kind == 'frame':
+            frame_ms.append(record['frame_ms'])
+            if record.get('inference_ms'):
+                inference_ms.append(record['inference_ms'])
+        elif kind == 'event':
+            events[record['type']] += 1
+        elif kind == 'game_over':
+            games.append(record)
+        elif kind == 'session':
+            sessions += 1
+            if record.get('tier'):
+                tiers[record['tier']] += 1
+        elif kind == 'tier':
+            tiers[record['tier']] += 1
+        elif kind == 'quality':
+            quality_changes += 1
+            quality_level = max(quality_level, record['level'])
+        elif kind == 'session_end':
+            dropped += record.get('dropped', 0)
+
+    def percentiles(values):
+        if not values:
+            return None
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        return {'p50': round(float(p50), 2), 'p95': round(float(p95), 2), 'p99': round(float(p99), 2)}
+
+    scores = [g['score'] for g in games]
+    return {
+        'sessions': sessions,
+        'games': len(games),
+        'best_score': max(scores) if scores else 0,
+        'mean_score': round(float(np.mean(scores)), 1) if scores else 0.0,
+        'play_time': round(sum(g.get('duration', 0.0) for g in games), 1),
+        'events': dict(events),
+        'frames': len(frame_ms),
+        'frame_ms': percentiles(frame_ms),
+        'inference_ms': percentiles(inference_ms),
+        'tiers': {str(k): v for k, v in tiers.items()},
+        'quality_changes': quality_changes,
+        'max_quality_level': quality_level,
+        'dropped': dropped,
+        'game_list': games,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resumen de los logs de telemetría del juego")
+    parser.add_argument('paths', nargs='*', help="Directorios o ficheros .jsonl (por defecto telemetry/)")
+    parser.add_argument('--games', action='store_true', help="Listar cada partida")
+    parser.add_argument('--json', action='store_true', help="Imprimir el resumen como JSON")
+    parser.add_argument('--self-test', action='store_true', help="Comprobar el resumen con un log de prueba")
+    args = parser.parse_args(argv)
+    if args.self_test:
+        return self_test()
+
+    from config import config
+    if not args.paths and config.telemetry_dir is None:
+        print("La telemetría está desactivada (config.telemetry_dir = None): indica los logs a resumir")
+        return 1
+    paths = []
+    missing = []
+    for path in args.paths or [config.telemetry_dir]:
+        if os.path.isdir(path):
+            paths.extend(log_paths(path))
+        elif os.path.isfile(path):
+            paths.append(path)
+        else:
+            missing.append(path)
+    if missing or not paths:
+        print("No hay logs de telemetría" + (f" (no existe: {', '.join(missing)})" if missing else ""))
+        return 1
+
+    summary = summarize(read_records(paths))
+    games = summary.pop('game_list')
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"{len(paths)} fichero(s), {summary['sessions']} sesión(es), {summary['games']} partida(s), "
+          f"{summary['play_time']:.0f} s de juego")
+    print(f"Puntuación máxima {summary['best_score']}, media {summary['mean_score']}")
+    if summary['events']:
+        print("Eventos: " + ", ".join(f"{k} {v}" for k, v in sorted(summary['events'].items())))
+    for name in ('frame_ms', 'inference_ms'):
+        stats = summary[name]
+        if stats:
+            print(f"{name:<13} p50 {stats['p50']:.1f}  p95 {stats['p95']:.1f}  p99 {stats['p99']:.1f}")
+    if summary['tiers']:
+        print("Modelos: " + ", ".join(f"{k} {v}" for k, v in summary['tiers'].items()))
+    if summary['quality_changes']:
+        print(f"Gobernador de calidad: {summary['quality_changes']} cambio(s), "
+              f"nivel más bajo alcanzado {summary['max_quality_level']}")
+    if summary['dropped']:
+        print(f"Registros perdidos por cola llena: {summary['dropped']}")
+    if args.games:
+        for game in games:
+            date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(game['t']))
+            rank = f"  #{game['rank']}" if game.get('rank') else ''
+            print(f"  {date}  modo {game['mode']}  {game['score']:>5} pts  {game['duration']:>6.1f} s{rank}")
+    return 0
+
+
+def self_test():
+    """Resume un log escrito con TelemetryLog y prueba rutas vacías o que no existen. Devuelve 0 si todo pasa"""
+    def run(*argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = main(list(argv))
+        return code, output.getvalue()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        log_dir = os.path.join(directory, 'logs')
+        with TelemetryLog(log_dir, flush_interval=0.01) as log:
+            log.push('session', 1, 720, 'lite', 'full')
+            for score in (30, 50):
+                log.push('game_start', 1, 'lite')
+                log.push('frame', 16.0, 8.0, 20.0)
+                log.push('game_over', score, 12.5, 1, None)
+        code, output = run(log_dir, '--json')
+        summary = json.loads(output) if code == 0 else {}
+        results.append(("resumen de un log: partidas, récord y percentiles",
+                        summary.get('games') == 2 and summary.get('best_score') == 50
+                        and summary.get('frame_ms', {}).get('p50') == 16.0))
+
+        code, output = run(os.path.join(directory, 'no_existe.jsonl'))
+        results.append(("fichero que no existe: aviso y código 1, sin traza",
+                        code == 1 and output.startswith("No hay logs de telemetría")))
+
+        code, output = run(log_dir, os.path.join(directory, 'no_existe'))
+        results.append(("una ruta que falta entre otras válidas: aviso y código 1",
+                        code == 1 and 'no_existe' in output))
+
+        empty = os.path.join(directory, 'vacio')
+        os.makedirs(empty)
+        code, output = run(empty)
+        results.append(("directorio sin logs: aviso y código 1",
+                        code == 1 and output == "No hay logs de telemetría\n"))
+
+    for name, ok in results:
+        print(f"{'OK   ' if ok else 'FALLO'} {name}")
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import cv2
+import numpy as np
+
+
+class TextTile:
+    """Texto neón ya rasterizado: trazo de color + núcleo blanco combinados en una sola capa premultiplicada.
+
+    `premul` y `inv_alpha` son uint8 HxWx3 para mezclar con las operaciones
+    saturadas de OpenCV (mucho más rápidas que el uint16 de numpy en cajas de
+    texto casi vacías): fondo * inv_alpha / 255 + premul.
+    """
+
+    __slots__ = ("premul", "inv_alpha", "dx", "dy", "width", "height")
+
+    def __init__(self, glow, core, color, dx, dy):
+        glow = glow.astype(np.uint32)[:, :, None]
+        core = core.astype(np.uint32)[:, :, None]
+        # Las dos pasadas de putText en orden: color con cobertura `glow` y encima blanco con `core`
+        #   resultado = fondo·(1-g)(1-c) + color·g(1-c) + 255·c
+        color = np.array(color, dtype=np.uint32)
+        self.premul = ((color * glow * (255 - core) + 255 * 255 * core) // (255 * 255)).astype(np.uint8)
+        inv_alpha = ((255 - glow) * (255 - core) + 127) // 255
+        self.inv_alpha = np.repeat(inv_alpha, 3, axis=2).astype(np.uint8)
+        self.height, self.width = self.premul.shape[:2]
+        self.dx = dx   # Desplazamiento de la esquina del tile respecto al origen de putText
+        self.dy = dy
+
+    def draw(self, img, x, y):
+        """Mezcla el tile con el origen de putText en (x, y), recortado al canvas"""
+        x0, y0 = x + self.dx, y + self.dy
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        cx1, cy1 = min(x0 + self.width, img.shape[1]), min(y0 + self.height, img.shape[0])
+        if cx0 >= cx1 or cy0 >= cy1:
+            return
+        roi = img[cy0:cy1, cx0:cx1]
+        tile = (slice(cy0 - y0, cy1 - y0), slice(cx0 - x0, cx1 - x0))
+        cv2.multiply(roi, self.inv_alpha[tile], roi, scale=1 / 255)
+        cv2.add(roi, self.premul[tile], roi)
+
+
+class NeonTextCache:
+    """Cache de textos neón (ver FruitCatcherGame.draw_neon_text) y de cv2.getTextSize.
+
+    Cada texto se rasteriza la primera vez en un `TextTile` indexado por
+    (texto, fuente, escala, color, grosor) y después solo se mezcla.
+
+    Los números que cambian (el marcador) se componen con `draw_digits` a
+    partir de un atlas de un tile por dígito, que no crece con cada valor: en
+    las fuentes Hershey todos los dígitos avanzan lo mismo.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._tiles = {}
+        self._sizes = {}
+
+    def clear(self):
+        self._tiles.clear()
+        self._sizes.clear()
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def text_size(self, text, font, scale, thickness):
+        """cv2.getTextSize memorizado: ((ancho, alto), baseline)"""
+        key = (text, font, scale, thickness)
+        size = self._sizes.get(key)
+        if size is None:
+            if len(self._sizes) >= self.max_entries * 4:
+                self._sizes.clear()
+            size = self._sizes[key] = cv2.getTextSize(text, font, scale, thickness)
+        return size
+
+    def tile(self, text, font, scale, color, thickness):
+        key = (text, font, scale, color, thickness)
+        tile = self._tiles.get(key)
+        if tile is None:
+            if len(self._tiles) >= self.max_entries:
+                self._tiles.clear()
+            tile = self._tiles[key] = self._rasterize(text, font, scale, color, thickness)
+        return tile
+
+    def _rasterize(self, text, font, scale, color, thickness):
+        (w, h), baseline = self.text_size(text, font, scale, thickness)
+        # Margen generoso: el trazo grueso y algunos glifos se salen de la caja de getTextSize
+        pad = 2 * thickness + int(8 * scale) + 4
+        origin = (pad, pad + h)
+        glow = np.zeros((h + baseline + 2 * pad, w + 2 * pad), dtype=np.uint8)
+        core = np.zeros_like(glow)
+        cv2.putText(glow, text, origin, font, scale, 255, thickness, cv2.LINE_AA)
+        cv2.putText(core, text, origin, font, scale, 255, 1, cv2.LINE_AA)
+        x, y, w, h = cv2.boundingRect(glow | core)
+        if w == 0 or h == 0:
+            return None
+        return TextTile(glow[y:y + h, x:x + w], core[y:y + h, x:x + w], color, x - origin[0], y - origin[1])
+
+    def draw(self, img, text, pos, scale, color, thickness, font=cv2.FONT_HERSHEY_TRIPLEX):
+        """Equivale a las dos llamadas a cv2.putText del texto neón con origen en `pos`"""
+        tile = self.tile(text, font, scale, tuple(color), thickness)
+        if tile is not None:
+            tile.draw(img, *pos)
+
+    def draw_digits(self, img, digits, pos, scale, color, thickness, font=cv2.FONT_HERSHEY_TRIPLEX):
+        """Como `draw` para una cadena de dígitos, componiéndola desde el atlas de dígitos"""
+        color = tuple(color)
+        # getTextSize suma el grosor una sola vez por cadena: el avance de un dígito es ancho - grosor
+        advance = self.text_size('0', font, scale, thickness)[0][0] - thickness
+        x, y = pos
+        for digit in digits:
+            tile = self.tile(digit, font, scale, color, thickness)
+            if tile is not None:
+                tile.draw(img, x, y)
+            x += advance
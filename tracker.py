@@ -0,0 +1,161 @@
+import collections
+import math
+
+import cv2
+import numpy as np
+
+
+class FlowTracker:
+    """Sigue el punto de control entre inferencias de pose con flujo óptico (Lucas-Kanade piramidal).
+
+    El modelo solo se ejecuta en fotogramas clave: cada `keyframe_interval` s o si el punto se pierde o deriva.
+    """
+
+    def __init__(self, keyframe_interval=0.2, height=240, window=21, levels=3, max_fb_error=1.5,
+                 max_step=0.15, max_drift=0.03, min_confidence=0.5, history=8, min_interval=1 / 30):
+        self.keyframe_interval = keyframe_interval
+        self.min_interval = min(min_interval, keyframe_interval)   # Suelo del intervalo al reducirlo por deriva
+        self.height = height
+        self.max_fb_error = max_fb_error
+        self.max_step = max_step
+        self.max_drift = max_drift
+        self.min_confidence = min_confidence
+        self._lk = dict(winSize=(window, window), maxLevel=levels,
+                        criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+        # Últimos frames: [instante de captura, imagen en grises, punto seguido en px o None]
+        self._history = collections.deque(maxlen=history)
+        self._small = None
+
+        # Estadísticas
+        self.frames = 0
+        self.keyframes = 0
+        self.losses = 0
+        self.drift = None   # Desviación del punto seguido en el último fotograma clave (fracción del alto)
+        self.reset()
+
+    def reset(self):
+        """Olvida el punto (nueva partida o cambio de modo): la siguiente inferencia vuelve a detectarlo"""
+        self._history.clear()
+        self.point = None        # Última posición conocida en px de la imagen reducida (None = no detectado)
+        self.time = None         # Instante de captura del frame de esa posición
+        self.tracking = False    # Si se puede seguir propagando `point` a los frames nuevos
+        self.interval = self.keyframe_interval
+        self.low_confidence = False
+        self._requested = None
+        self._redetect = False   # El último fotograma clave encontró deriva: redetectar sin esperar al intervalo
+        self._fresh = False      # Hay una medida nueva que aún no se ha tomado
+        self._emitted = None
+
+    def _frame_buffer(self, shape):
+        # Los buffers del historial se reutilizan: el que sale por el final es el que se vuelve a escribir
+        if len(self._history) == self._history.maxlen:
+            gray = self._history.popleft()[1]
+            if gray.shape == shape:
+                return gray
+        return np.empty(shape, dtype=np.uint8)
+
+    def _flow(self, prev, gray, point):
+        """Posición en `gray` del punto `point` (px) de `prev`, o None si no pasa las comprobaciones"""
+        p0 = np.array([[point]], dtype=np.float32)
+        p1, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, p0, None, **self._lk)
+        if not status[0, 0]:
+            return None
+        back, status, _ = cv2.calcOpticalFlowPyrLK(gray, prev, p1, None, **self._lk)
+        if not status[0, 0]:
+            return None
+        x0, y0 = p0[0, 0]
+        x1, y1 = p1[0, 0]
+        bx, by = back[0, 0]
+        h, w = gray.shape
+        if math.hypot(bx - x0, by - y0) > self.max_fb_error:
+            return None
+        if math.hypot(x1 - x0, y1 - y0) > self.max_step * h:
+            return None
+        if not (0 <= x1 < w and 0 <= y1 < h):
+            return None
+        return float(x1), float(y1)
+
+    def add_frame(self, play_frame, t):
+        """Guarda un frame nuevo del área de juego (BGR) y propaga hasta él el punto seguido"""
+        play_h, play_w = play_frame.shape[:2]
+        height = min(self.height, play_h)
+        size = (max(1, int(round(play_w * height / play_h))), height)
+        if self._small is None or self._small.shape[:2] != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        # INTER_LINEAR: INTER_AREA con factores no enteros cuesta más que todo el seguimiento (LK ya filtra con su pirámide)
+        cv2.resize(play_frame, size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+        gray = self._frame_buffer((size[1], size[0]))
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=gray)
+
+        point = None
+        if self.tracking and self._history and self._history[-1][1].shape == gray.shape:
+            point = self._flow(self._history[-1][1], gray, self.point)
+            if point is None:
+                self.losses += 1
+                self.tracking = False
+            else:
+                self.point, self.time, self._fresh = point, t, True
+        self._history.append([t, gray, point])
+        self.frames += 1
+
+    def keyframe(self, point, t, confidence=1.0):
+        """Ancla el punto detectado por el modelo (normalizado al área de juego, o None) en el frame capturado en `t`"""
+        self.keyframes += 1
+        if not self._history:
+            return
+        index = len(self._history) - 1
+        for i in range(len(self._history) - 1, -1, -1):
+            if self._history[i][0] == t:
+                index = i
+                break
+        # Si el frame ya salió del historial se ancla en el último (la medida llega algo atrasada)
+        h, w = self._history[index][1].shape
+        anchored = None if point is None else (point[0] * w, point[1] * h)
+
+        tracked = self._history[index][2]
+        if anchored is not None and tracked is not None:
+            self.drift = math.hypot(tracked[0] - anchored[0], tracked[1] - anchored[1]) / h
+            if self.drift > self.max_drift:
+                self.interval = max(self.interval / 2, self.min_interval)
+                self._redetect = True
+            else:
+                self.interval = min(self.interval * 2, self.keyframe_interval)
+
+        self._history[index][2] = anchored
+        self.point, self.time, self._fresh = anchored, t, True
+        self.tracking = anchored is not None
+        for i in range(index + 1, len(self._history)):
+            if self.tracking:
+                anchored = self._flow(self._history[i - 1][1], self._history[i][1], anchored)
+                self.tracking = anchored is not None
+                if self.tracking:
+                    self.point, self.time = anchored, self._history[i][0]
+            self._history[i][2] = anchored if self.tracking else None
+        self.low_confidence = point is not None and confidence < self.min_confidence
+
+    def wants_keyframe(self, t):
+        """True si conviene ejecutar el modelo de pose sobre el frame capturado en `t`"""
+        if not self.tracking or self.low_confidence or self._redetect or self._requested is None:
+            return True
+        return t - self._requested >= self.interval
+
+    def requested(self, t):
+        """Anota que se ha enviado al modelo el frame capturado en `t`"""
+        self._requested = t
+        self._redetect = False
+
+    def take(self):
+        """(punto normalizado al área de juego o None, instante de captura) de la última medida, si es nueva.
+
+        Hay medida nueva cuando el punto se ha seguido hasta un frame nuevo o ha llegado un fotograma clave.
+        """
+        if not self._fresh:
+            return None
+        self._fresh = False
+        if self.time == self._emitted:
+            return None
+        self._emitted = self.time
+        if self.point is None:
+            return None, self.time
+        h, w = self._history[-1][1].shape
+        return (min(max(self.point[0] / w, 0.0), 1.0), min(max(self.point[1] / h, 0.0), 1.0)), self.time